@@ -17,7 +17,7 @@ from finance_report_assistant.qa.grounded_qa import compose_grounded_answer
 from finance_report_assistant.retrieval.index import (
     build_retrieval_index,
     default_index_dir,
-    load_retrieval_index,
+    get_retrieval_index,
 )
 from finance_report_assistant.summarization.extractive import summarize_chunks
 
@@ -186,7 +186,7 @@ def _inject_styles() -> None:
 
 
 def _index_ready(index_dir: Path) -> bool:
-    required = ["manifest.json", "records.jsonl", "bm25.pkl", "embedding.pkl"]
+    required = ["manifest.json", "records.jsonl", "index.fra"]
     return index_dir.exists() and all((index_dir / f).exists() for f in required)
 
 
@@ -197,7 +197,7 @@ def _build_pipeline(ticker: str, form: str, limit: int = 1) -> None:
 
 
 def _run_qa(ticker: str, form: str, question: str, top_k: int) -> dict:
-    index = load_retrieval_index(default_index_dir(ticker=ticker, form=form))
+    index = get_retrieval_index(ticker=ticker, form=form)
     hits = index.search(question, top_k=top_k)
 
     if not hits:
@@ -4,7 +4,13 @@ import argparse
 import json
 from pathlib import Path
 
-from common import DEFAULT_CHUNKS, get_extended_tokenizers, load_chunk_texts, resolve_chunks_path
+from common import (
+    DEFAULT_CHUNKS,
+    get_extended_tokenizers,
+    load_chunk_texts,
+    rechunk_filing_texts,
+    resolve_chunks_path,
+)
 
 
 def percentile(sorted_vals: list[int], p: float) -> float:
@@ -32,12 +38,41 @@ def summarize_lengths(lengths: list[int], budget: int) -> dict:
     }
 
 
+def token_length_stats(texts: list[str], budget: int) -> list[dict]:
+    out = []
+    for name, fn in get_extended_tokenizers().items():
+        stats = summarize_lengths([len(fn(t)) for t in texts], budget)
+        stats["tokenizer"] = name
+        out.append(stats)
+    return out
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Show how tokenizer choice changes chunk token lengths")
     parser.add_argument("--chunks", type=Path, default=DEFAULT_CHUNKS)
     parser.add_argument("--budget", type=int, default=220)
+    parser.add_argument(
+        "--filing-dir",
+        type=Path,
+        help="Raw filing directory to re-chunk (from its cached sections) instead of --chunks",
+    )
+    parser.add_argument("--max-words", type=int, nargs="+", default=[220])
+    parser.add_argument("--overlap-words", type=int, default=40)
+    parser.add_argument("--min-words", type=int, default=20)
     args = parser.parse_args()
 
+    if args.filing_dir is not None:
+        report = {"filing_dir": str(args.filing_dir), "budget": args.budget, "configs": []}
+        for max_words in args.max_words:
+            texts = rechunk_filing_texts(
+                args.filing_dir, max_words, min(args.overlap_words, max_words - 1), args.min_words
+            )
+            report["configs"].append(
+                {"max_words": max_words, "tokenizers": token_length_stats(texts, args.budget)}
+            )
+        print(json.dumps(report, indent=2))
+        return
+
     chunks_path = resolve_chunks_path(args.chunks)
     if not chunks_path.exists():
         raise SystemExit(f"Chunks file not found: {chunks_path}")
@@ -46,15 +81,11 @@ def main() -> None:
     if not texts:
         raise SystemExit("No chunk texts found")
 
-    tokenizers = get_extended_tokenizers()
-    report = {"chunks": str(chunks_path), "budget": args.budget, "tokenizers": []}
-
-    for name, fn in tokenizers.items():
-        lengths = [len(fn(t)) for t in texts]
-        stats = summarize_lengths(lengths, args.budget)
-        stats["tokenizer"] = name
-        report["tokenizers"].append(stats)
-
+    report = {
+        "chunks": str(chunks_path),
+        "budget": args.budget,
+        "tokenizers": token_length_stats(texts, args.budget),
+    }
     print(json.dumps(report, indent=2))
 
 
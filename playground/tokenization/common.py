@@ -12,12 +12,16 @@ DEFAULT_CHUNKS = Path("data/processed/chunks/AAPL/10-K/0000320193-25-000079/chun
 REPO_ROOT = Path(__file__).resolve().parents[2]
 
 try:
+    from finance_report_assistant.processing.chunker import build_chunk_candidates
+    from finance_report_assistant.processing.pipeline import sections_for_filing_dir
     from finance_report_assistant.utils.chunks import (
         load_chunk_texts as _shared_load_chunk_texts,
         resolve_repo_path as _shared_resolve_repo_path,
     )
 except ModuleNotFoundError:
     sys.path.insert(0, str(REPO_ROOT / "src"))
+    from finance_report_assistant.processing.chunker import build_chunk_candidates
+    from finance_report_assistant.processing.pipeline import sections_for_filing_dir
     from finance_report_assistant.utils.chunks import (
         load_chunk_texts as _shared_load_chunk_texts,
         resolve_repo_path as _shared_resolve_repo_path,
@@ -34,6 +38,17 @@ def load_chunk_texts(chunks_path: Path) -> list[str]:
     return _shared_load_chunk_texts(chunks_path)
 
 
+def rechunk_filing_texts(
+    filing_dir: Path, max_words: int, overlap_words: int, min_words: int
+) -> list[str]:
+    # Sections come from the cached section artifact, so only the first call parses the HTML.
+    sections = sections_for_filing_dir(_shared_resolve_repo_path(filing_dir))
+    candidates = build_chunk_candidates(
+        sections, max_words=max_words, overlap_words=overlap_words, min_words=min_words
+    )
+    return [c.text for c in candidates]
+
+
 def whitespace_tokenize(text: str) -> list[str]:
     return [t for t in text.split() if t]
 
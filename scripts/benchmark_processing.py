@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from finance_report_assistant.core.models import FilingChunk
+from finance_report_assistant.processing.chunker import build_chunk_candidates
+from finance_report_assistant.processing.html_cleaner import (
+    PARSER_BACKENDS,
+    SectionText,
+    _is_hidden_tag,
+    _is_item_heading,
+    _normalize_whitespace,
+    _split_document_section_by_item,
+    extract_sections_from_html,
+    iter_text_blocks,
+    sections_from_blocks,
+)
+from finance_report_assistant.processing.pipeline import _chunk_rows
+from finance_report_assistant.utils.chunks import iter_jsonl, write_jsonl
+from finance_report_assistant.utils.compression import find_variant, read_text
+
+DEFAULT_HTML = Path("data/raw/sec-edgar/AAPL/10-K/0000320193-25-000079/primary_document.html")
+
+
+def find_all_sections(soup: BeautifulSoup) -> list[SectionText]:
+    """The previous extractor, kept as the baseline: `get_text` on every matching node, so text
+    nested in k block elements is extracted (and emitted) k times."""
+    for tag in soup(["script", "style", "noscript", "svg"]):
+        tag.decompose()
+    for tag in soup.find_all(_is_hidden_tag):
+        tag.decompose()
+
+    sections: list[SectionText] = []
+    heading_stack: list[str] = []
+    current_title = "Document"
+    buffer: list[str] = []
+
+    def flush() -> None:
+        text = _normalize_whitespace("\n".join(buffer))
+        buffer.clear()
+        if text:
+            path = " > ".join(heading_stack) if heading_stack else current_title
+            sections.append(SectionText(title=current_title, path=path, text=text))
+
+    for node in soup.find_all(["h1", "h2", "h3", "h4", "p", "div", "li", "td", "th"]):
+        node_text = _normalize_whitespace(node.get_text(" ", strip=True))
+        if not node_text:
+            continue
+        if node.name in {"h1", "h2", "h3", "h4"}:
+            flush()
+            heading_stack[:] = heading_stack[: int(node.name[1]) - 1]
+            heading_stack.append(node_text)
+            current_title = node_text
+        elif _is_item_heading(node_text):
+            flush()
+            heading_stack = [node_text]
+            current_title = node_text
+        else:
+            buffer.append(node_text)
+    flush()
+
+    out: list[SectionText] = []
+    for section in sections:
+        if section.title == "Document":
+            out.extend(_split_document_section_by_item(section))
+        else:
+            out.append(section)
+    return out
+
+
+def nest_blocks(html: str, depth: int) -> str:
+    """Wrap every `<div>` in `depth` extra `<div>`s, like the div soup of inline XBRL filings."""
+    if depth <= 0:
+        return html
+    html = re.sub(r"<div\b", "<div>" * depth + "<div", html, flags=re.IGNORECASE)
+    return re.sub(r"</div>", "</div>" * (depth + 1), html, flags=re.IGNORECASE)
+
+
+def _measure(extract: Callable[[BeautifulSoup], list[SectionText]], html: str, repeat: int) -> dict:
+    elapsed = 0.0
+    for _ in range(repeat):
+        soup = BeautifulSoup(html, "html.parser")
+        start = time.perf_counter()
+        sections = extract(soup)
+        elapsed += time.perf_counter() - start
+    return {
+        "extract_ms": round(elapsed / repeat * 1000, 1),
+        "sections": len(sections),
+        "output_chars": sum(len(s.text) for s in sections),
+        "output_words": sum(len(s.text.split()) for s in sections),
+    }
+
+
+def bench_html_clean(html: str, repeat: int, depth: int = 0) -> dict:
+    html = nest_blocks(html, depth)
+    start = time.perf_counter()
+    soup = BeautifulSoup(html, "html.parser")
+    parse_ms = (time.perf_counter() - start) * 1000
+
+    baseline = _measure(find_all_sections, html, repeat)
+    single_pass = _measure(lambda soup: sections_from_blocks(iter_text_blocks(soup)), html, repeat)
+    return {
+        "suite": "html-clean",
+        "html_bytes": len(html.encode("utf-8")),
+        "nesting_depth": depth,
+        "visible_words": len(soup.get_text(" ", strip=True).split()),
+        "parse_ms": round(parse_ms, 1),
+        "find_all": baseline,
+        "single_pass": single_pass,
+        "extract_speedup": round(baseline["extract_ms"] / single_pass["extract_ms"], 2),
+        "output_ratio": round(single_pass["output_chars"] / baseline["output_chars"], 3),
+    }
+
+
+def bench_parser_backend(html: str, repeat: int, depth: int = 0) -> dict:
+    html = nest_blocks(html, depth)
+    out: dict = {"suite": "parser-backend", "html_bytes": len(html.encode("utf-8"))}
+    outputs = {}
+    for backend in PARSER_BACKENDS:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            sections = extract_sections_from_html(html, backend=backend)
+        elapsed = (time.perf_counter() - start) / repeat
+        tracemalloc.start()
+        extract_sections_from_html(html, backend=backend)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        outputs[backend] = [(s.title, s.path, s.text) for s in sections]
+        out[backend] = {
+            "total_ms": round(elapsed * 1000, 1),
+            "peak_python_mb": round(peak / 2**20, 2),
+            "sections": len(sections),
+        }
+    out["speedup"] = round(out["html.parser"]["total_ms"] / out["lxml"]["total_ms"], 2)
+    out["identical_sections"] = outputs["html.parser"] == outputs["lxml"]
+    return out
+
+
+_BENCH_METADATA = {
+    "ticker": "AAPL",
+    "form": "10-K",
+    "cik": "0000320193",
+    "accession_number": "0000320193-25-000079",
+    "filing_date": "2025-10-31",
+    "report_date": "2025-09-27",
+    "sec_archive_url": "https://www.sec.gov/Archives/edgar/data/320193/000032019325000079/a.htm",
+}
+
+
+def write_chunks_baseline(path: Path, rows) -> int:  # type: ignore[no-untyped-def]
+    """The previous writer, kept as the baseline: a `FilingChunk` per row, `json.dumps` into a
+    list holding the whole output, one `write_text` at the end."""
+    lines = []
+    for row in rows:
+        payload = FilingChunk(**row).model_dump(mode="json")
+        payload["chunk_index"] = row["chunk_index"]
+        lines.append(json.dumps(payload, ensure_ascii=False))
+    path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
+    return len(lines)
+
+
+def _validated(rows: list[dict]):  # type: ignore[no-untyped-def]
+    for row in rows:
+        payload = FilingChunk.model_validate(row).model_dump(mode="json")
+        payload["chunk_index"] = row["chunk_index"]
+        yield payload
+
+
+def load_chunks_baseline(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line]
+
+
+def _timed(fn: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """Best wall time and peak traced memory (MB) of `fn`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(best * 1000, 1), round(peak / 2**20, 2)
+
+
+def bench_chunks_io(html: str, repeat: int, depth: int = 0) -> dict:
+    sections = extract_sections_from_html(nest_blocks(html, depth))
+    # Repeat the filing's chunks so output size dominates per-row costs.
+    candidates = build_chunk_candidates(sections) * 10
+    # Sentence splitting is the same for every writer; precompute the rows once.
+    rows = list(_chunk_rows(_BENCH_METADATA, Path("a.htm"), candidates, False))
+
+    out: dict = {"suite": "chunks-io", "chunks": len(rows)}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "chunks.jsonl"
+        writers = {
+            "json_pydantic_list": lambda: write_chunks_baseline(path, rows),
+            "orjson_stream_validated": lambda: write_jsonl(path, _validated(rows)),
+            "orjson_stream_trusted": lambda: write_jsonl(path, iter(rows)),
+        }
+        for name, write in writers.items():
+            ms, peak = _timed(write, repeat)
+            out[f"write_{name}"] = {"ms": ms, "peak_python_mb": peak}
+        out["file_mb"] = round(path.stat().st_size / 2**20, 2)
+        for name, load in {
+            "json": lambda: load_chunks_baseline(path),
+            "orjson": lambda: list(iter_jsonl(path)),
+        }.items():
+            ms, peak = _timed(load, repeat)
+            out[f"load_{name}"] = {"ms": ms, "peak_python_mb": peak}
+    return out
+
+
+SUITES = {
+    "html-clean": bench_html_clean,
+    "parser-backend": bench_parser_backend,
+    "chunks-io": bench_chunks_io,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for filing processing")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="html-clean")
+    parser.add_argument("--html", type=Path, default=DEFAULT_HTML)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--depth", type=int, default=0, help="Extra <div> levels around each <div>")
+    args = parser.parse_args()
+
+    # Raw documents may be stored compressed (see `settings.raw_compression`).
+    html = read_text(find_variant(args.html) or args.html, errors="ignore")
+    result = SUITES[args.suite](html, repeat=args.repeat, depth=args.depth)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from finance_report_assistant.processing.chunker import build_chunk_candidates
+from finance_report_assistant.processing.html_cleaner import extract_sections_from_html
+from finance_report_assistant.retrieval.bm25 import BM25Index
+from finance_report_assistant.retrieval.embedding import HashEmbeddingIndex
+from finance_report_assistant.retrieval.index import RetrievalIndex
+from finance_report_assistant.utils.compression import find_variant, read_text
+
+DEFAULT_HTML = Path("data/raw/sec-edgar/AAPL/10-K/0000320193-25-000079/primary_document.html")
+LONG_QUESTIONS = [
+    "What supply chain risks are disclosed and how could component shortages affect gross margins?",
+    "How does management describe liquidity, cash flow, debt and share repurchase capacity?",
+    "What are the main segment or geographic revenue drivers and how did net sales change?",
+    "Which legal, regulatory or tax proceedings could have a material adverse effect on results?",
+    "How are research and development expenses and operating costs expected to evolve next year?",
+]
+
+
+def build_corpus(html_path: Path, copies: int, drop_rate: float, seed: int) -> list[str]:
+    """Simulate a multi-filing index by perturbing copies of one filing's chunks."""
+    html = read_text(find_variant(html_path) or html_path, errors="ignore")
+    base = [c.text for c in build_chunk_candidates(extract_sections_from_html(html))]
+    rng = random.Random(seed)
+    texts: list[str] = []
+    for _ in range(copies):
+        for text in base:
+            texts.append(" ".join(w for w in text.split() if rng.random() >= drop_rate))
+    return texts
+
+
+def _time_per_query(fn: Callable[[str], object], queries: list[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries:
+            fn(q)
+    return (time.perf_counter() - start) / (repeat * len(queries))
+
+
+def bench_bm25_topk(texts: list[str], top_k: int, repeat: int) -> dict:
+    bm25 = BM25Index.fit(texts)
+
+    def exhaustive(q: str) -> list[int]:
+        scores = bm25.scores(q)
+        return sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:top_k]
+
+    for q in LONG_QUESTIONS:
+        assert [d for d, _ in bm25.top_k(q, top_k)] == exhaustive(q), q
+
+    exhaustive_s = _time_per_query(exhaustive, LONG_QUESTIONS, repeat)
+    pruned_s = _time_per_query(lambda q: bm25.top_k(q, top_k), LONG_QUESTIONS, repeat)
+    return {
+        "suite": "bm25-topk",
+        "docs": len(texts),
+        "top_k": top_k,
+        "exhaustive_ms": round(exhaustive_s * 1000, 3),
+        "pruned_ms": round(pruned_s * 1000, 3),
+        "speedup": round(exhaustive_s / pruned_s, 2) if pruned_s else None,
+    }
+
+
+def bench_embedding_backend(texts: list[str], top_k: int, repeat: int) -> dict:
+    out: dict = {"suite": "embedding-backend", "docs": len(texts)}
+    for backend in ("dict", "matrix"):
+        tracemalloc.start()
+        index = HashEmbeddingIndex.fit(texts, backend=backend)
+        _, peak = tracemalloc.get_traced_memory()
+        resident, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        per_query = _time_per_query(index.scores, LONG_QUESTIONS, repeat)
+        out[backend] = {
+            "resident_mb": round(resident / 1e6, 2),
+            "fit_peak_mb": round(peak / 1e6, 2),
+            "query_ms": round(per_query * 1000, 3),
+        }
+    return out
+
+
+def bench_hybrid_search(texts: list[str], top_k: int, repeat: int) -> dict:
+    index = RetrievalIndex(
+        records=[{"chunk_id": str(i), "text": t} for i, t in enumerate(texts)],
+        bm25=BM25Index.fit(texts),
+        embedding=HashEmbeddingIndex.fit(texts, backend="matrix"),
+    )
+    identical = sum(
+        [h.record["chunk_id"] for h in index.search(q, top_k=top_k)]
+        == [h.record["chunk_id"] for h in index.search(q, top_k=top_k, exact=True)]
+        for q in LONG_QUESTIONS
+    )
+    exact_s = _time_per_query(
+        lambda q: index.search(q, top_k=top_k, exact=True), LONG_QUESTIONS, repeat
+    )
+    candidate_s = _time_per_query(lambda q: index.search(q, top_k=top_k), LONG_QUESTIONS, repeat)
+    return {
+        "suite": "hybrid-search",
+        "docs": len(texts),
+        "top_k": top_k,
+        "exact_ms": round(exact_s * 1000, 3),
+        "candidate_ms": round(candidate_s * 1000, 3),
+        "speedup": round(exact_s / candidate_s, 2) if candidate_s else None,
+        "identical_queries": f"{identical}/{len(LONG_QUESTIONS)}",
+    }
+
+
+SUITES = {
+    "bm25-topk": bench_bm25_topk,
+    "embedding-backend": bench_embedding_backend,
+    "hybrid-search": bench_hybrid_search,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the retrieval stack")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="bm25-topk")
+    parser.add_argument("--html", type=Path, default=DEFAULT_HTML)
+    parser.add_argument("--copies", type=int, default=20, help="Simulated filings in the index")
+    parser.add_argument("--drop-rate", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = build_corpus(args.html, copies=args.copies, drop_rate=args.drop_rate, seed=args.seed)
+    result = SUITES[args.suite](texts, top_k=args.top_k, repeat=args.repeat)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,20 @@ from finance_report_assistant.evaluation.retrieval_eval import (
     render_error_analysis_markdown,
     render_summary_markdown,
 )
+from finance_report_assistant.ingestion.async_ingest import (
+    DEFAULT_CONCURRENCY,
+    ingest_filings_concurrently,
+)
+from finance_report_assistant.ingestion.bulk import EdgarCatalog, load_bulk
 from finance_report_assistant.ingestion.edgar_ingest import ingest_filings_for_ticker
-from finance_report_assistant.processing.pipeline import build_chunks_for_ticker_form
+from finance_report_assistant.ingestion.sec_client import SecEdgarClient
+from finance_report_assistant.processing.chunker import ChunkConfig
+from finance_report_assistant.processing.pipeline import (
+    FilingBuildResult,
+    build_chunks_for_filings,
+    build_chunks_for_ticker_form,
+    raw_filing_dirs,
+)
 from finance_report_assistant.processing.tokenizer_eval import (
     append_markdown_report,
     evaluate_tokenizer_metrics,
@@ -21,6 +33,7 @@ from finance_report_assistant.processing.tokenizer_eval import (
 from finance_report_assistant.qa.grounded_qa import compose_grounded_answer
 from finance_report_assistant.retrieval.index import (
     build_retrieval_index,
+    convert_retrieval_index,
     default_index_dir,
     load_retrieval_index,
 )
@@ -38,9 +51,28 @@ def main() -> None:
 def ingest_10k(
     ticker: str = typer.Option(..., help="Ticker symbol, e.g., AAPL"),
     limit: int = typer.Option(1, min=1, max=10, help="How many recent matching filings to ingest"),
+    http2: bool = typer.Option(False, help="Use HTTP/2 (requires the 'http2' extra)"),
+    timings: bool = typer.Option(False, help="Print per-request connect/TTFB/transfer timings"),
+    cache: bool = typer.Option(True, help="Use the on-disk HTTP cache under data/cache/http"),
 ) -> None:
     """Ingest recent 10-K filing(s) for one ticker."""
-    out_dirs = ingest_filings_for_ticker(ticker=ticker, form="10-K", limit=limit)
+    with SecEdgarClient(http2=http2, use_cache=cache) as client:
+        out_dirs = ingest_filings_for_ticker(ticker=ticker, form="10-K", limit=limit, client=client)
+    if timings:
+        for t in client.timings:
+            typer.echo(
+                f"{t.status_code} {t.http_version} {t.num_bytes}B "
+                f"connect={t.connect_s:.3f}s tls={t.tls_s:.3f}s ttfb={t.ttfb_s:.3f}s "
+                f"transfer={t.transfer_s:.3f}s total={t.total_s:.3f}s "
+                f"{'reused' if t.reused_connection else 'new'} {t.url}"
+            )
+        typer.echo(json.dumps(client.timing_summary(), indent=2))
+    if client.cache is not None:
+        stats = client.cache.summary()
+        typer.echo(
+            f"HTTP cache: {stats['hits']} hit(s), {stats['revalidated']} revalidated, "
+            f"{stats['misses']} miss(es), {stats['size_bytes'] / 2**20:.1f} MB on disk"
+        )
     if not out_dirs:
         typer.echo(f"No 10-K filings found for {ticker.upper()}")
         raise typer.Exit(code=1)
@@ -50,33 +82,201 @@ def ingest_10k(
         typer.echo(f"- {path}")
 
 
+def _split_csv(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# Same ranges as the --max-words / --overlap-words / --min-words options of `build-chunks`.
+CHUNK_OPTION_BOUNDS = {"max_words": (50, 1000), "overlap_words": (0, 300), "min_words": (5, 200)}
+
+
+def _chunk_config(
+    max_words: int, overlap_words: int, min_words: int, param_hint: str
+) -> ChunkConfig:
+    values = {"max_words": max_words, "overlap_words": overlap_words, "min_words": min_words}
+    for name, value in values.items():
+        low, high = CHUNK_OPTION_BOUNDS[name]
+        if not low <= value <= high:
+            raise typer.BadParameter(
+                f"{name} must be between {low} and {high}, got {value}", param_hint=param_hint
+            )
+    try:
+        return ChunkConfig(max_words, overlap_words, min_words)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint=param_hint) from exc
+
+
+def _parse_chunk_variants(value: str, min_words: int) -> list[ChunkConfig]:
+    """`"220:40,128:20:10"` -> one `ChunkConfig` per `MAX:OVERLAP[:MIN]` item."""
+    configs: list[ChunkConfig] = []
+    for item in _split_csv(value):
+        parts = item.split(":")
+        if len(parts) not in (2, 3) or not all(p.strip().isdigit() for p in parts):
+            raise typer.BadParameter(
+                f"expected MAX:OVERLAP[:MIN], got {item!r}", param_hint="--variants"
+            )
+        max_words, overlap_words, item_min_words = ([int(p) for p in parts] + [min_words])[:3]
+        configs.append(_chunk_config(max_words, overlap_words, item_min_words, "--variants"))
+    return configs
+
+
+@app.command("ingest")
+def ingest(
+    tickers: str = typer.Option(None, help="Comma-separated tickers, e.g., AAPL,MSFT"),
+    forms: str = typer.Option("10-K", help="Comma-separated SEC form types, e.g., 10-K,10-Q"),
+    limit: int = typer.Option(1, min=1, max=500, help="Recent filings per ticker and form"),
+    since: str = typer.Option(
+        None, help="Also include filings on or after this date (YYYY-MM-DD), up to --limit"
+    ),
+    concurrency: int = typer.Option(
+        DEFAULT_CONCURRENCY, min=1, max=32, help="Maximum in-flight SEC requests"
+    ),
+    sync: bool = typer.Option(False, help="Only download accessions not already on disk"),
+    catalog: bool = typer.Option(
+        False, help="Select filings from the `load-bulk` catalog instead of live submissions"
+    ),
+    resume: bool = typer.Option(
+        False, help="Continue the last interrupted run from the job queue instead of a new run"
+    ),
+) -> None:
+    """Download filings for many tickers concurrently (rate-limited to SEC's 10 req/s)."""
+    if not tickers and not resume:
+        typer.echo("Pass --tickers, or --resume to continue the last run")
+        raise typer.Exit(code=1)
+    try:
+        summary = ingest_filings_concurrently(
+            tickers=_split_csv(tickers or ""),
+            forms=_split_csv(forms),
+            limit=limit,
+            concurrency=concurrency,
+            incremental=sync,
+            since=since,
+            use_catalog=catalog,
+            resume=resume,
+        )
+    except (FileNotFoundError, ValueError) as exc:
+        # A missing `load-bulk` catalog lands here; its message says how to build one.
+        typer.echo(str(exc))
+        raise typer.Exit(code=1) from exc
+
+    counts = summary.counts()
+    typer.echo(
+        f"Added {counts['added']}, skipped {counts['skipped']}, failed {counts['failed']} "
+        f"filing(s) in {summary.elapsed_s:.1f}s ({summary.filings_per_s:.2f} filings/s)"
+    )
+    if summary.run_id is not None:
+        jobs = summary.queue_counts
+        typer.echo(
+            f"Run {summary.run_id}: {jobs['done']} done, {jobs['failed']} failed, "
+            f"{jobs['pending'] + jobs['running']} left"
+        )
+    for path in summary.written:
+        typer.echo(f"- {path}")
+    for label, error in summary.failures:
+        typer.echo(f"! {label}: {error}")
+    if summary.failures and not summary.written:
+        raise typer.Exit(code=1)
+
+
+@app.command("load-bulk")
+def load_bulk_command(
+    submissions_zip: Path = typer.Option(
+        None, exists=True, dir_okay=False, help="Local copy of SEC's bulk submissions.zip"
+    ),
+    company_tickers: Path = typer.Option(
+        None, exists=True, dir_okay=False, help="Local copy of SEC's company_tickers.json"
+    ),
+    forms: str = typer.Option(None, help="Only catalog these forms, e.g., 10-K,10-Q"),
+    catalog_path: Path = typer.Option(
+        None, help="Catalog file (default data/catalog/edgar.sqlite)"
+    ),
+) -> None:
+    """Build the offline ticker -> CIK -> filings catalog from SEC bulk archives."""
+    if submissions_zip is None and company_tickers is None:
+        typer.echo("Pass --submissions-zip and/or --company-tickers")
+        raise typer.Exit(code=1)
+    report = load_bulk(
+        submissions_zip=submissions_zip,
+        company_tickers=company_tickers,
+        catalog_path=catalog_path,
+        forms=set(_split_csv(forms)) if forms else None,
+    )
+    with EdgarCatalog(catalog_path) as catalog:
+        counts = catalog.counts()
+    typer.echo(
+        f"Loaded {report.zip_entries} submissions file(s), {report.tickers} ticker row(s) and "
+        f"{report.filings} filing row(s) in {report.elapsed_s:.1f}s"
+    )
+    typer.echo(
+        f"Catalog {catalog.path}: {counts['companies']} companies, {counts['tickers']} tickers, "
+        f"{counts['filings']} filings"
+    )
+
+
 @app.command("build-chunks")
 def build_chunks(
-    ticker: str = typer.Option(..., help="Ticker symbol, e.g., AAPL"),
+    ticker: str = typer.Option(..., help="Ticker symbol(s), comma-separated, e.g., AAPL,MSFT"),
     form: str = typer.Option("10-K", help="SEC form type"),
-    limit: int = typer.Option(1, min=1, max=20, help="How many filings to process"),
+    limit: int = typer.Option(1, min=1, max=20, help="How many filings to process per ticker"),
     max_words: int = typer.Option(220, min=50, max=1000, help="Chunk size in words"),
     overlap_words: int = typer.Option(40, min=0, max=300, help="Chunk overlap in words"),
     min_words: int = typer.Option(20, min=5, max=200, help="Minimum words kept per chunk"),
+    workers: int = typer.Option(1, min=1, max=64, help="Build filings in N worker processes"),
+    force: bool = typer.Option(False, help="Rebuild even when the recorded fingerprint matches"),
+    variants: str = typer.Option(
+        "",
+        help="Comma-separated MAX:OVERLAP[:MIN] chunk configurations to build side by side "
+        "from one parse, e.g. 220:40,128:20 (replaces --max-words/--overlap-words)",
+    ),
 ) -> None:
     """Build cleaned and chunked JSONL outputs from raw SEC filings."""
-    out_files = build_chunks_for_ticker_form(
-        ticker=ticker,
-        form=form,
+    chunk_variants = _parse_chunk_variants(variants, min_words)
+    if not chunk_variants:
+        _chunk_config(max_words, overlap_words, min_words, param_hint="--overlap-words")
+    tickers = _split_csv(ticker)
+    filing_dirs = [d for t in tickers for d in raw_filing_dirs(t, form, limit)]
+    if not filing_dirs:
+        typer.echo(f"No raw filings found for {', '.join(t.upper() for t in tickers)} {form}")
+        raise typer.Exit(code=1)
+
+    def progress(done: int, total: int, result: FilingBuildResult) -> None:
+        if result.error is not None:
+            status = result.error
+        else:
+            status = f"{result.chunk_count} chunks" + (" (up to date)" if result.skipped else "")
+        typer.echo(
+            f"[{done}/{total}] {result.filing_dir.parent.parent.name} {result.filing_dir.name}: "
+            f"{status} ({result.elapsed_s:.1f}s)"
+        )
+
+    report = build_chunks_for_filings(
+        filing_dirs,
         max_words=max_words,
         overlap_words=overlap_words,
         min_words=min_words,
-        limit=limit,
+        workers=workers,
+        progress=progress,
+        force=force,
+        variants=chunk_variants or None,
     )
 
-    if not out_files:
-        typer.echo(f"No raw filings found for {ticker.upper()} {form}")
+    typer.echo(
+        f"Built chunks for {len(report.outputs)} filing(s) ({len(report.rebuilt)} rebuilt, "
+        f"{len(report.skipped)} up to date), {len(report.failures)} failed, "
+        f"in {report.elapsed_s:.1f}s with {report.workers} worker(s) "
+        f"({report.filings_per_s:.2f} filings/s, {report.mb_per_s:.1f} MB/s)"
+    )
+    for result in report.results:
+        if result.variant_outputs:
+            for path in result.variant_outputs.values():
+                typer.echo(f"- {path}")
+        elif result.output is not None:
+            typer.echo(f"- {result.output}")
+    for result in report.failures:
+        typer.echo(f"! {result.filing_dir}: {result.error}")
+    if not report.outputs:
         raise typer.Exit(code=1)
 
-    typer.echo(f"Built chunks for {len(out_files)} filing(s)")
-    for path in out_files:
-        typer.echo(f"- {path}")
-
 
 @app.command("eval-tokenizer")
 def eval_tokenizer(
@@ -99,6 +299,9 @@ def build_retrieval(
     form: str = typer.Option("10-K", help="SEC form type"),
     limit: int = typer.Option(1, min=1, max=20, help="How many filings to include"),
     embedding_dim: int = typer.Option(384, min=64, max=2048, help="Dense hashing vector size"),
+    variant: str = typer.Option(
+        None, help="Index a chunking variant from `build-chunks --variants`, e.g. w128-o20-m20"
+    ),
 ) -> None:
     """Build local retrieval index (BM25 + dense hash embeddings)."""
     out_dir, manifest = build_retrieval_index(
@@ -106,11 +309,37 @@ def build_retrieval(
         form=form,
         limit=limit,
         embedding_dim=embedding_dim,
+        variant=variant,
     )
     typer.echo(f"Built retrieval index: {out_dir}")
     typer.echo(json.dumps(manifest, indent=2))
 
 
+@app.command("convert-index")
+def convert_index(
+    ticker: str = typer.Option(..., help="Ticker symbol, e.g., AAPL"),
+    form: str = typer.Option("10-K", help="SEC form type"),
+    keep_legacy: bool = typer.Option(False, help="Keep the old pickle files after converting"),
+) -> None:
+    """Convert a legacy pickle retrieval index to the binary index format."""
+    index_dir = default_index_dir(ticker=ticker, form=form)
+    if not (index_dir / "bm25.pkl").exists():
+        typer.echo(f"No legacy pickle index found at {index_dir}.")
+        raise typer.Exit(code=1)
+
+    manifest = convert_retrieval_index(index_dir, keep_legacy=keep_legacy)
+    typer.echo(f"Converted retrieval index: {index_dir}")
+    typer.echo(json.dumps(manifest, indent=2))
+
+
+def _open_index(index_dir: Path):  # type: ignore[no-untyped-def]
+    try:
+        return load_retrieval_index(index_dir)
+    except ValueError as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=1) from exc
+
+
 @app.command("search")
 def search(
     query: str = typer.Option(..., help="Natural-language question/query"),
@@ -128,7 +357,7 @@ def search(
         )
         raise typer.Exit(code=1)
 
-    index = load_retrieval_index(index_dir)
+    index = _open_index(index_dir)
     hits = index.search(
         query=query,
         top_k=top_k,
@@ -169,7 +398,7 @@ def ask(
         typer.echo(f"Index does not exist at {index_dir}. Run build-retrieval-index first.")
         raise typer.Exit(code=1)
 
-    index = load_retrieval_index(index_dir)
+    index = _open_index(index_dir)
     hits = index.search(question, top_k=top_k)
     if not hits:
         typer.echo("No retrieval hits found.")
@@ -257,14 +486,17 @@ def eval_retrieval(
     bm25_weight: float = typer.Option(0.55, min=0.0, max=1.0),
     summary_md: Path = typer.Option(Path("docs/evaluation.md")),
     error_md: Path = typer.Option(Path("docs/retrieval_error_analysis.md")),
+    variant: str = typer.Option(
+        None, help="Evaluate the index of a chunking variant (see build-retrieval-index)"
+    ),
 ) -> None:
     """Evaluate retrievers and write summary + error analysis markdown."""
-    index_dir = default_index_dir(ticker=ticker, form=form)
+    index_dir = default_index_dir(ticker=ticker, form=form, variant=variant)
     if not index_dir.exists():
         typer.echo(f"Index does not exist at {index_dir}. Run build-retrieval-index first.")
         raise typer.Exit(code=1)
 
-    index = load_retrieval_index(index_dir)
+    index = _open_index(index_dir)
     payload = evaluate_retrieval(
         index=index,
         top_k=top_k,
@@ -273,8 +505,10 @@ def eval_retrieval(
         bm25_weight=bm25_weight,
     )
 
-    summary_text = render_summary_markdown(payload, ticker=ticker, form=form)
-    error_text = render_error_analysis_markdown(payload, ticker=ticker, form=form)
+    summary_text = render_summary_markdown(payload, ticker=ticker, form=form, variant=variant)
+    error_text = render_error_analysis_markdown(
+        payload, ticker=ticker, form=form, variant=variant
+    )
 
     summary_md.parent.mkdir(parents=True, exist_ok=True)
     with summary_md.open("a", encoding="utf-8") as f:
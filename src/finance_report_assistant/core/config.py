@@ -17,6 +17,27 @@ class Settings(BaseSettings):
         description="SEC-compliant user agent with contact info",
     )
     data_dir: Path = Field(default=Path("data"))
+    raw_compression: str = Field(
+        default="gzip",
+        description="Codec for downloaded filing documents: none, gzip or zstd",
+    )
+    html_parser: str = Field(
+        default="auto",
+        description="Section extraction backend: html.parser, lxml, or auto (lxml when installed)",
+    )
+    http_cache_mb: int = Field(
+        default=2048,
+        description="Size cap for the on-disk SEC HTTP response cache; 0 disables it",
+    )
+    validate_chunk_rows: bool = Field(
+        default=True,
+        description="Validate chunk rows against FilingChunk before writing them; the rows "
+        "are built internally, so turning this off only skips the check",
+    )
+    index_cache_mb: int = Field(
+        default=512,
+        description="Memory budget for retrieval indexes kept open by the process-wide registry",
+    )
 
 
 settings = Settings()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field, HttpUrl
+from typing import Any
+
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 
 
 class FilingMetadata(BaseModel):
@@ -25,11 +27,52 @@ class FilingChunk(BaseModel):
     report_date: str | None = None
     section_title: str
     section_path: str
+    # `text` is `sections[section_index].text[char_start:char_end]` in the filing's section
+    # artifact (`sections_for_filing_dir`); rows written before it existed default to 0.
+    section_index: int = 0
     char_start: int
     char_end: int
     word_count: int
     text: str
     source_file: str
     citation_url: HttpUrl
-    sentences: list[str] = Field(default_factory=list)
-    sentence_spans: list[dict[str, int | str]] = Field(default_factory=list)
+    # Sentence i is `text[sentence_starts[i]:sentence_ends[i]]`.
+    sentence_starts: list[int] = Field(default_factory=list)
+    sentence_ends: list[int] = Field(default_factory=list)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _legacy_sentences(cls, data: Any) -> Any:
+        """Convert the `sentences` / `sentence_spans` of rows written before the offset arrays
+        into `sentence_starts` / `sentence_ends`."""
+        if not isinstance(data, dict) or "sentence_starts" in data:
+            return data
+        spans = data.get("sentence_spans") or []
+        sentences = data.get("sentences") or []
+        if not spans and not sentences:
+            return data
+        text = data.get("text") or ""
+        starts: list[int] = []
+        ends: list[int] = []
+        if spans:
+            for span in spans:
+                if span["char_end"] > span["char_start"]:
+                    starts.append(span["char_start"])
+                    ends.append(span["char_end"])
+        else:
+            cursor = 0
+            for sentence in sentences:
+                start = text.find(sentence, cursor)
+                if sentence and start >= 0:
+                    cursor = start + len(sentence)
+                    starts.append(start)
+                    ends.append(cursor)
+        legacy = ("sentences", "sentence_spans")
+        out = {key: value for key, value in data.items() if key not in legacy}
+        return {**out, "sentence_starts": starts, "sentence_ends": ends}
+
+    @property
+    def sentences(self) -> list[str]:
+        return [
+            self.text[s:e] for s, e in zip(self.sentence_starts, self.sentence_ends, strict=True)
+        ]
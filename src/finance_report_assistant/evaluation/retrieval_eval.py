@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import re
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime
-import re
 
-from finance_report_assistant.retrieval.hybrid import fuse_rankings
-from finance_report_assistant.retrieval.index import RetrievalIndex
+import numpy as np
+
+from finance_report_assistant.retrieval.hybrid import DEFAULT_CANDIDATE_POOL
+from finance_report_assistant.retrieval.index import BatchScores, RetrievalIndex
 
 TOKEN_RE = re.compile(r"[a-z0-9]+")
 QUERY_TYPES: dict[str, set[str]] = {
@@ -41,7 +44,7 @@ def _infer_query_type(text: str) -> str:
     return best_type
 
 
-def build_eval_queries(records: list[dict], max_queries: int = 30) -> list[EvalQuery]:
+def build_eval_queries(records: Sequence[dict], max_queries: int = 30) -> list[EvalQuery]:
     out: list[EvalQuery] = []
     for idx, row in enumerate(records[:max_queries]):
         terms: list[str] = []
@@ -71,31 +74,56 @@ def build_eval_queries(records: list[dict], max_queries: int = 30) -> list[EvalQ
     return out
 
 
-def _rank_bm25(index: RetrievalIndex, query: str, top_k: int) -> list[str]:
-    scores = index.bm25.scores(query)
-    ranked = sorted(range(len(index.records)), key=lambda i: scores[i], reverse=True)[:top_k]
-    return [str(index.records[i].get("chunk_id", "")) for i in ranked]
+def _ranked_ids(index: RetrievalIndex, scores: np.ndarray, top_k: int) -> list[str]:
+    # Stable sort keeps index order on ties, matching `sorted(..., reverse=True)`.
+    ranked = np.argsort(-scores, kind="stable")[:top_k]
+    return [str(index.records[int(i)].get("chunk_id", "")) for i in ranked]
 
 
-def _rank_embedding(index: RetrievalIndex, query: str, top_k: int) -> list[str]:
-    scores = index.embedding.scores(query)
-    ranked = sorted(range(len(index.records)), key=lambda i: scores[i], reverse=True)[:top_k]
-    return [str(index.records[i].get("chunk_id", "")) for i in ranked]
-
-
-def _rank_hybrid(index: RetrievalIndex, query: str, top_k: int, bm25_weight: float) -> list[str]:
-    emb_weight = 1.0 - bm25_weight
-    bm25_scores = index.bm25.scores(query)
-    emb_scores = index.embedding.scores(query)
-    hits = fuse_rankings(
-        records=index.records,
-        bm25_scores=bm25_scores,
-        embedding_scores=emb_scores,
+def _rank_hybrid(
+    index: RetrievalIndex,
+    queries: list[EvalQuery],
+    batch: BatchScores,
+    top_k: int,
+    bm25_weight: float,
+    exact: bool = True,
+    candidate_pool: int = DEFAULT_CANDIDATE_POOL,
+) -> dict[str, list[str]]:
+    hits = index.fuse_many(
+        batch,
         top_k=top_k,
-        bm25_weight=bm25_weight,
-        embedding_weight=emb_weight,
+        weights=(bm25_weight, 1.0 - bm25_weight),
+        exact=exact,
+        candidate_pool=candidate_pool,
     )
-    return [str(h.record.get("chunk_id", "")) for h in hits]
+    return {
+        q.query_id: [str(h.record.get("chunk_id", "")) for h in q_hits]
+        for q, q_hits in zip(queries, hits, strict=True)
+    }
+
+
+def _candidate_fusion_error(
+    queries: list[EvalQuery],
+    exact_ranked: dict[str, list[str]],
+    candidate_ranked: dict[str, list[str]],
+    candidate_pool: int,
+) -> dict:
+    """Compare candidate-pool fusion against exact full-corpus fusion."""
+    overlap = 0.0
+    identical = 0
+    for q in queries:
+        exact = exact_ranked.get(q.query_id, [])
+        approx = candidate_ranked.get(q.query_id, [])
+        if exact == approx:
+            identical += 1
+        if exact:
+            overlap += len(set(exact) & set(approx)) / len(exact)
+    n = len(queries) or 1
+    return {
+        "candidate_pool": candidate_pool,
+        "overlap@k": overlap / n,
+        "identical_rate": identical / n,
+    }
 
 
 def _compute_metrics(queries: list[EvalQuery], ranked: dict[str, list[str]]) -> dict[str, float]:
@@ -155,13 +183,16 @@ def _misses(
     return misses
 
 
-def _weight_sweep(index: RetrievalIndex, queries: list[EvalQuery], top_k: int) -> list[dict]:
+def _weight_sweep(
+    index: RetrievalIndex,
+    queries: list[EvalQuery],
+    batch: BatchScores,
+    top_k: int,
+) -> list[dict]:
     weights = [0.0, 0.25, 0.5, 0.55, 0.75, 1.0]
     rows: list[dict] = []
     for w in weights:
-        ranked: dict[str, list[str]] = {}
-        for q in queries:
-            ranked[q.query_id] = _rank_hybrid(index, q.query, top_k=top_k, bm25_weight=w)
+        ranked = _rank_hybrid(index, queries, batch, top_k=top_k, bm25_weight=w)
         metrics = _compute_metrics(queries, ranked)
         rows.append({"bm25_weight": w, "embedding_weight": 1.0 - w, **metrics})
     return rows
@@ -178,14 +209,17 @@ def evaluate_retrieval(
     if not queries:
         raise ValueError("No evaluation queries were generated")
 
+    # Score every query once; all retrievers and sweep weights reuse these matrices.
+    batch = index.score_many([q.query for q in queries])
     bm25_ranked: dict[str, list[str]] = {}
     embedding_ranked: dict[str, list[str]] = {}
-    hybrid_ranked: dict[str, list[str]] = {}
-
-    for q in queries:
-        bm25_ranked[q.query_id] = _rank_bm25(index, q.query, top_k=top_k)
-        embedding_ranked[q.query_id] = _rank_embedding(index, q.query, top_k=top_k)
-        hybrid_ranked[q.query_id] = _rank_hybrid(index, q.query, top_k=top_k, bm25_weight=bm25_weight)
+    for q, bm25_row, emb_row in zip(queries, batch.bm25, batch.embedding, strict=True):
+        bm25_ranked[q.query_id] = _ranked_ids(index, bm25_row, top_k=top_k)
+        embedding_ranked[q.query_id] = _ranked_ids(index, emb_row, top_k=top_k)
+    hybrid_ranked = _rank_hybrid(index, queries, batch, top_k=top_k, bm25_weight=bm25_weight)
+    candidate_ranked = _rank_hybrid(
+        index, queries, batch, top_k=top_k, bm25_weight=bm25_weight, exact=False
+    )
 
     rows = [
         {"retriever": "bm25", **_compute_metrics(queries, bm25_ranked)},
@@ -193,7 +227,7 @@ def evaluate_retrieval(
         {"retriever": "hybrid_rrf", **_compute_metrics(queries, hybrid_ranked)},
     ]
 
-    sweep = _weight_sweep(index, queries, top_k=top_k)
+    sweep = _weight_sweep(index, queries, batch, top_k=top_k)
     best = max(sweep, key=lambda x: (x["mrr"], x["hit@k"]))
 
     slices = {
@@ -214,16 +248,22 @@ def evaluate_retrieval(
         "results": rows,
         "weight_sweep": sweep,
         "best_weight": best,
+        "candidate_fusion": _candidate_fusion_error(
+            queries, hybrid_ranked, candidate_ranked, candidate_pool=DEFAULT_CANDIDATE_POOL
+        ),
         "slices": slices,
         "errors": errors,
         "sample_queries": [q.__dict__ for q in queries[:5]],
     }
 
 
-def render_summary_markdown(payload: dict, ticker: str, form: str) -> str:
+def render_summary_markdown(
+    payload: dict, ticker: str, form: str, variant: str | None = None
+) -> str:
     lines = [
         f"\n## Retrieval Eval - {payload['timestamp']}",
         f"- Ticker/Form: `{ticker.upper()} {form}`",
+        *([f"- Chunking variant: `{variant}`"] if variant else []),
         f"- Queries: {payload['query_count']}",
         f"- Top-K: {payload['top_k']}",
         "",
@@ -244,12 +284,26 @@ def render_summary_markdown(payload: dict, ticker: str, form: str) -> str:
             f"- mrr: {best['mrr']:.4f}",
         ]
     )
+    candidate = payload.get("candidate_fusion")
+    if candidate:
+        lines.extend(
+            [
+                "",
+                "### Candidate Fusion vs Exact",
+                f"- candidate_pool: {candidate['candidate_pool']}",
+                f"- overlap@k: {candidate['overlap@k']:.4f}",
+                f"- identical_rate: {candidate['identical_rate']:.4f}",
+            ]
+        )
     return "\n".join(lines) + "\n"
 
 
-def render_error_analysis_markdown(payload: dict, ticker: str, form: str) -> str:
+def render_error_analysis_markdown(
+    payload: dict, ticker: str, form: str, variant: str | None = None
+) -> str:
+    label = f"{ticker.upper()} {form}" + (f", {variant}" if variant else "")
     lines = [
-        f"# Retrieval Error Analysis ({ticker.upper()} {form})",
+        f"# Retrieval Error Analysis ({label})",
         f"\nGenerated: {payload['timestamp']}",
         f"\nTop-K: {payload['top_k']} | Queries: {payload['query_count']}",
         "\n## By Query Type (hybrid)",
@@ -275,7 +329,8 @@ def render_error_analysis_markdown(payload: dict, ticker: str, form: str) -> str
             continue
         for m in misses[:10]:
             lines.append(
-                f"- `{m['query_id']}` ({m['query_type']}) expected `{m['expected_chunk_id']}` got {m['predicted_top_k']}"
+                f"- `{m['query_id']}` ({m['query_type']}) "
+                f"expected `{m['expected_chunk_id']}` got {m['predicted_top_k']}"
             )
             lines.append(f"  - Query: {m['query']}")
 
@@ -0,0 +1,519 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+from finance_report_assistant.core.config import settings
+from finance_report_assistant.ingestion.bulk import EdgarCatalog
+from finance_report_assistant.ingestion.edgar_ingest import (
+    DOCUMENT_FILE_NAME,
+    _filing_dir,
+    _filing_metadata,
+    _finish_filing,
+    _history_page_names,
+    _iter_filing_table,
+    _iter_recent_filings,
+    _needs_history,
+    _resolve_cik,
+    _take,
+    existing_accessions,
+)
+from finance_report_assistant.ingestion.http_cache import HttpCache
+from finance_report_assistant.ingestion.jobs import DEFAULT_MAX_ATTEMPTS, JobQueue
+from finance_report_assistant.ingestion.sec_client import (
+    DOWNLOAD_CHUNK_BYTES,
+    SEC_ARCHIVES_BASE,
+    SEC_DATA_SUBMISSIONS_URL,
+    submissions_page_url,
+)
+from finance_report_assistant.utils.compression import compressed_path, open_writer
+
+# SEC fair-access policy: at most 10 requests per second across all hosts.
+SEC_MAX_REQUESTS_PER_SECOND = 10.0
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PER_HOST_LIMIT = 4
+
+
+class TokenBucket:
+    """Async token bucket shared by every request of an ingestion run.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. The default capacity of
+    one token spaces requests evenly instead of allowing a burst at startup.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+class AsyncSecEdgarClient:
+    """Async SEC client: one pooled `httpx.AsyncClient`, a shared rate limiter, a global
+    concurrency cap and a per-host cap (data.sec.gov and www.sec.gov are limited separately).
+
+    The URL templates default to the live SEC hosts and can be pointed at a mirror or a mock.
+    Cache and file I/O runs in worker threads so it never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        user_agent: str | None = None,
+        timeout_s: float = 30.0,
+        max_requests_per_s: float = SEC_MAX_REQUESTS_PER_SECOND,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        submissions_url: str = SEC_DATA_SUBMISSIONS_URL,
+        archives_base: str = SEC_ARCHIVES_BASE,
+        use_cache: bool = True,
+        cache: HttpCache | None = None,
+    ) -> None:
+        self.user_agent = user_agent or settings.sec_user_agent
+        if cache is None and use_cache and settings.http_cache_mb > 0:
+            cache = HttpCache()
+        self.cache = cache
+        self.submissions_url = submissions_url
+        self.archives_base = archives_base
+        self.per_host_limit = per_host_limit
+        self._pages: dict[str, dict[str, Any]] = {}
+        self._limiter = TokenBucket(max_requests_per_s)
+        self._slots = asyncio.Semaphore(concurrency)
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self._client = httpx.AsyncClient(
+            timeout=timeout_s,
+            headers={"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate"},
+            limits=httpx.Limits(
+                max_connections=concurrency,
+                max_keepalive_connections=concurrency,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> AsyncSecEdgarClient:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:  # type: ignore[no-untyped-def]
+        await self.aclose()
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = asyncio.Semaphore(self.per_host_limit)
+            self._host_slots[host] = slot
+        return slot
+
+    def _cache_lookup(self, url: str, immutable: bool) -> tuple[httpx.Response | None, dict]:
+        if self.cache is None:
+            return None, {}
+        return self.cache.lookup(url, immutable=immutable)
+
+    def _cache_resolve(self, url: str, resp: httpx.Response) -> httpx.Response:
+        if self.cache is None:
+            return resp
+        return self.cache.resolve(url, resp)
+
+    async def _get(self, url: str, immutable: bool = False) -> httpx.Response:
+        cached, conditional = await asyncio.to_thread(self._cache_lookup, url, immutable)
+        if cached is not None:
+            return cached
+
+        async with self._slots, self._host_slot(url):
+            await self._limiter.acquire()
+            resp = await self._client.get(url, headers=conditional)
+        resp = await asyncio.to_thread(self._cache_resolve, url, resp)
+        resp.raise_for_status()
+        return resp
+
+    @retry(wait=wait_exponential(min=1, max=16), stop=stop_after_attempt(3), reraise=True)
+    async def get_submissions(self, cik: str) -> dict[str, Any]:
+        resp = await self._get(self.submissions_url.format(cik=cik.zfill(10)))
+        return resp.json()
+
+    @retry(wait=wait_exponential(min=1, max=16), stop=stop_after_attempt(3), reraise=True)
+    async def get_submissions_page(self, name: str) -> dict[str, Any]:
+        page = self._pages.get(name)
+        if page is None:
+            resp = await self._get(submissions_page_url(self.submissions_url, name))
+            page = self._pages[name] = resp.json()
+        return page
+
+    async def get_submissions_pages(self, names: list[str]) -> list[dict[str, Any]]:
+        return list(await asyncio.gather(*(self.get_submissions_page(n) for n in names)))
+
+    def archive_url(self, cik: str, accession_number: str, primary_document: str) -> str:
+        accession_no_dashes = accession_number.replace("-", "")
+        return f"{self.archives_base}/{int(cik)}/{accession_no_dashes}/{primary_document}"
+
+    @retry(wait=wait_exponential(min=1, max=16), stop=stop_after_attempt(3), reraise=True)
+    async def get_archive_document(
+        self, cik: str, accession_number: str, primary_document: str
+    ) -> str:
+        url = self.archive_url(cik, accession_number, primary_document)
+        resp = await self._get(url, immutable=True)
+        return resp.text
+
+    @retry(wait=wait_exponential(min=1, max=16), stop=stop_after_attempt(3), reraise=True)
+    async def download_archive_document(
+        self,
+        cik: str,
+        accession_number: str,
+        primary_document: str,
+        dest: Path,
+        compression: str = "gzip",
+    ) -> Path:
+        """Async counterpart of `SecEdgarClient.download_archive_document`."""
+        url = self.archive_url(cik, accession_number, primary_document)
+        target = compressed_path(dest, compression)
+        part_path = target.with_name(target.name + ".part")
+        if target.exists():
+            # Archive documents are immutable and `target` only appears after a full download.
+            return target
+
+        cached = (await asyncio.to_thread(self._cache_lookup, url, True))[0]
+        if cached is not None:
+            await asyncio.to_thread(_write_document, part_path, compression, cached.content)
+            part_path.replace(target)
+            return target
+
+        async with self._slots, self._host_slot(url):
+            await self._limiter.acquire()
+            async with self._client.stream("GET", url) as resp:
+                resp.raise_for_status()
+                out = await asyncio.to_thread(open_writer, part_path, compression)
+                try:
+                    async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                        await asyncio.to_thread(out.write, chunk)
+                finally:
+                    await asyncio.to_thread(out.close)
+        part_path.replace(target)
+        return target
+
+
+def _write_document(path: Path, compression: str, content: bytes) -> None:
+    with open_writer(path, compression) as out:
+        out.write(content)
+
+
+async def select_filings_async(
+    client: AsyncSecEdgarClient,
+    submissions: dict,
+    form: str,
+    limit: int | None = None,
+    since: str | None = None,
+    page_batch: int = 4,
+) -> list[dict]:
+    """Async counterpart of `edgar_ingest.select_filings`; history pages in a batch are
+    fetched concurrently."""
+    picked: list[dict] = []
+    _take(_iter_recent_filings(submissions, form), picked, limit, since)
+    if not _needs_history(submissions, picked, limit, since):
+        return picked
+
+    names = _history_page_names(submissions, since)
+    for start in range(0, len(names), page_batch):
+        for page in await client.get_submissions_pages(names[start : start + page_batch]):
+            _take(_iter_filing_table(page, form), picked, limit, since)
+        if limit is not None and len(picked) >= limit:
+            break
+    return picked
+
+
+@dataclass
+class IngestSummary:
+    written: list[Path] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failures: list[tuple[str, str]] = field(default_factory=list)
+    elapsed_s: float = 0.0
+    # Set for queue-backed runs: the run id and its job counts by status after this session.
+    run_id: int | None = None
+    queue_counts: dict[str, int] = field(default_factory=dict)
+
+    def counts(self) -> dict[str, int]:
+        return {
+            "added": len(self.written),
+            "skipped": len(self.skipped),
+            "failed": len(self.failures),
+        }
+
+    @property
+    def filings_per_s(self) -> float:
+        return len(self.written) / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+async def _ingest_filing(
+    client: AsyncSecEdgarClient, ticker: str, cik: str, form: str, filing: dict
+) -> Path:
+    metadata = _filing_metadata(ticker, cik, form, filing)
+    filing_dir = await asyncio.to_thread(_filing_dir, metadata)
+    document_path = await client.download_archive_document(
+        cik,
+        metadata.accession_number,
+        metadata.primary_document,
+        dest=filing_dir / DOCUMENT_FILE_NAME,
+        compression=settings.raw_compression,
+    )
+    return await asyncio.to_thread(_finish_filing, metadata, document_path)
+
+
+async def _plan_ticker(
+    client: AsyncSecEdgarClient,
+    ticker: str,
+    forms: list[str],
+    limit: int,
+    summary: IngestSummary,
+    incremental: bool = False,
+    since: str | None = None,
+    catalog: EdgarCatalog | None = None,
+) -> tuple[list[tuple[str, str, dict]], list[tuple[str, str]]]:
+    """Select the filings to download for `ticker` as `(cik, form, filing)` tuples.
+
+    Returns them with the `(label, error)` failures met along the way.
+    """
+    try:
+        cik = _resolve_cik(ticker)
+        if catalog is not None:
+            submissions = catalog.submissions(cik, forms)
+        else:
+            submissions = await client.get_submissions(cik)
+    except Exception as exc:  # noqa: BLE001 - one bad ticker must not stop the batch
+        return [], [(ticker.upper(), f"{type(exc).__name__}: {exc}")]
+
+    planned = []
+    failures: list[tuple[str, str]] = []
+    for form in forms:
+        on_disk: set[str] = set()
+        if incremental:
+            on_disk = await asyncio.to_thread(existing_accessions, ticker, form)
+        try:
+            picked = await select_filings_async(client, submissions, form, limit, since)
+        except Exception as exc:  # noqa: BLE001
+            failures.append((f"{ticker.upper()} {form}", f"{type(exc).__name__}: {exc}"))
+            continue
+        for filing in picked:
+            if filing["accession_number"] in on_disk:
+                summary.skipped.append(f"{ticker.upper()} {form} {filing['accession_number']}")
+                continue
+            planned.append((cik, form, filing))
+    return planned, failures
+
+
+async def _ingest_ticker(
+    client: AsyncSecEdgarClient,
+    ticker: str,
+    forms: list[str],
+    limit: int,
+    summary: IngestSummary,
+    incremental: bool = False,
+    since: str | None = None,
+    catalog: EdgarCatalog | None = None,
+) -> None:
+    planned, failures = await _plan_ticker(
+        client, ticker, forms, limit, summary, incremental, since, catalog
+    )
+    summary.failures.extend(failures)
+    results = await asyncio.gather(
+        *(_ingest_filing(client, ticker, cik, form, filing) for cik, form, filing in planned),
+        return_exceptions=True,
+    )
+    for (_, form, filing), result in zip(planned, results, strict=True):
+        if isinstance(result, BaseException):
+            label = f"{ticker.upper()} {form} {filing['accession_number']}"
+            summary.failures.append((label, f"{type(result).__name__}: {result}"))
+        else:
+            summary.written.append(result)
+
+
+async def _enqueue_ticker(
+    client: AsyncSecEdgarClient,
+    queue: JobQueue,
+    run_id: int,
+    ticker: str,
+    forms: list[str],
+    limit: int,
+    summary: IngestSummary,
+    incremental: bool = False,
+    since: str | None = None,
+    catalog: EdgarCatalog | None = None,
+) -> None:
+    planned, failures = await _plan_ticker(
+        client, ticker, forms, limit, summary, incremental, since, catalog
+    )
+    summary.failures.extend(failures)
+    error = "; ".join(f"{label}: {message}" for label, message in failures) or None
+    await asyncio.to_thread(queue.enqueue, run_id, ticker.upper(), planned, error)
+
+
+async def _drain_queue(
+    client: AsyncSecEdgarClient,
+    queue: JobQueue,
+    run_id: int,
+    workers: int,
+    summary: IngestSummary,
+) -> None:
+    """Download the pending jobs of `run_id` with `workers` concurrent workers.
+
+    Every status change is committed as it happens (in a worker thread, off the event loop),
+    so the queue is an exact checkpoint if the process dies. The client's limiter and
+    semaphores still bound the request rate.
+    """
+
+    async def worker() -> None:
+        while (job := await asyncio.to_thread(queue.claim, run_id)) is not None:
+            try:
+                path = await _ingest_filing(client, job.ticker, job.cik, job.form, job.filing)
+            except Exception as exc:  # noqa: BLE001 - recorded on the job, run continues
+                error = f"{type(exc).__name__}: {exc}"
+                await asyncio.to_thread(queue.fail, job, error)
+                summary.failures.append((job.label, error))
+            else:
+                await asyncio.to_thread(queue.complete, job)
+                summary.written.append(path)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+
+async def ingest_filings_async(
+    tickers: list[str],
+    forms: list[str],
+    limit: int = 1,
+    client: AsyncSecEdgarClient | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    incremental: bool = False,
+    since: str | None = None,
+    use_catalog: bool = False,
+    queue: JobQueue | None = None,
+    resume: bool = False,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> IngestSummary:
+    """Fetch the `limit` most recent filings of each form for every ticker concurrently.
+
+    Submissions are requested once per ticker and shared across forms; older history pages
+    are only pulled when `limit` or `since` reaches past the recent block. With `use_catalog`
+    filings are selected from the bulk catalog (`fra load-bulk`) instead, so only documents
+    are downloaded. Failures are recorded per ticker or per filing in the summary instead of
+    aborting the run. With `incremental`, accessions already on disk (see
+    `existing_accessions`) are skipped.
+
+    With a `queue`, the selected filings are first recorded as jobs of a new run and then
+    drained by `concurrency` workers. `resume` continues the latest run of the queue instead:
+    tickers whose planning never finished or failed are planned again with the run's own
+    parameters, and interrupted jobs and failed jobs with fewer than `max_attempts` attempts
+    are downloaded again.
+    """
+    owns_client = client is None
+    sec_client = client or AsyncSecEdgarClient(concurrency=concurrency)
+    catalog = EdgarCatalog() if use_catalog and not resume else None
+    summary = IngestSummary()
+    started = time.perf_counter()
+    unique_tickers = dict.fromkeys(t.upper() for t in tickers)
+    try:
+        if queue is None:
+            await asyncio.gather(
+                *(
+                    _ingest_ticker(
+                        sec_client, t, forms, limit, summary, incremental, since, catalog
+                    )
+                    for t in unique_tickers
+                )
+            )
+        else:
+            if resume:
+                run_id = queue.latest_run()
+                if run_id is None:
+                    raise ValueError(f"No ingest run to resume in {queue.path}")
+                queue.requeue(run_id, max_attempts)
+                params = queue.run_params(run_id)
+            else:
+                params = {
+                    "forms": forms,
+                    "limit": limit,
+                    "since": since,
+                    "incremental": incremental,
+                    "use_catalog": use_catalog,
+                }
+                run_id = queue.new_run(tickers=list(unique_tickers), **params)
+            unplanned = queue.claim_plans(run_id)
+            if unplanned and params.get("use_catalog") and catalog is None:
+                catalog = EdgarCatalog()
+            await asyncio.gather(
+                *(
+                    _enqueue_ticker(
+                        sec_client,
+                        queue,
+                        run_id,
+                        t,
+                        params["forms"],
+                        params["limit"],
+                        summary,
+                        params.get("incremental", False),
+                        params.get("since"),
+                        catalog,
+                    )
+                    for t in unplanned
+                )
+            )
+            summary.run_id = run_id
+            await _drain_queue(sec_client, queue, run_id, concurrency, summary)
+            summary.queue_counts = queue.counts(run_id)
+    finally:
+        if catalog is not None:
+            catalog.close()
+        if owns_client:
+            await sec_client.aclose()
+    summary.written.sort()
+    summary.skipped.sort()
+    summary.elapsed_s = time.perf_counter() - started
+    return summary
+
+
+def ingest_filings_concurrently(
+    tickers: list[str],
+    forms: list[str],
+    limit: int = 1,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    incremental: bool = False,
+    since: str | None = None,
+    use_catalog: bool = False,
+    queue_path: Path | None = None,
+    resume: bool = False,
+) -> IngestSummary:
+    """Blocking entry point for `ingest_filings_async` (used by the CLI); always runs through
+    the persistent job queue at `queue_path` (default `data/state/ingest_jobs.sqlite`)."""
+    with JobQueue(queue_path) as queue:
+        return asyncio.run(
+            ingest_filings_async(
+                tickers=tickers,
+                forms=forms,
+                limit=limit,
+                concurrency=concurrency,
+                incremental=incremental,
+                since=since,
+                use_catalog=use_catalog,
+                queue=queue,
+                resume=resume,
+            )
+        )
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+import zipfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from finance_report_assistant.core.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    cik INTEGER PRIMARY KEY,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS tickers (
+    ticker TEXT PRIMARY KEY,
+    cik INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS filings (
+    cik INTEGER NOT NULL,
+    form TEXT NOT NULL,
+    filing_date TEXT NOT NULL,
+    accession_number TEXT NOT NULL,
+    report_date TEXT,
+    primary_document TEXT,
+    primary_doc_description TEXT,
+    PRIMARY KEY (cik, form, filing_date, accession_number)
+) WITHOUT ROWID;
+"""
+# Columns of a `filings.recent` block / history page, in `filings` table order after `cik`.
+_FILING_COLUMNS = (
+    ("form", "form"),
+    ("filingDate", "filing_date"),
+    ("accessionNumber", "accession_number"),
+    ("reportDate", "report_date"),
+    ("primaryDocument", "primary_document"),
+    ("primaryDocDescription", "primary_doc_description"),
+)
+_INSERT_BATCH = 5_000
+
+
+def default_catalog_path() -> Path:
+    return settings.data_dir / "catalog" / "edgar.sqlite"
+
+
+@dataclass
+class BulkLoadReport:
+    companies: int = 0
+    tickers: int = 0
+    filings: int = 0
+    zip_entries: int = 0
+    skipped_entries: int = 0
+    elapsed_s: float = 0.0
+
+
+def _cik_from_entry_name(name: str) -> int | None:
+    # "CIK0000320193.json" or "CIK0000320193-submissions-001.json"
+    stem = Path(name).name.removeprefix("CIK").split("-", 1)[0].removesuffix(".json")
+    return int(stem) if stem.isdigit() else None
+
+
+def _filing_rows(cik: int, table: dict) -> Iterator[tuple]:
+    columns = [table.get(key) or [] for key, _ in _FILING_COLUMNS]
+    forms, filing_dates, accession_numbers = columns[0], columns[1], columns[2]
+    for idx in range(min(len(forms), len(filing_dates), len(accession_numbers))):
+        yield (cik, *(col[idx] if idx < len(col) else None for col in columns))
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def load_bulk(
+    submissions_zip: Path | None = None,
+    company_tickers: Path | None = None,
+    catalog_path: Path | None = None,
+    forms: set[str] | None = None,
+) -> BulkLoadReport:
+    """Load SEC bulk archives into the SQLite ticker -> CIK -> filings catalog.
+
+    `submissions_zip` is the nightly `submissions.zip` (one `CIK##########.json` per company
+    plus `-submissions-NNN.json` history pages); entries are decompressed and parsed one at a
+    time, so memory stays at the size of the largest entry. `company_tickers` is
+    `company_tickers.json`. Filings can be restricted to `forms`. Loading is idempotent:
+    rows are upserted, so a newer archive refreshes an existing catalog.
+    """
+    started = time.perf_counter()
+    report = BulkLoadReport()
+    conn = _connect(catalog_path or default_catalog_path())
+    # One transaction for the whole load: a failed load leaves the previous catalog intact.
+    try:
+        with conn:
+            if company_tickers is not None:
+                _load_company_tickers(conn, company_tickers, report)
+            if submissions_zip is not None:
+                _load_submissions_zip(conn, submissions_zip, forms, report)
+    finally:
+        conn.close()
+    report.elapsed_s = time.perf_counter() - started
+    return report
+
+
+def _load_company_tickers(conn: sqlite3.Connection, path: Path, report: BulkLoadReport) -> None:
+    # {"0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."}, ...}
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    rows = payload.values() if isinstance(payload, dict) else payload
+    companies: dict[int, str] = {}
+    tickers: list[tuple[str, int]] = []
+    for row in rows:
+        cik = int(row["cik_str"])
+        companies.setdefault(cik, row.get("title") or "")
+        tickers.append((str(row["ticker"]).upper(), cik))
+    conn.executemany(
+        "INSERT INTO companies (cik, name) VALUES (?, ?) "
+        "ON CONFLICT(cik) DO UPDATE SET name = excluded.name",
+        companies.items(),
+    )
+    conn.executemany("INSERT OR REPLACE INTO tickers (ticker, cik) VALUES (?, ?)", tickers)
+    report.companies += len(companies)
+    report.tickers += len(tickers)
+
+
+def _load_submissions_zip(
+    conn: sqlite3.Connection, path: Path, forms: set[str] | None, report: BulkLoadReport
+) -> None:
+    batch: list[tuple] = []
+
+    def flush() -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO filings VALUES (?, ?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        report.filings += len(batch)
+        batch.clear()
+
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            cik = _cik_from_entry_name(info.filename)
+            if info.is_dir() or cik is None:
+                report.skipped_entries += 1
+                continue
+            with archive.open(info) as entry:
+                try:
+                    payload = json.load(entry)
+                except ValueError:
+                    report.skipped_entries += 1
+                    continue
+            report.zip_entries += 1
+
+            if "filings" in payload:
+                table = payload["filings"].get("recent") or {}
+                if payload.get("name"):
+                    conn.execute(
+                        "INSERT OR REPLACE INTO companies (cik, name) VALUES (?, ?)",
+                        (cik, payload["name"]),
+                    )
+                    report.companies += 1
+                conn.executemany(
+                    "INSERT OR IGNORE INTO tickers (ticker, cik) VALUES (?, ?)",
+                    [(str(t).upper(), cik) for t in payload.get("tickers") or []],
+                )
+            else:
+                table = payload  # history page: a bare columnar filing table
+
+            for row in _filing_rows(cik, table):
+                if forms is None or row[1] in forms:
+                    batch.append(row)
+            if len(batch) >= _INSERT_BATCH:
+                flush()
+    flush()
+
+
+class EdgarCatalog:
+    """Read side of the bulk catalog built by `load_bulk`."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or default_catalog_path()
+        if not self.path.exists():
+            raise FileNotFoundError(f"No EDGAR catalog at {self.path}; run `fra load-bulk` first")
+        self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> EdgarCatalog:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:  # type: ignore[no-untyped-def]
+        self.close()
+
+    def lookup_cik(self, ticker: str) -> str | None:
+        """Zero-padded CIK for `ticker`, or None when the catalog does not know it."""
+        row = self._conn.execute(
+            "SELECT cik FROM tickers WHERE ticker = ?", (ticker.upper(),)
+        ).fetchone()
+        return f"{row[0]:010d}" if row else None
+
+    def company_name(self, cik: str) -> str | None:
+        row = self._conn.execute("SELECT name FROM companies WHERE cik = ?", (int(cik),)).fetchone()
+        return row[0] if row else None
+
+    def submissions(self, cik: str, forms: list[str] | None = None) -> dict:
+        """All catalogued filings of `cik` (optionally only `forms`), newest first, shaped
+        like a submissions JSON whose `filings.recent` block holds the full history."""
+        query = f"SELECT {', '.join(col for _, col in _FILING_COLUMNS)} FROM filings WHERE cik = ?"
+        params: list = [int(cik)]
+        if forms:
+            query += f" AND form IN ({', '.join('?' * len(forms))})"
+            params.extend(forms)
+        query += " ORDER BY filing_date DESC, accession_number DESC"
+
+        recent: dict[str, list] = {key: [] for key, _ in _FILING_COLUMNS}
+        for row in self._conn.execute(query, params):
+            for (key, _), value in zip(_FILING_COLUMNS, row, strict=True):
+                recent[key].append(value)
+        return {"cik": cik, "name": self.company_name(cik), "filings": {"recent": recent}}
+
+    def counts(self) -> dict[str, int]:
+        return {
+            table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("companies", "tickers", "filings")
+        }
+
+
+def lookup_catalog_cik(ticker: str, path: Path | None = None) -> str | None:
+    """CIK for `ticker` from the bulk catalog, or None when there is no catalog or no match."""
+    path = path or default_catalog_path()
+    if not path.exists():
+        return None
+    with EdgarCatalog(path) as catalog:
+        return catalog.lookup_cik(ticker)
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 
+from finance_report_assistant.core.config import settings
 from finance_report_assistant.core.models import FilingMetadata
+from finance_report_assistant.ingestion.bulk import lookup_catalog_cik
 from finance_report_assistant.ingestion.sec_client import SEC_ARCHIVES_BASE, SecEdgarClient
+from finance_report_assistant.utils.compression import COMPRESSION_SUFFIXES
 from finance_report_assistant.utils.paths import raw_filing_dir
 
+DOCUMENT_FILE_NAME = "primary_document.html"
+
 # Expanded starter universe for MVP demo UI.
 COMPANY_UNIVERSE: dict[str, dict[str, str]] = {
     "AAPL": {"name": "Apple Inc.", "cik": "0000320193"},
@@ -25,17 +32,17 @@ TICKER_TO_CIK = {ticker: meta["cik"] for ticker, meta in COMPANY_UNIVERSE.items(
 TICKER_TO_NAME = {ticker: meta["name"] for ticker, meta in COMPANY_UNIVERSE.items()}
 
 
-def _iter_recent_filings(submissions: dict, form: str):
-    recent = submissions.get("filings", {}).get("recent", {})
-    forms = recent.get("form", [])
-    accession_numbers = recent.get("accessionNumber", [])
-    filing_dates = recent.get("filingDate", [])
-    report_dates = recent.get("reportDate", [])
-    primary_documents = recent.get("primaryDocument", [])
-    primary_doc_descriptions = recent.get("primaryDocDescription", [])
-
-    for idx, recent_form in enumerate(forms):
-        if recent_form != form:
+def _iter_filing_table(table: dict, form: str):
+    """Yield filings of `form` from one columnar block (`filings.recent` or a history page)."""
+    forms = table.get("form", [])
+    accession_numbers = table.get("accessionNumber", [])
+    filing_dates = table.get("filingDate", [])
+    report_dates = table.get("reportDate", [])
+    primary_documents = table.get("primaryDocument", [])
+    primary_doc_descriptions = table.get("primaryDocDescription", [])
+
+    for idx, table_form in enumerate(forms):
+        if table_form != form:
             continue
         yield {
             "accession_number": accession_numbers[idx],
@@ -48,17 +55,156 @@ def _iter_recent_filings(submissions: dict, form: str):
         }
 
 
+def _iter_recent_filings(submissions: dict, form: str):
+    yield from _iter_filing_table(submissions.get("filings", {}).get("recent", {}), form)
+
+
+def _history_page_names(submissions: dict, since: str | None = None) -> list[str]:
+    """Names of the `filings.files` history pages, newest first, that can hold filings on or
+    after `since` (ISO date)."""
+    pages = submissions.get("filings", {}).get("files") or []
+    pages = sorted(pages, key=lambda page: page.get("filingTo", ""), reverse=True)
+    return [
+        page["name"] for page in pages if since is None or page.get("filingTo", "") >= since
+    ]
+
+
+def _needs_history(
+    submissions: dict, picked: list[dict], limit: int | None, since: str | None
+) -> bool:
+    """Whether history pages can contribute: the limit is not met yet (or a date range was
+    asked for) and the recent block does not already reach back past `since`."""
+    if limit is not None and len(picked) >= limit:
+        return False
+    if limit is None and since is None:
+        return False
+    if since is not None:
+        recent_dates = submissions.get("filings", {}).get("recent", {}).get("filingDate") or []
+        if recent_dates and min(recent_dates) < since:
+            return False
+    return True
+
+
+def _take(filings, picked: list[dict], limit: int | None, since: str | None) -> None:
+    for filing in filings:
+        if limit is not None and len(picked) >= limit:
+            return
+        if since is None or filing["filing_date"] >= since:
+            picked.append(filing)
+
+
+def select_filings(
+    submissions: dict,
+    form: str,
+    limit: int | None = None,
+    since: str | None = None,
+    fetch_pages: Callable[[list[str]], list[dict]] | None = None,
+    page_batch: int = 4,
+) -> list[dict]:
+    """Pick filings of `form`, newest first, up to `limit` and back to `since`.
+
+    The `filings.recent` block is used first. History pages from `filings.files` are only
+    requested through `fetch_pages` (names in, page dicts out, same order) when the recent
+    block cannot satisfy the request, newest page first and `page_batch` pages per call.
+    With neither `limit` nor `since` only the recent block is returned.
+    """
+    picked: list[dict] = []
+    _take(_iter_recent_filings(submissions, form), picked, limit, since)
+    if fetch_pages is None or not _needs_history(submissions, picked, limit, since):
+        return picked
+
+    names = _history_page_names(submissions, since)
+    for start in range(0, len(names), page_batch):
+        for page in fetch_pages(names[start : start + page_batch]):
+            _take(_iter_filing_table(page, form), picked, limit, since)
+        if limit is not None and len(picked) >= limit:
+            break
+    return picked
+
+
+def _resolve_cik(ticker: str) -> str:
+    """CIK from the starter universe, falling back to the bulk catalog (`fra load-bulk`)."""
+    ticker_up = ticker.upper()
+    if ticker_up in TICKER_TO_CIK:
+        return TICKER_TO_CIK[ticker_up]
+    cik = lookup_catalog_cik(ticker_up)
+    if cik is None:
+        raise ValueError(
+            f"Ticker '{ticker}' is not in MVP allowlist: {sorted(TICKER_TO_CIK)} "
+            "nor in the bulk catalog (see `fra load-bulk`)"
+        )
+    return cik
+
+
+def _filing_metadata(ticker: str, cik: str, form: str, filing: dict) -> FilingMetadata:
+    accession_number = filing["accession_number"]
+    primary_document = filing["primary_document"]
+    archive_url = (
+        f"{SEC_ARCHIVES_BASE}/{int(cik)}/{accession_number.replace('-', '')}/{primary_document}"
+    )
+    return FilingMetadata(
+        ticker=ticker.upper(),
+        cik=cik,
+        form=form,
+        accession_number=accession_number,
+        filing_date=filing["filing_date"],
+        report_date=filing.get("report_date"),
+        primary_document=primary_document,
+        primary_doc_description=filing.get("primary_doc_description"),
+        sec_archive_url=archive_url,
+    )
+
+
+def _filing_dir(metadata: FilingMetadata) -> Path:
+    out_dir = raw_filing_dir(metadata.ticker, metadata.form, metadata.accession_number)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    return out_dir
+
+
+def _finish_filing(metadata: FilingMetadata, document_path: Path) -> Path:
+    """Write metadata and, last, the manifest for a filing whose document is on disk."""
+    out_dir = document_path.parent
+    # Drop copies of the document stored under another codec by earlier runs.
+    for suffix in COMPRESSION_SUFFIXES.values():
+        stale = out_dir / (DOCUMENT_FILE_NAME + suffix)
+        if stale != document_path:
+            stale.unlink(missing_ok=True)
+
+    metadata_path = out_dir / "filing_metadata.json"
+    metadata_path.write_text(metadata.model_dump_json(indent=2), encoding="utf-8")
+
+    manifest_path = out_dir / "manifest.json"
+    manifest = {
+        "ticker": metadata.ticker,
+        "form": metadata.form,
+        "accession_number": metadata.accession_number,
+        "files": [metadata_path.name, document_path.name],
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return out_dir
+
+
+def _ingest_filing(
+    sec_client: SecEdgarClient, ticker: str, cik: str, form: str, filing: dict
+) -> Path:
+    metadata = _filing_metadata(ticker, cik, form, filing)
+    document_path = sec_client.download_archive_document(
+        cik,
+        metadata.accession_number,
+        metadata.primary_document,
+        dest=_filing_dir(metadata) / DOCUMENT_FILE_NAME,
+        compression=settings.raw_compression,
+    )
+    return _finish_filing(metadata, document_path)
+
+
 def ingest_filings_for_ticker(
     ticker: str,
     form: str = "10-K",
     limit: int = 1,
     client: SecEdgarClient | None = None,
 ) -> list[Path]:
-    ticker_up = ticker.upper()
-    if ticker_up not in TICKER_TO_CIK:
-        raise ValueError(f"Ticker '{ticker}' is not in MVP allowlist: {sorted(TICKER_TO_CIK)}")
-
-    cik = TICKER_TO_CIK[ticker_up]
+    cik = _resolve_cik(ticker)
 
     owns_client = client is None
     sec_client = client or SecEdgarClient()
@@ -66,50 +212,90 @@ def ingest_filings_for_ticker(
 
     try:
         submissions = sec_client.get_submissions(cik)
-        picked = list(_iter_recent_filings(submissions, form=form))[:limit]
+        picked = select_filings(
+            submissions, form, limit=limit, fetch_pages=sec_client.get_submissions_pages
+        )
 
         for filing in picked:
-            accession_number = filing["accession_number"]
-            primary_document = filing["primary_document"]
-            archive_url = (
-                f"{SEC_ARCHIVES_BASE}/{int(cik)}/{accession_number.replace('-', '')}/{primary_document}"
-            )
-
-            metadata = FilingMetadata(
-                ticker=ticker_up,
-                cik=cik,
-                form=form,
-                accession_number=accession_number,
-                filing_date=filing["filing_date"],
-                report_date=filing.get("report_date"),
-                primary_document=primary_document,
-                primary_doc_description=filing.get("primary_doc_description"),
-                sec_archive_url=archive_url,
-            )
-
-            html = sec_client.get_archive_document(cik, accession_number, primary_document)
-
-            out_dir = raw_filing_dir(ticker_up, form, accession_number)
-            out_dir.mkdir(parents=True, exist_ok=True)
-
-            metadata_path = out_dir / "filing_metadata.json"
-            metadata_path.write_text(metadata.model_dump_json(indent=2), encoding="utf-8")
-
-            html_path = out_dir / "primary_document.html"
-            html_path.write_text(html, encoding="utf-8")
-
-            manifest_path = out_dir / "manifest.json"
-            manifest = {
-                "ticker": ticker_up,
-                "form": form,
-                "accession_number": accession_number,
-                "files": [metadata_path.name, html_path.name],
-            }
-            manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
-
-            written_paths.append(out_dir)
+            written_paths.append(_ingest_filing(sec_client, ticker, cik, form, filing))
 
         return written_paths
     finally:
         if owns_client:
             sec_client.close()
+
+
+def existing_accessions(ticker: str, form: str) -> set[str]:
+    """Accession numbers already ingested for `(ticker, form)`.
+
+    A filing counts as ingested when its `manifest.json` exists and every file it lists is
+    present. `_finish_filing` writes the manifest last, so interrupted downloads are retried.
+    """
+    form_dir = raw_filing_dir(ticker, form, "_").parent
+    if not form_dir.exists():
+        return set()
+
+    out: set[str] = set()
+    for manifest_path in form_dir.glob("*/manifest.json"):
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        files = manifest.get("files") or []
+        if files and all((manifest_path.parent / name).exists() for name in files):
+            out.add(manifest.get("accession_number") or manifest_path.parent.name)
+    return out
+
+
+@dataclass
+class SyncReport:
+    added: list[Path] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failed: list[tuple[str, str]] = field(default_factory=list)
+
+    def counts(self) -> dict[str, int]:
+        return {"added": len(self.added), "skipped": len(self.skipped), "failed": len(self.failed)}
+
+
+def sync_filings_for_ticker(
+    ticker: str,
+    form: str = "10-K",
+    limit: int | None = None,
+    client: SecEdgarClient | None = None,
+    since: str | None = None,
+) -> SyncReport:
+    """Download only the filings in the submissions feed that are not on disk yet.
+
+    Considers the `limit` most recent filings of `form` filed on or after `since` (see
+    `select_filings`; the recent block only when both are None), diffs their accession numbers
+    against `existing_accessions` and fetches the rest. A failed download is recorded and does
+    not stop the remaining ones.
+    """
+    cik = _resolve_cik(ticker)
+    owns_client = client is None
+    sec_client = client or SecEdgarClient()
+    report = SyncReport()
+
+    try:
+        on_disk = existing_accessions(ticker, form)
+        picked = select_filings(
+            sec_client.get_submissions(cik),
+            form,
+            limit=limit,
+            since=since,
+            fetch_pages=sec_client.get_submissions_pages,
+        )
+
+        for filing in picked:
+            accession_number = filing["accession_number"]
+            if accession_number in on_disk:
+                report.skipped.append(accession_number)
+                continue
+            try:
+                report.added.append(_ingest_filing(sec_client, ticker, cik, form, filing))
+            except Exception as exc:  # noqa: BLE001 - keep syncing the other filings
+                report.failed.append((accession_number, f"{type(exc).__name__}: {exc}"))
+        return report
+    finally:
+        if owns_client:
+            sec_client.close()
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import httpx
+
+from finance_report_assistant.core.config import settings
+
+# Response headers worth replaying from cache; content is stored decoded, so no encodings.
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stored: int = 0
+    evicted: int = 0
+
+
+def default_http_cache_dir() -> Path:
+    return settings.data_dir / "cache" / "http"
+
+
+class HttpCache:
+    """Persistent GET response cache keyed by URL.
+
+    Each entry is a `<sha256>.body` file plus a `<sha256>.json` sidecar with the URL, kept
+    headers and fetch time. Entries with an ETag or Last-Modified are revalidated with
+    `If-None-Match` / `If-Modified-Since`; immutable URLs (EDGAR archive documents never change
+    once an accession is published) are served without touching the network. Reads refresh
+    the body's mtime, and once the bodies exceed `max_bytes` the least recently used entries
+    are deleted. One cache may be shared by worker threads; its operations are serialized.
+    """
+
+    def __init__(self, root: Path | None = None, max_bytes: int | None = None) -> None:
+        self.root = root or default_http_cache_dir()
+        self.max_bytes = max_bytes if max_bytes is not None else settings.http_cache_mb * 2**20
+        self.stats = CacheStats()
+        self._size: int | None = None
+        self._lock = threading.RLock()
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / f"{key}.body", self.root / f"{key}.json"
+
+    def _load(self, url: str) -> tuple[dict, bytes] | None:
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        os.utime(body_path)
+        return meta, body
+
+    @staticmethod
+    def _response(url: str, meta: dict, body: bytes) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers=meta.get("headers", {}),
+            content=body,
+            request=httpx.Request("GET", url),
+        )
+
+    def lookup(self, url: str, immutable: bool = False) -> tuple[httpx.Response | None, dict]:
+        """Return `(cached_response, {})` for a fresh immutable hit, else `(None, headers)`
+        with the conditional request headers to send (empty when nothing is cached)."""
+        with self._lock:
+            entry = self._load(url)
+            if entry is None:
+                return None, {}
+            meta, body = entry
+            if immutable:
+                self.stats.hits += 1
+                return self._response(url, meta, body), {}
+        headers = meta.get("headers", {})
+        conditional = {}
+        if "etag" in headers:
+            conditional["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            conditional["If-Modified-Since"] = headers["last-modified"]
+        return None, conditional
+
+    def resolve(self, url: str, resp: httpx.Response) -> httpx.Response:
+        """Turn a network response into the response to use: replay the cached body on
+        `304 Not Modified`, store successful responses, pass everything else through."""
+        with self._lock:
+            if resp.status_code == 304:
+                entry = self._load(url)
+                if entry is not None:
+                    self.stats.revalidated += 1
+                    return self._response(url, *entry)
+            self.stats.misses += 1
+            if resp.status_code == 200:
+                self.store(url, resp)
+            return resp
+
+    def store(self, url: str, resp: httpx.Response) -> None:
+        with self._lock:
+            self._store(url, resp)
+
+    def _store(self, url: str, resp: httpx.Response) -> None:
+        body_path, meta_path = self._paths(url)
+        self.root.mkdir(parents=True, exist_ok=True)
+        current = self.size_bytes()
+        previous = body_path.stat().st_size if body_path.exists() else 0
+        meta = {
+            "url": url,
+            "headers": {k: resp.headers[k] for k in _KEPT_HEADERS if k in resp.headers},
+            "fetched_at": time.time(),
+        }
+        for path, payload in ((body_path, resp.content), (meta_path, json.dumps(meta).encode())):
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_bytes(payload)
+            tmp_path.replace(path)
+        self.stats.stored += 1
+        self._size = current - previous + len(resp.content)
+        if self._size > self.max_bytes:
+            self._evict(keep=body_path)
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            if self._size is None:
+                self._size = sum(p.stat().st_size for p in self.root.glob("*.body"))
+            return self._size
+
+    def _evict(self, keep: Path) -> None:
+        entries = sorted(
+            ((p.stat().st_mtime, p.stat().st_size, p) for p in self.root.glob("*.body")),
+            key=lambda e: e[0],
+        )
+        size = sum(e[1] for e in entries)
+        for _, nbytes, body_path in entries:
+            if size <= self.max_bytes:
+                break
+            if body_path == keep:
+                continue
+            body_path.unlink(missing_ok=True)
+            body_path.with_suffix(".json").unlink(missing_ok=True)
+            size -= nbytes
+            self.stats.evicted += 1
+        self._size = size
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.root.glob("*.*"):
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+    def summary(self) -> dict[str, int]:
+        return {**asdict(self.stats), "size_bytes": self.size_bytes()}
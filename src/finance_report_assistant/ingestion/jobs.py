@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from finance_report_assistant.core.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    params TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    ticker TEXT NOT NULL,
+    form TEXT NOT NULL,
+    accession_number TEXT NOT NULL,
+    cik TEXT NOT NULL,
+    filing TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, ticker, form, accession_number)
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (run_id, status);
+CREATE TABLE IF NOT EXISTS plans (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    ticker TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, ticker)
+);
+"""
+JOB_STATUSES = ("pending", "running", "done", "failed")
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def default_job_queue_path() -> Path:
+    return settings.data_dir / "state" / "ingest_jobs.sqlite"
+
+
+@dataclass
+class Job:
+    run_id: int
+    ticker: str
+    form: str
+    accession_number: str
+    cik: str
+    filing: dict
+    attempts: int
+
+    @property
+    def key(self) -> tuple[int, str, str, str]:
+        return self.run_id, self.ticker, self.form, self.accession_number
+
+    @property
+    def label(self) -> str:
+        return f"{self.ticker} {self.form} {self.accession_number}"
+
+
+class JobQueue:
+    """Persistent (ticker, form, accession) download queue for `fra ingest`.
+
+    Each ingest run gets a `run_id` and one plan per ticker. Planning (selecting a ticker's
+    filings) moves its plan to `done` in the same transaction that enqueues the filings as
+    `pending` jobs, or to `failed` when selection failed. Workers move jobs to `running` and
+    then `done` or `failed`, committing every transition. A run killed halfway therefore
+    leaves its unplanned tickers and remaining jobs in the database, and `requeue` puts
+    interrupted (`running`) plans and jobs, and failed ones with attempts left, back to
+    `pending` so `fra ingest --resume` can finish them. The async ingest updates the queue
+    from worker threads, so calls on one queue are serialized.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or default_job_queue_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> JobQueue:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:  # type: ignore[no-untyped-def]
+        self.close()
+
+    def new_run(self, tickers: Sequence[str] = (), **params: object) -> int:
+        """Record a run with its selection `params` and a pending plan for each ticker."""
+        now = time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO runs (created_at, params) VALUES (?, ?)",
+                (now, json.dumps({"tickers": list(tickers), **params}, sort_keys=True)),
+            )
+            run_id = cur.lastrowid
+            assert run_id is not None  # set by every successful INSERT
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO plans (run_id, ticker, updated_at) VALUES (?, ?, ?)",
+                [(run_id, ticker, now) for ticker in tickers],
+            )
+        return run_id
+
+    def latest_run(self) -> int | None:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(run_id) FROM runs").fetchone()
+        return row[0]
+
+    def run_params(self, run_id: int) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT params FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def claim_plans(self, run_id: int) -> list[str]:
+        """Mark every pending plan of `run_id` as running and return their tickers."""
+        with self._lock, self._conn:
+            tickers = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT ticker FROM plans WHERE run_id = ? AND status = 'pending' "
+                    "ORDER BY rowid",
+                    (run_id,),
+                )
+            ]
+            self._conn.execute(
+                "UPDATE plans SET status = 'running', attempts = attempts + 1, updated_at = ? "
+                "WHERE run_id = ? AND status = 'pending'",
+                (time.time(), run_id),
+            )
+        return tickers
+
+    def enqueue(
+        self,
+        run_id: int,
+        ticker: str,
+        jobs: list[tuple[str, str, dict]],
+        error: str | None = None,
+    ) -> int:
+        """Add `(cik, form, filing)` download jobs for `ticker`; returns how many were new.
+
+        The ticker's plan becomes `done`, or `failed` with `error` when (part of) the
+        selection failed; the jobs that were selected are enqueued either way.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE plans SET status = ?, last_error = ?, updated_at = ? "
+                "WHERE run_id = ? AND ticker = ?",
+                ("failed" if error else "done", error, now, run_id, ticker),
+            )
+            cur = self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs "
+                "(run_id, ticker, form, accession_number, cik, filing, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, ticker, form, f["accession_number"], cik, json.dumps(f), now)
+                    for cik, form, f in jobs
+                ],
+            )
+        return cur.rowcount
+
+    def requeue(self, run_id: int, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """Return interrupted and retryable failed plans and jobs of `run_id` to `pending`."""
+        requeued = 0
+        with self._lock, self._conn:
+            for table in ("plans", "jobs"):
+                cur = self._conn.execute(
+                    f"UPDATE {table} SET status = 'pending', updated_at = ? WHERE run_id = ? AND "
+                    "(status = 'running' OR (status = 'failed' AND attempts < ?))",
+                    (time.time(), run_id, max_attempts),
+                )
+                requeued += cur.rowcount
+        return requeued
+
+    def claim(self, run_id: int) -> Job | None:
+        """Mark the oldest pending job of `run_id` as running and return it."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT ticker, form, accession_number, cik, filing, attempts FROM jobs "
+                "WHERE run_id = ? AND status = 'pending' ORDER BY rowid LIMIT 1",
+                (run_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            ticker, form, accession_number, cik, filing, attempts = row
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? "
+                "WHERE run_id = ? AND ticker = ? AND form = ? AND accession_number = ?",
+                (time.time(), run_id, ticker, form, accession_number),
+            )
+        return Job(run_id, ticker, form, accession_number, cik, json.loads(filing), attempts + 1)
+
+    def _finish(self, job: Job, status: str, error: str | None = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, last_error = ?, updated_at = ? "
+                "WHERE run_id = ? AND ticker = ? AND form = ? AND accession_number = ?",
+                (status, error, time.time(), *job.key),
+            )
+
+    def complete(self, job: Job) -> None:
+        self._finish(job, "done")
+
+    def fail(self, job: Job, error: str) -> None:
+        self._finish(job, "failed", error)
+
+    def counts(self, run_id: int, table: str = "jobs") -> dict[str, int]:
+        """Jobs (or, with `table="plans"`, plans) of `run_id` by status."""
+        if table not in ("jobs", "plans"):
+            raise ValueError(f"Unknown queue table {table!r}")
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT status, COUNT(*) FROM {table} WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall()
+        counts.update(dict(rows))
+        return counts
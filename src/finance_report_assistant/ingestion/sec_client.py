@@ -1,30 +1,115 @@
 from __future__ import annotations
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
+from urllib.parse import urlsplit
 
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from finance_report_assistant.core.config import settings
+from finance_report_assistant.ingestion.http_cache import HttpCache
+from finance_report_assistant.utils.compression import compressed_path, open_writer
 
 SEC_DATA_SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
 SEC_ARCHIVES_BASE = "https://www.sec.gov/Archives/edgar/data"
 
+_TIMING_PHASES = ("connect_s", "tls_s", "ttfb_s", "transfer_s", "total_s")
+DOWNLOAD_CHUNK_BYTES = 256 * 1024
+
+
+def submissions_page_url(submissions_url: str, name: str) -> str:
+    """URL of a `filings.files` history page; pages live next to the main submissions JSON."""
+    return f"{submissions_url.rsplit('/', 1)[0]}/{name}"
+
+
+@dataclass
+class RequestTiming:
+    """Phase timings for one request, from httpx/httpcore trace events.
+
+    `connect_s` covers DNS resolution plus the TCP connect (httpcore resolves inside
+    `connect_tcp`), `ttfb_s` runs from sending the request headers to receiving the response
+    headers, and `transfer_s` is the body download. Connect and TLS are zero on a reused
+    keep-alive connection.
+    """
+
+    url: str
+    status_code: int
+    num_bytes: int
+    http_version: str
+    reused_connection: bool
+    connect_s: float = 0.0
+    tls_s: float = 0.0
+    ttfb_s: float = 0.0
+    transfer_s: float = 0.0
+    total_s: float = 0.0
+
+
+class _TraceRecorder:
+    def __init__(self) -> None:
+        self.marks: dict[str, float] = {}
+
+    def __call__(self, event_name: str, info: dict) -> None:
+        # "connection.connect_tcp.started", "http11.receive_response_body.complete", ...
+        _, _, phase = event_name.partition(".")
+        self.marks[phase] = time.perf_counter()
+
+    def span(self, start: str, end: str) -> float:
+        if start in self.marks and end in self.marks:
+            return self.marks[end] - self.marks[start]
+        return 0.0
+
 
 class SecEdgarClient:
-    def __init__(self, user_agent: str | None = None, timeout_s: float = 30.0) -> None:
+    """Blocking SEC client with one long-lived, pooled `httpx.Client` per host.
+
+    data.sec.gov (submissions) and www.sec.gov (archives) each keep their own keep-alive
+    pool, so repeated downloads skip the TCP and TLS handshakes. `http2=True` needs the
+    `h2` package (`pip install "finance-report-assistant[http2]"`). Every network request
+    appends a `RequestTiming` to `timings`; `timing_summary()` aggregates them.
+
+    Responses go through an on-disk `HttpCache` unless `use_cache` is off (or the
+    `HTTP_CACHE_MB` setting is 0): archive documents are served from it directly, submissions
+    are revalidated with their ETag / Last-Modified.
+    """
+
+    def __init__(
+        self,
+        user_agent: str | None = None,
+        timeout_s: float = 30.0,
+        http2: bool = False,
+        max_connections: int = 4,
+        keepalive_expiry_s: float = 30.0,
+        submissions_url: str = SEC_DATA_SUBMISSIONS_URL,
+        archives_base: str = SEC_ARCHIVES_BASE,
+        use_cache: bool = True,
+        cache: HttpCache | None = None,
+    ) -> None:
         self.user_agent = user_agent or settings.sec_user_agent
-        self._client = httpx.Client(
-            timeout=timeout_s,
-            headers={
-                "User-Agent": self.user_agent,
-                "Accept-Encoding": "gzip, deflate",
-                "Host": "data.sec.gov",
-            },
+        if cache is None and use_cache and settings.http_cache_mb > 0:
+            cache = HttpCache()
+        self.cache = cache
+        self.timeout_s = timeout_s
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry_s,
         )
+        self.submissions_url = submissions_url
+        self.archives_base = archives_base
+        self.max_connections = max_connections
+        self.timings: list[RequestTiming] = []
+        self._clients: dict[str, httpx.Client] = {}
+        self._pages: dict[str, dict[str, Any]] = {}
 
     def close(self) -> None:
-        self._client.close()
+        for client in self._clients.values():
+            client.close()
+        self._clients.clear()
 
     def __enter__(self) -> "SecEdgarClient":
         return self
@@ -32,24 +117,145 @@ class SecEdgarClient:
     def __exit__(self, exc_type, exc, tb) -> None:  # type: ignore[no-untyped-def]
         self.close()
 
+    def _client_for(self, url: str) -> httpx.Client:
+        host = urlsplit(url).netloc
+        client = self._clients.get(host)
+        if client is None:
+            client = httpx.Client(
+                timeout=self.timeout_s,
+                http2=self.http2,
+                limits=self.limits,
+                headers={"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate"},
+            )
+            self._clients[host] = client
+        return client
+
+    def _get(self, url: str, immutable: bool = False) -> httpx.Response:
+        conditional: dict[str, str] = {}
+        if self.cache is not None:
+            cached, conditional = self.cache.lookup(url, immutable=immutable)
+            if cached is not None:
+                return cached
+
+        trace = _TraceRecorder()
+        started = time.perf_counter()
+        resp = self._client_for(url).get(url, headers=conditional, extensions={"trace": trace})
+        self._record_timing(url, resp, trace, started, len(resp.content))
+        if self.cache is not None:
+            resp = self.cache.resolve(url, resp)
+        resp.raise_for_status()
+        return resp
+
+    def _record_timing(
+        self,
+        url: str,
+        resp: httpx.Response,
+        trace: _TraceRecorder,
+        started: float,
+        num_bytes: int,
+    ) -> None:
+        self.timings.append(
+            RequestTiming(
+                url=url,
+                status_code=resp.status_code,
+                num_bytes=num_bytes,
+                http_version=resp.http_version,
+                reused_connection="connect_tcp.started" not in trace.marks,
+                connect_s=trace.span("connect_tcp.started", "connect_tcp.complete"),
+                tls_s=trace.span("start_tls.started", "start_tls.complete"),
+                ttfb_s=trace.span(
+                    "send_request_headers.started", "receive_response_headers.complete"
+                ),
+                transfer_s=trace.span(
+                    "receive_response_body.started", "receive_response_body.complete"
+                ),
+                total_s=time.perf_counter() - started,
+            )
+        )
+
+    def timing_summary(self) -> dict[str, float | int]:
+        """Totals over all recorded requests, e.g. to see where a backfill spends its time."""
+        summary: dict[str, float | int] = {
+            "requests": len(self.timings),
+            "reused_connections": sum(t.reused_connection for t in self.timings),
+            "bytes": sum(t.num_bytes for t in self.timings),
+        }
+        for phase in _TIMING_PHASES:
+            summary[phase] = round(sum(getattr(t, phase) for t in self.timings), 6)
+        return summary
+
     @retry(wait=wait_exponential(min=1, max=16), stop=stop_after_attempt(3), reraise=True)
     def get_submissions(self, cik: str) -> dict[str, Any]:
-        url = SEC_DATA_SUBMISSIONS_URL.format(cik=cik.zfill(10))
-        resp = self._client.get(url)
-        resp.raise_for_status()
+        resp = self._get(self.submissions_url.format(cik=cik.zfill(10)))
         return resp.json()
 
     @retry(wait=wait_exponential(min=1, max=16), stop=stop_after_attempt(3), reraise=True)
-    def get_archive_document(self, cik: str, accession_number: str, primary_document: str) -> str:
+    def get_submissions_page(self, name: str) -> dict[str, Any]:
+        page = self._pages.get(name)
+        if page is None:
+            page = self._get(submissions_page_url(self.submissions_url, name)).json()
+            self._pages[name] = page
+        return page
+
+    def get_submissions_pages(self, names: list[str]) -> list[dict[str, Any]]:
+        """Fetch several history pages concurrently over the data.sec.gov pool."""
+        if len(names) <= 1:
+            return [self.get_submissions_page(name) for name in names]
+        # Create the host client up front so worker threads share one pool.
+        self._client_for(self.submissions_url)
+        with ThreadPoolExecutor(max_workers=min(len(names), self.max_connections)) as pool:
+            return list(pool.map(self.get_submissions_page, names))
+
+    def archive_url(self, cik: str, accession_number: str, primary_document: str) -> str:
         cik_int = str(int(cik))
         accession_no_dashes = accession_number.replace("-", "")
-        url = f"{SEC_ARCHIVES_BASE}/{cik_int}/{accession_no_dashes}/{primary_document}"
-
-        # SEC archive host should be requested from sec.gov
-        with httpx.Client(
-            timeout=30.0,
-            headers={"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate"},
-        ) as client:
-            resp = client.get(url)
+        return f"{self.archives_base}/{cik_int}/{accession_no_dashes}/{primary_document}"
+
+    @retry(wait=wait_exponential(min=1, max=16), stop=stop_after_attempt(3), reraise=True)
+    def get_archive_document(self, cik: str, accession_number: str, primary_document: str) -> str:
+        url = self.archive_url(cik, accession_number, primary_document)
+        # Archived filing documents are immutable once published.
+        return self._get(url, immutable=True).text
+
+    @retry(wait=wait_exponential(min=1, max=16), stop=stop_after_attempt(3), reraise=True)
+    def download_archive_document(
+        self,
+        cik: str,
+        accession_number: str,
+        primary_document: str,
+        dest: Path,
+        compression: str = "gzip",
+    ) -> Path:
+        """Stream an archive document into `dest` (plus the codec suffix) in fixed-size chunks.
+
+        Memory stays bounded by `DOWNLOAD_CHUNK_BYTES` whatever the document size. The body is
+        written to a `.part` file and renamed on success, and an existing target is returned
+        as is. Streamed bodies are not copied into the HTTP cache (the raw filing directory is
+        the durable copy), but an existing cache entry is still used instead of the network.
+        """
+        url = self.archive_url(cik, accession_number, primary_document)
+        target = compressed_path(dest, compression)
+        part_path = target.with_name(target.name + ".part")
+        if target.exists():
+            # Archive documents are immutable and `target` only appears after a full download.
+            return target
+
+        cached = self.cache.lookup(url, immutable=True)[0] if self.cache is not None else None
+        if cached is not None:
+            with open_writer(part_path, compression) as out:
+                out.write(cached.content)
+            part_path.replace(target)
+            return target
+
+        trace = _TraceRecorder()
+        started = time.perf_counter()
+        num_bytes = 0
+        with self._client_for(url).stream("GET", url, extensions={"trace": trace}) as resp:
             resp.raise_for_status()
-            return resp.text
+            with open_writer(part_path, compression) as out:
+                for chunk in resp.iter_bytes(DOWNLOAD_CHUNK_BYTES):
+                    out.write(chunk)
+                    num_bytes += len(chunk)
+        self._record_timing(url, resp, trace, started, num_bytes)
+        part_path.replace(target)
+        return target
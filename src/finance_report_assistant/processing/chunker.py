@@ -1,19 +1,63 @@
 from __future__ import annotations
 
 import hashlib
+import re
 from dataclasses import dataclass
+from itertools import accumulate
 
 from finance_report_assistant.processing.html_cleaner import SectionText
 
 
+@dataclass(frozen=True)
+class ChunkConfig:
+    max_words: int = 220
+    overlap_words: int = 40
+    min_words: int = 20
+
+    def __post_init__(self) -> None:
+        if self.max_words <= 0:
+            raise ValueError("max_words must be positive")
+        if self.overlap_words < 0:
+            raise ValueError("overlap_words cannot be negative")
+        if self.overlap_words >= self.max_words:
+            raise ValueError("overlap_words must be less than max_words")
+        if self.min_words < 0:
+            raise ValueError("min_words cannot be negative")
+
+    @property
+    def name(self) -> str:
+        """Directory-safe variant name, e.g. `w220-o40-m20`."""
+        return f"w{self.max_words}-o{self.overlap_words}-m{self.min_words}"
+
+
 @dataclass
 class ChunkCandidate:
     section_title: str
     section_path: str
     text: str
+    # `text` is `sections[section_index].text[char_start:char_end]`.
+    section_index: int = 0
+    char_start: int = 0
+    char_end: int = 0
+    word_count: int = 0
+
+
+WORD_RE = re.compile(r"\S+")
+
 
+def _word_bounds(text: str) -> tuple[list[int], list[int]]:
+    """Start offsets and lengths of every whitespace-delimited word in `text`."""
+    lengths = list(map(len, text.split()))
+    if sum(lengths) + len(lengths) - 1 == len(text):
+        # Whitespace-normalized text (as produced by the cleaner): words are separated by
+        # exactly one character, so offsets follow from the word lengths alone.
+        return list(accumulate(map((1).__add__, lengths[:-1]), initial=0)), lengths
+    matches = list(WORD_RE.finditer(text))
+    return [m.start() for m in matches], lengths
 
-def _chunk_words(words: list[str], max_words: int, overlap_words: int) -> list[tuple[int, int, str]]:
+
+def _chunk_words(word_count: int, max_words: int, overlap_words: int) -> list[tuple[int, int]]:
+    """`[start, end)` word-index windows of `max_words` words overlapping by `overlap_words`."""
     if max_words <= 0:
         raise ValueError("max_words must be positive")
     if overlap_words < 0:
@@ -21,19 +65,18 @@ def _chunk_words(words: list[str], max_words: int, overlap_words: int) -> list[t
     if overlap_words >= max_words:
         raise ValueError("overlap_words must be less than max_words")
 
-    chunks: list[tuple[int, int, str]] = []
+    windows: list[tuple[int, int]] = []
     step = max_words - overlap_words
     start = 0
 
-    while start < len(words):
-        end = min(start + max_words, len(words))
-        text = " ".join(words[start:end]).strip()
-        chunks.append((start, end, text))
-        if end == len(words):
+    while start < word_count:
+        end = min(start + max_words, word_count)
+        windows.append((start, end))
+        if end == word_count:
             break
         start += step
 
-    return chunks
+    return windows
 
 
 def build_chunk_candidates(
@@ -42,30 +85,51 @@ def build_chunk_candidates(
     overlap_words: int = 40,
     min_words: int = 20,
 ) -> list[ChunkCandidate]:
-    if min_words <= 0:
+    config = ChunkConfig(max_words=max_words, overlap_words=overlap_words, min_words=min_words)
+    return build_chunk_candidate_variants(sections, [config])[0]
+
+
+def build_chunk_candidate_variants(
+    sections: list[SectionText], configs: list[ChunkConfig]
+) -> list[list[ChunkCandidate]]:
+    """Chunk candidates for each of `configs`.
+
+    Word boundaries are computed once per section and shared by all configurations; each
+    chunk is a single slice of the section text from its first word's start to its last
+    word's end, so `char_start` / `char_end` are exact offsets into that text.
+    """
+    if any(config.min_words <= 0 for config in configs):
         raise ValueError("min_words must be positive")
 
-    candidates: list[ChunkCandidate] = []
+    variants: list[list[ChunkCandidate]] = [[] for _ in configs]
 
-    for section in sections:
-        words = section.text.split()
-        if not words:
+    for section_index, section in enumerate(sections):
+        starts, lengths = _word_bounds(section.text)
+        if not starts:
             continue
 
-        section_chunks = _chunk_words(words, max_words=max_words, overlap_words=overlap_words)
-        for _, _, chunk_text in section_chunks:
-            chunk_word_count = len(chunk_text.split())
-            if chunk_word_count < min_words:
-                continue
-            candidates.append(
-                ChunkCandidate(
-                    section_title=section.title,
-                    section_path=section.path,
-                    text=chunk_text,
-                )
+        for config, candidates in zip(configs, variants, strict=True):
+            windows = _chunk_words(
+                len(starts), max_words=config.max_words, overlap_words=config.overlap_words
             )
+            for first, last in windows:
+                if last - first < config.min_words:
+                    continue
+                char_start = starts[first]
+                char_end = starts[last - 1] + lengths[last - 1]
+                candidates.append(
+                    ChunkCandidate(
+                        section_title=section.title,
+                        section_path=section.path,
+                        text=section.text[char_start:char_end],
+                        section_index=section_index,
+                        char_start=char_start,
+                        char_end=char_end,
+                        word_count=last - first,
+                    )
+                )
 
-    return candidates
+    return variants
 
 
 def deterministic_chunk_id(accession_number: str, section_path: str, text: str) -> str:
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import importlib.util
 import re
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Comment, Declaration, Doctype, NavigableString, ProcessingInstruction
+
+from finance_report_assistant.core.config import settings
+
+# Bump when extraction changes the sections produced for unchanged HTML, so cached section
+# artifacts (see `processing.section_cache`) are re-extracted.
+CLEANER_VERSION = 1
 
 
 @dataclass
@@ -21,22 +29,40 @@ def _normalize_whitespace(text: str) -> str:
 ITEM_HEADING_RE = re.compile(r"^item\s+\d+[a-z]?(?:\.[a-z])?[\.\:]?", re.IGNORECASE)
 ITEM_SPLIT_RE = re.compile(r"\b(Item\s+\d+[A-Z]?(?:\.[A-Z])?[\.\:]?)\s+", re.IGNORECASE)
 
+HEADING_LEVELS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4}
+# Elements that start a new text block; inline elements (span, b, a, font, ...) do not.
+BLOCK_TAGS = frozenset(
+    {"p", "div", "li", "td", "th", "tr", "table", "ul", "ol", "h5", "h6", "section", "article"}
+)
+SKIPPED_TAGS = frozenset({"script", "style", "noscript", "svg"})
+_SKIPPED_STRINGS = (Comment, Declaration, Doctype, ProcessingInstruction)
+_BLOCK_END = 0
 
-def _is_hidden_tag(tag) -> bool:  # type: ignore[no-untyped-def]
-    style = (tag.get("style") or "").lower()
+
+@dataclass
+class TextBlock:
+    text: str
+    heading_level: int = 0  # 1-4 for `h1`..`h4`, 0 for body text
+
+
+def _is_hidden(name: str, attrs) -> bool:  # type: ignore[no-untyped-def]
+    style = (attrs.get("style") or "").lower()
     if "display:none" in style or "visibility:hidden" in style:
         return True
 
-    if (tag.get("aria-hidden") or "").lower() == "true":
+    if (attrs.get("aria-hidden") or "").lower() == "true":
         return True
 
-    name = (tag.name or "").lower()
-    if name in {"ix:header", "ix:hidden"}:
+    if name.lower() in {"ix:header", "ix:hidden"}:
         return True
 
     return False
 
 
+def _is_hidden_tag(tag) -> bool:  # type: ignore[no-untyped-def]
+    return _is_hidden(tag.name or "", tag)
+
+
 def _is_item_heading(text: str) -> bool:
     if len(text.split()) > 16:
         return False
@@ -68,24 +94,201 @@ def _split_document_section_by_item(section: SectionText) -> list[SectionText]:
     return out or [section]
 
 
-def extract_sections_from_html(html: str) -> list[SectionText]:
+def iter_text_blocks(root) -> Iterator[TextBlock]:  # type: ignore[no-untyped-def]
+    """Walk a parsed document once and yield its visible text block by block.
+
+    Every text node is read exactly once and belongs to its nearest enclosing block element
+    (`BLOCK_TAGS`) or heading, so text inside nested `div`s is emitted by the innermost block
+    only. Non-content and hidden subtrees are skipped without being visited. Markers on an
+    explicit stack close blocks, so deep nesting cannot hit the recursion limit.
+    """
+    pieces: list[str] = []
+    heading_level = 0
+
+    def take() -> str:
+        text = _normalize_whitespace(" ".join(pieces))
+        pieces.clear()
+        return text
+
+    stack: list = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, int):
+            text = take()
+            if node == _BLOCK_END:
+                if text:
+                    yield TextBlock(text)
+            else:
+                heading_level = 0
+                if text:
+                    yield TextBlock(text, node)
+            continue
+
+        if isinstance(node, NavigableString):
+            if not isinstance(node, _SKIPPED_STRINGS):
+                text = node.strip()
+                if text:
+                    pieces.append(text)
+            continue
+
+        name = (node.name or "").lower()
+        if name in SKIPPED_TAGS or _is_hidden_tag(node):
+            continue
+        # Inside a heading everything counts towards the heading text.
+        if not heading_level:
+            level = HEADING_LEVELS.get(name, 0)
+            if level or name in BLOCK_TAGS:
+                text = take()
+                if text:
+                    yield TextBlock(text)
+                heading_level = level
+                stack.append(level or _BLOCK_END)
+        stack.extend(reversed(node.contents))
+
+    text = take()
+    if text:
+        yield TextBlock(text)
+
+
+class _BlockTarget:
+    """lxml parser target with the same block rules as `iter_text_blocks`.
+
+    lxml calls `start` / `end` / `data` while it parses, so no tree is built; finished blocks
+    collect in `blocks` until the caller drains them. A text node can arrive in several
+    `data` calls (entities, feed boundaries), so it is only stripped at the next tag event.
+    """
+
+    # Per open element: what its end tag closes.
+    _INLINE, _SKIP, _BLOCK = -1, -2, _BLOCK_END
+
+    def __init__(self) -> None:
+        self.blocks: list[TextBlock] = []
+        self._open: list[int] = []
+        self._pieces: list[str] = []
+        self._text: list[str] = []
+        self._skip_depth = 0
+        self._heading_level = 0
+
+    def _end_text_node(self) -> None:
+        if self._text:
+            text = "".join(self._text).strip()
+            self._text.clear()
+            if text:
+                self._pieces.append(text)
+
+    def _emit(self, level: int = 0) -> None:
+        text = _normalize_whitespace(" ".join(self._pieces))
+        self._pieces.clear()
+        if text:
+            self.blocks.append(TextBlock(text, level))
+
+    def start(self, tag: str, attrib) -> None:  # type: ignore[no-untyped-def]
+        self._end_text_node()
+        name = tag.lower()
+        if self._skip_depth or name in SKIPPED_TAGS or _is_hidden(name, attrib):
+            self._skip_depth += 1
+            self._open.append(self._SKIP)
+            return
+        if self._heading_level:
+            self._open.append(self._INLINE)
+            return
+        level = HEADING_LEVELS.get(name, 0)
+        if level or name in BLOCK_TAGS:
+            self._emit()
+            self._heading_level = level
+            self._open.append(level or self._BLOCK)
+        else:
+            self._open.append(self._INLINE)
+
+    def end(self, tag: str) -> None:
+        self._end_text_node()
+        action = self._open.pop() if self._open else self._INLINE
+        if action == self._SKIP:
+            self._skip_depth -= 1
+        elif action == self._BLOCK:
+            self._emit()
+        elif action > 0:
+            self._heading_level = 0
+            self._emit(action)
+
+    def data(self, data: str) -> None:
+        if not self._skip_depth:
+            self._text.append(data)
+
+    def comment(self, text: str) -> None:
+        self._end_text_node()
+
+    def close(self) -> None:
+        self._end_text_node()
+        self._emit()
+
+
+def iter_text_blocks_lxml(html: str, chunk_chars: int = 64 * 1024) -> Iterator[TextBlock]:
+    """Streaming counterpart of `iter_text_blocks` on lxml's event-based HTML parser.
+
+    The document is fed in `chunk_chars` pieces to a parser target, so no element tree is
+    built, and blocks are yielded as soon as their closing tag has been parsed.
+    """
+    from lxml import etree  # type: ignore[import-untyped]
+
+    target = _BlockTarget()
+    parser = etree.HTMLParser(target=target, remove_comments=True, remove_pis=True)
+    for start in range(0, len(html), chunk_chars):
+        parser.feed(html[start : start + chunk_chars])
+        yield from target.blocks
+        target.blocks.clear()
+    parser.close()
+    yield from target.blocks
+
+
+def _html_parser_blocks(html: str) -> Iterator[TextBlock]:
+    return iter_text_blocks(BeautifulSoup(html, "html.parser"))
+
+
+# backend name -> html -> text blocks
+PARSER_BACKENDS: dict[str, Callable[[str], Iterator[TextBlock]]] = {
+    "html.parser": _html_parser_blocks,
+    "lxml": iter_text_blocks_lxml,
+}
+
+
+def resolve_parser_backend(backend: str | None = None) -> str:
+    """Pick the backend: the argument, else `settings.html_parser`; "auto" prefers lxml.
+
+    Cached sections and chunk fingerprints record the resolved name, so installing or
+    removing lxml under "auto" re-extracts filings instead of mixing backends' output.
+    """
+    name = backend or settings.html_parser
+    if name == "auto":
+        return "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown HTML parser {name!r}; expected one of {list(PARSER_BACKENDS)}")
+    if name == "lxml" and importlib.util.find_spec("lxml") is None:
+        raise ImportError(
+            "The lxml HTML parser requires the 'lxml' package; "
+            'install it with `pip install "finance-report-assistant[lxml]"`'
+        )
+    return name
+
+
+def extract_sections_from_html(html: str, backend: str | None = None) -> list[SectionText]:
     """Extract readable sections from SEC filing HTML.
 
     Heuristic strategy for MVP:
-    - Remove non-content tags (script/style)
+    - Skip non-content tags (script/style) and hidden elements
     - Track heading structure (`h1`..`h4`) as section path
-    - Collect paragraph/list/table text beneath latest heading
-    """
-    soup = BeautifulSoup(html, "html.parser")
+    - Collect the text of each block (paragraph/list item/table cell) beneath latest heading,
+      in one pass over the document (see `iter_text_blocks`)
 
-    # Removes non-content tags (`script`, `style`, `noscript`, `svg`)
-    for tag in soup(["script", "style", "noscript", "svg"]):
-        tag.decompose()
+    `backend` selects the parser (see `PARSER_BACKENDS`, default `settings.html_parser`);
+    both produce the same block stream.
+    """
+    blocks = PARSER_BACKENDS[resolve_parser_backend(backend)](html)
+    return sections_from_blocks(blocks)
 
-    # Removes hidden or non-visible elements
-    for tag in soup.find_all(_is_hidden_tag):
-        tag.decompose()
 
+def sections_from_blocks(blocks: Iterable[TextBlock]) -> list[SectionText]:
+    """Group text blocks into sections by `h1`..`h4` and `Item` headings."""
     sections: list[SectionText] = []
     heading_stack: list[str] = []
     current_title = "Document"
@@ -102,38 +305,27 @@ def extract_sections_from_html(html: str) -> list[SectionText]:
         sections.append(SectionText(title=current_title, path=path, text=text))
         buffer = []
 
-    # Walks heading/content tags (`h1`-`h4`, `p`, `div`, `li`, `td`, `th`)
-    for node in soup.find_all(["h1", "h2", "h3", "h4", "p", "div", "li", "td", "th"]):
-        node_text = _normalize_whitespace(node.get_text(" ", strip=True))
-        if not node_text:
-            continue
-
+    for block in blocks:
         # Tracks heading hierarchy
-        if node.name in {"h1", "h2", "h3", "h4"}:
+        if block.heading_level:
             flush()
-            level = int(node.name[1])
-            heading_stack[:] = heading_stack[: level - 1]
-            heading_stack.append(node_text)
-            current_title = node_text
+            heading_stack[:] = heading_stack[: block.heading_level - 1]
+            heading_stack.append(block.text)
+            current_title = block.text
             continue
 
         # Detects `Item` headings such as `Item 1A. Risk Factors`
-        if _is_item_heading(node_text):
+        if _is_item_heading(block.text):
             flush()
-            heading_stack = [node_text]
-            current_title = node_text
+            heading_stack = [block.text]
+            current_title = block.text
             continue
 
-        buffer.append(node_text)
+        buffer.append(block.text)
 
     flush()
 
     # Splits the “Document” fallback section into section-aware blocks when item headings are found
-    if not sections:
-        fallback = _normalize_whitespace(soup.get_text(" ", strip=True))
-        if fallback:
-            sections.append(SectionText(title="Document", path="Document", text=fallback))
-
     normalized_sections: list[SectionText] = []
     for section in sections:
         if section.title == "Document":
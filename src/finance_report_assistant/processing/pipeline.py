@@ -1,13 +1,38 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from finance_report_assistant.core.config import settings
 from finance_report_assistant.core.models import FilingChunk
-from finance_report_assistant.processing.chunker import build_chunk_candidates, deterministic_chunk_id
-from finance_report_assistant.processing.html_cleaner import extract_sections_from_html
-from finance_report_assistant.processing.sentences import split_sentences_with_spans
+from finance_report_assistant.processing.chunker import (
+    ChunkCandidate,
+    ChunkConfig,
+    build_chunk_candidate_variants,
+    deterministic_chunk_id,
+)
+from finance_report_assistant.processing.html_cleaner import (
+    CLEANER_VERSION,
+    SectionText,
+    resolve_parser_backend,
+)
+from finance_report_assistant.processing.section_cache import (
+    cached_sections,
+    html_digest,
+    section_cache_path,
+)
+from finance_report_assistant.processing.sentences import sentence_bounds
+from finance_report_assistant.utils.chunks import write_jsonl
+from finance_report_assistant.utils.compression import find_variant, read_text
+
+# Bump when chunking changes the output for unchanged sections, so fingerprinted outputs are
+# rebuilt (extraction changes bump `CLEANER_VERSION`, which the fingerprint also covers).
+CHUNKER_VERSION = 4
 
 
 def _processed_chunk_dir(ticker: str, form: str, accession_number: str) -> Path:
@@ -21,102 +46,353 @@ def _processed_chunk_dir(ticker: str, form: str, accession_number: str) -> Path:
     )
 
 
+def chunk_variant_dir(variant: str, ticker: str, form: str, accession_number: str) -> Path:
+    """Output directory of one named chunking variant (see `ChunkConfig.name`)."""
+    return (
+        settings.data_dir
+        / "processed"
+        / "chunk_variants"
+        / variant
+        / ticker.upper()
+        / form
+        / accession_number
+    )
+
+
+def chunk_fingerprint(
+    html_sha256: str,
+    max_words: int,
+    overlap_words: int,
+    min_words: int,
+    html_parser: str | None = None,
+) -> str:
+    """Hash of everything a filing's chunks depend on: the source HTML (by its SHA-256), chunk
+    parameters, the resolved parser backend, `CLEANER_VERSION` and `CHUNKER_VERSION`."""
+    params = {
+        "max_words": max_words,
+        "overlap_words": overlap_words,
+        "min_words": min_words,
+        "html_parser": resolve_parser_backend(html_parser),
+        "cleaner_version": CLEANER_VERSION,
+        "chunker_version": CHUNKER_VERSION,
+    }
+    digest = hashlib.sha256(html_sha256.encode("ascii"))
+    digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _stored_fingerprint(chunk_dir: Path) -> str | None:
+    if not (chunk_dir / "chunks.jsonl").exists():
+        return None
+    try:
+        stats = json.loads((chunk_dir / "chunk_stats.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return stats.get("fingerprint")
+
+
+def _read_raw_filing(filing_dir: Path) -> tuple[dict, Path, str]:
+    metadata_path = filing_dir / "filing_metadata.json"
+    # The document may be stored plain or compressed (see `settings.raw_compression`).
+    html_path = find_variant(filing_dir / "primary_document.html")
+
+    if not metadata_path.exists() or html_path is None:
+        raise FileNotFoundError(f"Missing required ingestion files in {filing_dir}")
+
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    return metadata, html_path, read_text(html_path, errors="ignore")
+
+
+def _section_cache_path(metadata: dict) -> Path:
+    return section_cache_path(metadata["ticker"], metadata["form"], metadata["accession_number"])
+
+
+def sections_for_filing_dir(filing_dir: Path) -> list[SectionText]:
+    """Parsed sections of one raw filing, from its cached section artifact when still valid."""
+    metadata, _, html = _read_raw_filing(filing_dir)
+    return cached_sections(html, _section_cache_path(metadata))[0]
+
+
 def build_chunks_for_filing_dir(
     filing_dir: Path,
     max_words: int = 220,
     overlap_words: int = 40,
     min_words: int = 20,
+    force: bool = False,
 ) -> Path:
-    metadata_path = filing_dir / "filing_metadata.json"
-    html_path = filing_dir / "primary_document.html"
+    """Write `chunks.jsonl` and `chunk_stats.json` for one raw filing directory.
 
-    if not metadata_path.exists() or not html_path.exists():
-        raise FileNotFoundError(f"Missing required ingestion files in {filing_dir}")
+    Outputs whose recorded fingerprint (see `chunk_fingerprint`) still matches are left as they
+    are unless `force` is set.
+    """
+    config = ChunkConfig(max_words=max_words, overlap_words=overlap_words, min_words=min_words)
+    return _build_chunks(filing_dir, [config], force, variants=False)[0][0]
 
-    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
-    html = html_path.read_text(encoding="utf-8", errors="ignore")
-
-    sections = extract_sections_from_html(html)
-    candidates = build_chunk_candidates(
-        sections,
-        max_words=max_words,
-        overlap_words=overlap_words,
-        min_words=min_words,
-    )
 
-    chunk_dir = _processed_chunk_dir(
+def build_chunk_variants_for_filing_dir(
+    filing_dir: Path, configs: list[ChunkConfig], force: bool = False
+) -> dict[str, Path]:
+    """Build one chunk output per configuration from a single parse and word split.
+
+    Each variant is written to its own directory (see `chunk_variant_dir`), so chunking
+    strategies can be compared side by side. Returns the `chunks.jsonl` path per variant name.
+    """
+    built = _build_chunks(filing_dir, configs, force, variants=True)
+    return {config.name: path for config, (path, _) in zip(configs, built, strict=True)}
+
+
+def _build_chunks(
+    filing_dir: Path, configs: list[ChunkConfig], force: bool, variants: bool
+) -> list[tuple[Path, bool]]:
+    """Chunk outputs for `configs` (in the variant layout when `variants` is set), each with
+    whether it was rebuilt."""
+    metadata, html_path, html = _read_raw_filing(filing_dir)
+    html_sha256 = html_digest(html)
+    html_parser = resolve_parser_backend()
+    ticker, form, accession_number = (
         metadata["ticker"],
         metadata["form"],
         metadata["accession_number"],
     )
-    chunk_dir.mkdir(parents=True, exist_ok=True)
 
+    outputs: list[tuple[Path, bool]] = []
+    stale: list[tuple[ChunkConfig, Path, str]] = []
+    for config in configs:
+        if variants:
+            chunk_dir = chunk_variant_dir(config.name, ticker, form, accession_number)
+        else:
+            chunk_dir = _processed_chunk_dir(ticker, form, accession_number)
+        fingerprint = chunk_fingerprint(
+            html_sha256, config.max_words, config.overlap_words, config.min_words, html_parser
+        )
+        up_to_date = not force and _stored_fingerprint(chunk_dir) == fingerprint
+        outputs.append((chunk_dir / "chunks.jsonl", not up_to_date))
+        if not up_to_date:
+            stale.append((config, chunk_dir, fingerprint))
+    if not stale:
+        return outputs
+
+    # Chunk-parameter changes reuse the parsed sections; `force` re-extracts them as well.
+    sections, _ = cached_sections(
+        html,
+        _section_cache_path(metadata),
+        html_sha256=html_sha256,
+        refresh=force,
+        backend=html_parser,
+    )
+    candidate_variants = build_chunk_candidate_variants(sections, [c for c, _, _ in stale])
+    for (config, chunk_dir, fingerprint), candidates in zip(stale, candidate_variants, strict=True):
+        stats = {
+            "ticker": ticker,
+            "form": form,
+            "accession_number": accession_number,
+            "source_bytes": len(html.encode("utf-8")),
+            "max_words": config.max_words,
+            "overlap_words": config.overlap_words,
+            "min_words": config.min_words,
+            "chunker_version": CHUNKER_VERSION,
+            "fingerprint": fingerprint,
+        }
+        if variants:
+            stats["variant"] = config.name
+        _write_chunks(chunk_dir, metadata, html_path, candidates, stats)
+
+    return outputs
+
+
+def _write_chunks(
+    chunk_dir: Path,
+    metadata: dict,
+    html_path: Path,
+    candidates: list[ChunkCandidate],
+    stats: dict,
+) -> None:
+    chunk_dir.mkdir(parents=True, exist_ok=True)
     chunks_path = chunk_dir / "chunks.jsonl"
 
-    char_cursor = 0
-    lines: list[str] = []
+    # Rows are streamed to disk as they are built, so memory does not grow with the filing.
+    # They go to a temp file that replaces chunks.jsonl only once complete, so an interrupted
+    # rewrite never leaves partial output next to stats whose fingerprint still matches.
+    rows = _chunk_rows(metadata, html_path, candidates, settings.validate_chunk_rows)
+    tmp_path = chunks_path.with_suffix(chunks_path.suffix + ".tmp")
+    chunk_count = write_jsonl(tmp_path, rows)
+    tmp_path.replace(chunks_path)
+
+    stats = {**stats, "chunk_count": chunk_count, "output_file": str(chunks_path)}
+    # Stats (with the fingerprint) go last: if the run stops before this, the next one compares
+    # against the previous fingerprint and rebuilds unless the chunks would be identical.
+    (chunk_dir / "chunk_stats.json").write_text(json.dumps(stats, indent=2), encoding="utf-8")
+
+
+def _chunk_rows(
+    metadata: dict,
+    html_path: Path,
+    candidates: list[ChunkCandidate],
+    validate: bool,
+) -> Iterator[dict]:
+    """`chunks.jsonl` rows in `FilingChunk` field order; `validate` round-trips each row
+    through the model, otherwise the internally built row is trusted as is.
+
+    `char_start` / `char_end` index the text of section `section_index` as stored in the
+    filing's section artifact (see `sections_for_filing_dir`).
+    """
     for idx, candidate in enumerate(candidates):
         chunk_id = deterministic_chunk_id(
             metadata["accession_number"],
             candidate.section_path,
             candidate.text,
         )
-        char_start = char_cursor
-        char_end = char_start + len(candidate.text)
-
-        sentence_spans = split_sentences_with_spans(candidate.text)
-        sentences = [s["text"] for s in sentence_spans if s.get("text")]
-
-        row = FilingChunk(
-            chunk_id=chunk_id,
-            ticker=metadata["ticker"],
-            form=metadata["form"],
-            cik=metadata["cik"],
-            accession_number=metadata["accession_number"],
-            filing_date=metadata["filing_date"],
-            report_date=metadata.get("report_date"),
-            section_title=candidate.section_title,
-            section_path=candidate.section_path,
-            char_start=char_start,
-            char_end=char_end,
-            word_count=len(candidate.text.split()),
-            text=candidate.text,
-            source_file=str(html_path),
-            citation_url=metadata["sec_archive_url"],
-            sentences=sentences,
-            sentence_spans=sentence_spans,
-        )
-        char_cursor = char_end + 1
+        sentence_starts, sentence_ends = sentence_bounds(candidate.text)
 
-        payload = row.model_dump(mode="json")
-        payload["chunk_index"] = idx
-        lines.append(json.dumps(payload, ensure_ascii=False))
+        row = {
+            "chunk_id": chunk_id,
+            "ticker": metadata["ticker"],
+            "form": metadata["form"],
+            "cik": metadata["cik"],
+            "accession_number": metadata["accession_number"],
+            "filing_date": metadata["filing_date"],
+            "report_date": metadata.get("report_date"),
+            "section_title": candidate.section_title,
+            "section_path": candidate.section_path,
+            "section_index": candidate.section_index,
+            "char_start": candidate.char_start,
+            "char_end": candidate.char_end,
+            "word_count": candidate.word_count,
+            "text": candidate.text,
+            "source_file": str(html_path),
+            "citation_url": metadata["sec_archive_url"],
+            "sentence_starts": sentence_starts,
+            "sentence_ends": sentence_ends,
+        }
+        if validate:
+            row = FilingChunk.model_validate(row).model_dump(mode="json")
+        row["chunk_index"] = idx
+        yield row
 
-    chunks_path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
 
-    stats = {
-        "ticker": metadata["ticker"],
-        "form": metadata["form"],
-        "accession_number": metadata["accession_number"],
-        "chunk_count": len(lines),
-        "max_words": max_words,
-        "overlap_words": overlap_words,
-        "min_words": min_words,
-        "output_file": str(chunks_path),
-    }
-    (chunk_dir / "chunk_stats.json").write_text(json.dumps(stats, indent=2), encoding="utf-8")
+@dataclass
+class FilingBuildResult:
+    filing_dir: Path
+    output: Path | None = None
+    error: str | None = None
+    skipped: bool = False  # outputs were up to date
+    chunk_count: int = 0  # summed over variants
+    source_bytes: int = 0
+    elapsed_s: float = 0.0
+    variant_outputs: dict[str, Path] = field(default_factory=dict)  # variant builds only
 
-    return chunks_path
 
+@dataclass
+class BuildReport:
+    results: list[FilingBuildResult] = field(default_factory=list)
+    workers: int = 1
+    elapsed_s: float = 0.0
 
-def build_chunks_for_ticker_form(
-    ticker: str,
-    form: str = "10-K",
+    @property
+    def outputs(self) -> list[Path]:
+        return [r.output for r in self.results if r.output is not None]
+
+    @property
+    def rebuilt(self) -> list[FilingBuildResult]:
+        return [r for r in self.results if r.output is not None and not r.skipped]
+
+    @property
+    def skipped(self) -> list[FilingBuildResult]:
+        return [r for r in self.results if r.skipped]
+
+    @property
+    def failures(self) -> list[FilingBuildResult]:
+        return [r for r in self.results if r.error is not None]
+
+    @property
+    def filings_per_s(self) -> float:
+        """Rebuild throughput; skipped filings cost almost nothing and are not counted."""
+        return len(self.rebuilt) / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        total = sum(r.source_bytes for r in self.rebuilt)
+        return total / 2**20 / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+def _build_filing(filing_dir: Path, options: dict) -> FilingBuildResult:
+    """Pool task: build one filing and report the outcome instead of raising."""
+    started = time.perf_counter()
+    result = FilingBuildResult(filing_dir=filing_dir)
+    try:
+        built = _build_chunks(filing_dir, **options)
+        result.output = built[0][0]
+        result.skipped = not any(rebuilt for _, rebuilt in built)
+        for path, _ in built:
+            stats = json.loads((path.parent / "chunk_stats.json").read_text(encoding="utf-8"))
+            result.chunk_count += stats["chunk_count"]
+            result.source_bytes = stats["source_bytes"]
+            if options["variants"]:
+                result.variant_outputs[stats["variant"]] = path
+    except Exception as exc:  # noqa: BLE001 - one bad filing must not stop the batch
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.elapsed_s = time.perf_counter() - started
+    return result
+
+
+def _init_worker(data_dir: Path) -> None:
+    # Workers may be spawned rather than forked; carry over a data_dir set at runtime.
+    settings.data_dir = data_dir
+
+
+def build_chunks_for_filings(
+    filing_dirs: list[Path],
     max_words: int = 220,
     overlap_words: int = 40,
     min_words: int = 20,
-    limit: int | None = None,
-) -> list[Path]:
+    workers: int = 1,
+    progress: Callable[[int, int, FilingBuildResult], None] | None = None,
+    force: bool = False,
+    variants: list[ChunkConfig] | None = None,
+) -> BuildReport:
+    """Build chunks for many filing directories, in `workers` processes when above 1.
+
+    HTML parsing and chunking are CPU-bound, so filings are fanned out over a process pool.
+    Results come back in the order of `filing_dirs`; a failing filing is recorded in its
+    result instead of aborting the others. Filings with up-to-date outputs are skipped
+    unless `force` is set. `progress(done, total, result)` is called as each filing finishes
+    (in completion order). With `variants`, those configurations are built instead of the
+    single `max_words` / `overlap_words` / `min_words` one, each into its variant directory
+    (see `build_chunk_variants_for_filing_dir`).
+    """
+    default = ChunkConfig(max_words=max_words, overlap_words=overlap_words, min_words=min_words)
+    options = {"configs": variants or [default], "force": force, "variants": bool(variants)}
+    report = BuildReport(workers=max(1, min(workers, len(filing_dirs))))
+    started = time.perf_counter()
+    results: list[FilingBuildResult | None] = [None] * len(filing_dirs)
+
+    def finished(idx: int, result: FilingBuildResult) -> None:
+        results[idx] = result
+        if progress is not None:
+            progress(sum(r is not None for r in results), len(filing_dirs), result)
+
+    if report.workers <= 1:
+        for idx, filing_dir in enumerate(filing_dirs):
+            finished(idx, _build_filing(filing_dir, options))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=report.workers,
+            initializer=_init_worker,
+            initargs=(settings.data_dir,),
+        ) as pool:
+            futures = {
+                pool.submit(_build_filing, filing_dir, options): idx
+                for idx, filing_dir in enumerate(filing_dirs)
+            }
+            for future in as_completed(futures):
+                finished(futures[future], future.result())
+
+    report.results = [r for r in results if r is not None]
+    report.elapsed_s = time.perf_counter() - started
+    return report
+
+
+def raw_filing_dirs(ticker: str, form: str = "10-K", limit: int | None = None) -> list[Path]:
     raw_root = settings.data_dir / "raw" / "sec-edgar" / ticker.upper() / form
     if not raw_root.exists():
         return []
@@ -124,15 +400,29 @@ def build_chunks_for_ticker_form(
     filing_dirs = sorted([p for p in raw_root.iterdir() if p.is_dir()])
     if limit is not None:
         filing_dirs = filing_dirs[:limit]
+    return filing_dirs
+
 
+def build_chunks_for_ticker_form(
+    ticker: str,
+    form: str = "10-K",
+    max_words: int = 220,
+    overlap_words: int = 40,
+    min_words: int = 20,
+    limit: int | None = None,
+    force: bool = False,
+) -> list[Path]:
+    """Chunk outputs for the raw filings of `ticker` / `form`; only filings whose fingerprint
+    changed are rebuilt unless `force` is set."""
     outputs: list[Path] = []
-    for filing_dir in filing_dirs:
+    for filing_dir in raw_filing_dirs(ticker, form, limit):
         outputs.append(
             build_chunks_for_filing_dir(
                 filing_dir=filing_dir,
                 max_words=max_words,
                 overlap_words=overlap_words,
                 min_words=min_words,
+                force=force,
             )
         )
 
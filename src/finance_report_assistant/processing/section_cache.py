@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+from finance_report_assistant.core.config import settings
+from finance_report_assistant.processing.html_cleaner import (
+    CLEANER_VERSION,
+    SectionText,
+    extract_sections_from_html,
+    resolve_parser_backend,
+)
+from finance_report_assistant.utils.compression import open_reader, open_writer
+
+SECTIONS_FILE_NAME = "sections.json.gz"
+
+
+def html_digest(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def section_cache_path(ticker: str, form: str, accession_number: str) -> Path:
+    return (
+        settings.data_dir
+        / "processed"
+        / "sections"
+        / ticker.upper()
+        / form
+        / accession_number
+        / SECTIONS_FILE_NAME
+    )
+
+
+def load_cached_sections(
+    path: Path, html_sha256: str, html_parser: str
+) -> list[SectionText] | None:
+    """Sections stored at `path`, or None when the artifact is missing, unreadable or was
+    extracted from other HTML, by another `CLEANER_VERSION` or by another parser backend."""
+    try:
+        with open_reader(path) as f:
+            payload = json.load(f)
+    except (OSError, EOFError, ValueError):
+        return None
+    if (
+        payload.get("html_sha256") != html_sha256
+        or payload.get("cleaner_version") != CLEANER_VERSION
+        or payload.get("html_parser") != html_parser
+    ):
+        return None
+    return [SectionText(*section) for section in payload["sections"]]
+
+
+def store_sections(
+    path: Path, html_sha256: str, html_parser: str, sections: list[SectionText]
+) -> None:
+    payload = {
+        "html_sha256": html_sha256,
+        "cleaner_version": CLEANER_VERSION,
+        "html_parser": html_parser,
+        # [title, path, text] triples rather than objects keep the artifact small.
+        "sections": [[s.title, s.path, s.text] for s in sections],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = path.with_name(path.name + ".part")
+    with open_writer(part_path, "gzip") as out:
+        out.write(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+    part_path.replace(path)
+
+
+def cached_sections(
+    html: str,
+    path: Path,
+    html_sha256: str | None = None,
+    refresh: bool = False,
+    backend: str | None = None,
+) -> tuple[list[SectionText], bool]:
+    """Sections of `html`, from the artifact at `path` when it is still valid.
+
+    Otherwise (or with `refresh`) the HTML is parsed with `backend` (see
+    `resolve_parser_backend`) and the artifact rewritten. Returns the sections and whether
+    they came from the cache.
+    """
+    html_sha256 = html_sha256 or html_digest(html)
+    html_parser = resolve_parser_backend(backend)
+    if not refresh:
+        sections = load_cached_sections(path, html_sha256, html_parser)
+        if sections is not None:
+            return sections, True
+    sections = extract_sections_from_html(html, backend=html_parser)
+    store_sections(path, html_sha256, html_parser, sections)
+    return sections, False
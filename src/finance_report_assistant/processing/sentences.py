@@ -5,42 +5,52 @@ import re
 SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
 
 
-def split_sentences_with_spans(text: str) -> list[dict[str, int | str]]:
-    """Split text into sentence-like units with char spans relative to the input text."""
-    out: list[dict[str, int | str]] = []
-    if not text.strip():
-        return out
+def sentence_bounds(text: str) -> tuple[list[int], list[int]]:
+    """Start and end char offsets of the sentence-like units of `text`, as parallel lists.
 
+    Units are split after `.`, `!` or `?` followed by whitespace and exclude surrounding
+    whitespace, so `text[starts[i]:ends[i]]` is the i-th sentence.
+    """
+    starts: list[int] = []
+    ends: list[int] = []
+    # (end of this unit, start of the next) for every split point, then the end of the text.
+    bounds = [(match.start(), match.end()) for match in SENTENCE_RE.finditer(text)]
+    bounds.append((len(text), len(text)))
     start = 0
-    for match in SENTENCE_RE.finditer(text):
-        end = match.start()
+    for end, next_start in bounds:
         raw = text[start:end]
         sentence = raw.strip()
         if sentence:
-            lead_ws = len(raw) - len(raw.lstrip())
-            sent_start = start + lead_ws
-            sent_end = sent_start + len(sentence)
-            out.append(
-                {
-                    "text": sentence,
-                    "char_start": sent_start,
-                    "char_end": sent_end,
-                }
-            )
-        start = match.end()
-
-    tail = text[start:]
-    tail_sentence = tail.strip()
-    if tail_sentence:
-        lead_ws = len(tail) - len(tail.lstrip())
-        sent_start = start + lead_ws
-        sent_end = sent_start + len(tail_sentence)
-        out.append(
-            {
-                "text": tail_sentence,
-                "char_start": sent_start,
-                "char_end": sent_end,
-            }
-        )
-
-    return out
+            sent_start = start + len(raw) - len(raw.lstrip())
+            starts.append(sent_start)
+            ends.append(sent_start + len(sentence))
+        start = next_start
+    return starts, ends
+
+
+def split_sentences_with_spans(text: str) -> list[dict[str, int | str]]:
+    """Split text into sentence-like units with char spans relative to the input text."""
+    starts, ends = sentence_bounds(text)
+    return [
+        {"text": text[start:end], "char_start": start, "char_end": end}
+        for start, end in zip(starts, ends, strict=True)
+    ]
+
+
+def record_sentences(record: dict) -> list[str]:
+    """Sentences of a chunk record, sliced from `text` by `sentence_starts` / `sentence_ends`.
+
+    Rows written before those arrays existed carry `sentences` and/or `sentence_spans`
+    instead (spans may lack their `text` in compacted index records); both are still read.
+    Returns an empty list when the record has no sentence boundaries at all.
+    """
+    text = record.get("text") or ""
+    starts = record.get("sentence_starts")
+    if starts is not None:
+        ends = record["sentence_ends"]
+        return [text[start:end] for start, end in zip(starts, ends, strict=True)]
+    if record.get("sentences"):
+        return list(record["sentences"])
+    spans = record.get("sentence_spans") or []
+    sentences = [span.get("text") or text[span["char_start"] : span["char_end"]] for span in spans]
+    return [s for s in sentences if s]
@@ -4,6 +4,7 @@ import re
 from dataclasses import dataclass
 from urllib.parse import quote
 
+from finance_report_assistant.processing.sentences import record_sentences
 from finance_report_assistant.retrieval.hybrid import RetrievalHit
 
 SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
@@ -45,7 +46,7 @@ def _score_sentence(sentence: str, question_terms: set[str]) -> float:
 
 
 def _evidence_sentences_from_record(record: dict, question_terms: set[str], top_n: int = 2) -> list[str]:
-    candidates = record.get("sentences") or []
+    candidates = record_sentences(record)
     if not candidates:
         candidates = _split_sentences(record.get("text", ""))
 
@@ -1,13 +1,19 @@
 from finance_report_assistant.retrieval.index import (
+    IndexRegistry,
     RetrievalIndex,
     build_retrieval_index,
     default_index_dir,
+    get_retrieval_index,
+    index_registry,
     load_retrieval_index,
 )
 
 __all__ = [
+    "IndexRegistry",
     "RetrievalIndex",
     "build_retrieval_index",
     "default_index_dir",
+    "get_retrieval_index",
+    "index_registry",
     "load_retrieval_index",
 ]
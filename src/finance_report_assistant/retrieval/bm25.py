@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import heapq
 import math
 import re
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
-from typing import Iterable
+
+import numpy as np
 
 TOKEN_RE = re.compile(r"[a-z0-9]+")
 
@@ -12,58 +17,286 @@ def tokenize(text: str) -> list[str]:
     return TOKEN_RE.findall(text.lower())
 
 
+def _as_numpy(values: Sequence, dtype: str) -> np.ndarray:
+    if isinstance(values, (array, memoryview)):
+        return np.frombuffer(values, dtype=dtype)
+    return np.asarray(values, dtype=dtype)
+
+
+def _doc_norm(dl: int, avgdl: float, k1: float, b: float) -> float:
+    return k1 * (1 - b + b * (dl / avgdl)) if avgdl else k1
+
+
 @dataclass
 class BM25Index:
-    doc_tokens: list[list[str]]
-    idf: dict[str, float]
+    """Inverted BM25 index stored as flat CSR-style arrays.
+
+    Postings for term id `t` live in `postings_doc_ids[postings_offsets[t]:postings_offsets[t + 1]]`
+    (sorted by doc id) with matching term frequencies in `postings_tfs`. `doc_norms` holds the
+    precomputed length normalization `k1 * (1 - b + b * dl / avgdl)` per document, and
+    `max_scores` the largest contribution any single document can get from each term, which
+    bounds the work `top_k` has to do.
+    """
+
+    vocabulary: dict[str, int]
+    idf: Sequence[float]
+    max_scores: Sequence[float]
+    postings_offsets: Sequence[int]
+    postings_doc_ids: Sequence[int]
+    postings_tfs: Sequence[int]
+    doc_lengths: Sequence[int]
+    doc_norms: Sequence[float]
     avgdl: float
     k1: float = 1.5
     b: float = 0.75
 
     @classmethod
     def fit(cls, texts: Iterable[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
-        docs = [tokenize(t) for t in texts]
-        n_docs = len(docs)
-        avgdl = (sum(len(d) for d in docs) / n_docs) if n_docs else 0.0
+        term_postings: dict[str, tuple[list[int], list[int]]] = {}
+        doc_lengths = array("I")
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            freqs: dict[str, int] = {}
+            for tok in tokens:
+                freqs[tok] = freqs.get(tok, 0) + 1
+            for tok, tf in freqs.items():
+                entry = term_postings.get(tok)
+                if entry is None:
+                    entry = ([], [])
+                    term_postings[tok] = entry
+                entry[0].append(doc_id)
+                entry[1].append(tf)
+
+        n_docs = len(doc_lengths)
+        avgdl = (sum(doc_lengths) / n_docs) if n_docs else 0.0
+
+        doc_norms = array("d", (_doc_norm(dl, avgdl, k1, b) for dl in doc_lengths))
+        k1_plus = k1 + 1.0
+
+        vocabulary: dict[str, int] = {}
+        idf = array("d")
+        max_scores = array("d")
+        offsets = array("Q", [0])
+        doc_ids = array("I")
+        tfs = array("I")
+        for term_id, term in enumerate(sorted(term_postings)):
+            ids, freqs_ = term_postings[term]
+            vocabulary[term] = term_id
+            df = len(ids)
+            # Robertson-Sparck Jones-style idf smoothing.
+            term_idf = math.log(1 + ((n_docs - df + 0.5) / (df + 0.5)))
+            idf.append(term_idf)
+            max_scores.append(
+                max(
+                    term_idf * ((tf * k1_plus) / (tf + doc_norms[doc_id]))
+                    for doc_id, tf in zip(ids, freqs_, strict=True)
+                )
+            )
+            doc_ids.extend(ids)
+            tfs.extend(freqs_)
+            offsets.append(len(doc_ids))
 
-        doc_freq: dict[str, int] = {}
-        for doc in docs:
-            for tok in set(doc):
-                doc_freq[tok] = doc_freq.get(tok, 0) + 1
+        return cls(
+            vocabulary=vocabulary,
+            idf=idf,
+            max_scores=max_scores,
+            postings_offsets=offsets,
+            postings_doc_ids=doc_ids,
+            postings_tfs=tfs,
+            doc_lengths=doc_lengths,
+            doc_norms=doc_norms,
+            avgdl=avgdl,
+            k1=k1,
+            b=b,
+        )
 
-        # Robertson-Sparck Jones-style idf smoothing.
-        idf: dict[str, float] = {}
-        for tok, df in doc_freq.items():
-            idf[tok] = math.log(1 + ((n_docs - df + 0.5) / (df + 0.5)))
+    def __setstate__(self, state: dict) -> None:
+        # Indexes pickled before the inverted layout only carried raw `doc_tokens`.
+        if "doc_tokens" in state:
+            rebuilt = self.fit(
+                (" ".join(doc) for doc in state["doc_tokens"]),
+                k1=state.get("k1", 1.5),
+                b=state.get("b", 0.75),
+            )
+            state = dict(rebuilt.__dict__)
+        self.__dict__.update(state)
 
-        return cls(doc_tokens=docs, idf=idf, avgdl=avgdl, k1=k1, b=b)
+    @property
+    def n_docs(self) -> int:
+        return len(self.doc_lengths)
+
+    def postings(self, term: str) -> tuple[Sequence[int], Sequence[int]] | None:
+        """Return `(doc_ids, term_freqs)` for `term`, or None when it is out of vocabulary."""
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            return None
+        start = self.postings_offsets[term_id]
+        end = self.postings_offsets[term_id + 1]
+        return self.postings_doc_ids[start:end], self.postings_tfs[start:end]
 
     def scores(self, query: str) -> list[float]:
-        q_tokens = tokenize(query)
-        q_terms = list(dict.fromkeys(q_tokens))
-        out = [0.0 for _ in self.doc_tokens]
+        q_terms = list(dict.fromkeys(tokenize(query)))
+        out = [0.0] * self.n_docs
         if not q_terms:
             return out
 
-        for i, doc in enumerate(self.doc_tokens):
-            if not doc:
+        k1_plus = self.k1 + 1.0
+        norms = self.doc_norms
+        for term in q_terms:
+            entry = self.postings(term)
+            if entry is None:
                 continue
-            freqs: dict[str, int] = {}
-            for tok in doc:
-                freqs[tok] = freqs.get(tok, 0) + 1
+            idf = self.idf[self.vocabulary[term]]
+            for doc_id, tf in zip(*entry, strict=True):
+                out[doc_id] += idf * ((tf * k1_plus) / (tf + norms[doc_id]))
+        return out
 
-            dl = len(doc)
-            denom_norm = self.k1 * (1 - self.b + self.b * (dl / self.avgdl)) if self.avgdl else self.k1
-
-            score = 0.0
-            for term in q_terms:
-                tf = freqs.get(term, 0)
-                if tf == 0:
-                    continue
-                idf = self.idf.get(term, 0.0)
-                numer = tf * (self.k1 + 1.0)
-                denom = tf + denom_norm
-                score += idf * (numer / denom)
-            out[i] = score
+    def scores_many(self, queries: Sequence[str]) -> np.ndarray:
+        """Score a batch of queries into a `len(queries) x n_docs` float64 matrix.
+
+        The queries form a sparse query x term matrix: each distinct term's postings are
+        scored once for the whole batch and scattered into every query row that contains it.
+        Terms are applied position by position so each row sums in its own query-term order
+        and matches `scores()` exactly.
+        """
+        out = np.zeros((len(queries), self.n_docs), dtype=np.float64)
+        rows = [self._query_term_ids(q) for q in queries]
+        if not any(rows):
+            return out
+
+        doc_ids_all = _as_numpy(self.postings_doc_ids, "uint32")
+        tfs_all = _as_numpy(self.postings_tfs, "uint32")
+        norms = _as_numpy(self.doc_norms, "float64")
+        k1_plus = self.k1 + 1.0
+        contributions: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+
+        for position in range(max(len(r) for r in rows)):
+            by_term: dict[int, list[int]] = {}
+            for q_idx, term_ids in enumerate(rows):
+                if position < len(term_ids):
+                    by_term.setdefault(term_ids[position], []).append(q_idx)
+            for term_id, q_indices in by_term.items():
+                entry = contributions.get(term_id)
+                if entry is None:
+                    start = self.postings_offsets[term_id]
+                    end = self.postings_offsets[term_id + 1]
+                    doc_ids = doc_ids_all[start:end].astype(np.intp)
+                    tf = tfs_all[start:end].astype(np.float64)
+                    entry = (doc_ids, self.idf[term_id] * ((tf * k1_plus) / (tf + norms[doc_ids])))
+                    contributions[term_id] = entry
+                doc_ids, contrib = entry
+                out[np.ix_(np.asarray(q_indices, dtype=np.intp), doc_ids)] += contrib
         return out
 
+    def _query_term_ids(self, query: str) -> list[int]:
+        return [self.vocabulary[t] for t in dict.fromkeys(tokenize(query)) if t in self.vocabulary]
+
+    def _doc_score(self, term_ids: list[int], doc_id: int) -> float:
+        score = 0.0
+        for term_id in term_ids:
+            score += self._term_score(term_id, doc_id)
+        return score
+
+    def _term_score(self, term_id: int, doc_id: int) -> float:
+        start = self.postings_offsets[term_id]
+        end = self.postings_offsets[term_id + 1]
+        pos = bisect_left(self.postings_doc_ids, doc_id, start, end)
+        if pos == end or self.postings_doc_ids[pos] != doc_id:
+            return 0.0
+        tf = self.postings_tfs[pos]
+        return self.idf[term_id] * ((tf * (self.k1 + 1.0)) / (tf + self.doc_norms[doc_id]))
+
+    def top_k(self, query: str, k: int) -> list[tuple[int, float]]:
+        """Return the `k` best `(doc_id, score)` pairs with MaxScore dynamic pruning.
+
+        Terms are accumulated in descending upper-bound order. Once the summed bound of the
+        remaining terms falls below the current k-th best partial score, those terms can no
+        longer promote unseen documents, so their (usually long) postings are skipped and only
+        surviving candidates are probed. Candidates are re-scored in query-term order, so
+        results match `scores()` followed by a stable descending sort exactly: ties keep doc-id
+        order and zero-score documents pad the tail when fewer than `k` documents match.
+
+        Pruning only pays off for small `k`: with the candidate pool of `RetrievalIndex.search`
+        (100) it skips too little to beat dense `scores()` plus `select_top`, which it uses.
+        """
+        if k <= 0 or not self.n_docs:
+            return []
+
+        term_ids = self._query_term_ids(query)
+        by_impact = sorted(term_ids, key=lambda t: self.max_scores[t], reverse=True)
+        remaining = [0.0] * (len(by_impact) + 1)
+        for i in range(len(by_impact) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + self.max_scores[by_impact[i]]
+
+        k1_plus = self.k1 + 1.0
+        norms = self.doc_norms
+        # Sparse partial scores, plus a size-k min-heap of the best partials. Partials only
+        # grow, so the heap is updated only for documents the current term touches; entries
+        # superseded by a higher score of the same document are dropped lazily.
+        acc: dict[int, float] = {}
+        heap: list[tuple[float, int]] = []
+        in_heap: dict[int, float] = {}
+        threshold = 0.0
+        essential = 0
+        for term_id in by_impact:
+            if essential and remaining[essential] < threshold * (1 - 1e-9):
+                break
+            idf = self.idf[term_id]
+            start = self.postings_offsets[term_id]
+            end = self.postings_offsets[term_id + 1]
+            for doc_id, tf in zip(
+                self.postings_doc_ids[start:end], self.postings_tfs[start:end], strict=True
+            ):
+                score = acc.get(doc_id, 0.0) + idf * ((tf * k1_plus) / (tf + norms[doc_id]))
+                acc[doc_id] = score
+                if doc_id in in_heap or len(in_heap) < k or score > threshold:
+                    in_heap[doc_id] = score
+                    heapq.heappush(heap, (score, doc_id))
+                    while len(in_heap) > k or in_heap.get(heap[0][1]) != heap[0][0]:
+                        stale_score, stale_doc = heapq.heappop(heap)
+                        if in_heap.get(stale_doc) == stale_score:
+                            del in_heap[stale_doc]
+                    if len(in_heap) >= k:
+                        threshold = heap[0][0]
+            essential += 1
+
+        # Partial scores are lower bounds, so the k-th partial bounds the final k-th score and
+        # only documents whose partial plus the skipped terms' bound can reach it survive.
+        rest = remaining[essential]
+        cutoff = (threshold - rest) * (1 - 1e-9)
+        candidates = sorted(doc_id for doc_id, score in acc.items() if score >= cutoff)
+        candidates.sort(key=acc.__getitem__, reverse=True)  # stable: ties stay in doc-id order
+
+        skipped = by_impact[essential:]
+        full: list[float] = []
+        approx: list[tuple[int, float]] = []
+        for doc_id in candidates:
+            if len(full) >= k and (acc[doc_id] + rest) < full[0] * (1 - 1e-9):
+                break
+            score = acc[doc_id]
+            for term_id in skipped:
+                score += self._term_score(term_id, doc_id)
+            approx.append((doc_id, score))
+            if len(full) < k:
+                heapq.heappush(full, score)
+            elif score > full[0]:
+                heapq.heapreplace(full, score)
+
+        # Re-score the boundary set in query-term order so floats match `scores()` exactly.
+        floor = full[0] * (1 - 1e-9) if len(full) >= k else 0.0
+        exact: list[tuple[int, float]] = []
+        for doc_id, score in approx:
+            if score < floor:
+                continue
+            exact.append((doc_id, self._doc_score(term_ids, doc_id)))
+
+        ranked = heapq.nsmallest(k, exact, key=lambda x: (-x[1], x[0]))
+        if len(ranked) < k:
+            seen = {doc_id for doc_id, _ in ranked}
+            for doc_id in range(self.n_docs):
+                if len(ranked) >= k:
+                    break
+                if doc_id not in seen:
+                    ranked.append((doc_id, 0.0))
+        return ranked
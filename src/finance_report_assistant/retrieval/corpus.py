@@ -6,8 +6,14 @@ from finance_report_assistant.core.config import settings
 from finance_report_assistant.utils.chunks import load_chunk_records as _load_chunk_records
 
 
-def discover_chunk_files(ticker: str, form: str = "10-K", limit: int | None = None) -> list[Path]:
-    root = settings.data_dir / "processed" / "chunks" / ticker.upper() / form
+def discover_chunk_files(
+    ticker: str, form: str = "10-K", limit: int | None = None, variant: str | None = None
+) -> list[Path]:
+    """Chunk files of `ticker` / `form`, from the named chunking `variant` when given."""
+    if variant is not None:
+        root = settings.data_dir / "processed" / "chunk_variants" / variant / ticker.upper() / form
+    else:
+        root = settings.data_dir / "processed" / "chunks" / ticker.upper() / form
     if not root.exists():
         return []
 
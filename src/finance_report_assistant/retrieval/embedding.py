@@ -3,10 +3,14 @@ from __future__ import annotations
 import hashlib
 import math
 import re
-from dataclasses import dataclass
-from typing import Iterable
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
 
 TOKEN_RE = re.compile(r"[a-z0-9]+")
+EMBEDDING_BACKENDS = ("dict", "matrix")
 
 
 def _feature_stream(text: str) -> list[str]:
@@ -54,19 +58,93 @@ def _sparse_dot(a: dict[int, float], b: dict[int, float]) -> float:
     return sum(val * b.get(idx, 0.0) for idx, val in a.items())
 
 
+def _densify(vectors: list[dict[int, float]], dim: int) -> np.ndarray:
+    matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+    for row, vec in enumerate(vectors):
+        if vec:
+            matrix[row, list(vec)] = list(vec.values())
+    return matrix
+
+
 @dataclass
 class HashEmbeddingIndex:
+    """Hashed feature embeddings with two interchangeable storage backends.
+
+    - `dict`: one sparse `{slot: weight}` dict per document, scored with a Python dot product.
+    - `matrix`: a contiguous `float32` N x dim matrix, scored with one matrix-vector product and
+      optionally memory-mapped from an `.npy` file.
+    """
+
     dim: int
-    doc_vectors: list[dict[int, float]]
+    doc_vectors: list[dict[int, float]] = field(default_factory=list)
+    matrix: np.ndarray | None = None
+
+    @classmethod
+    def fit(
+        cls, texts: Iterable[str], dim: int = 384, backend: str = "dict"
+    ) -> HashEmbeddingIndex:
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(
+                f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}"
+            )
+        if backend == "matrix":
+            texts = list(texts)
+            matrix = np.zeros((len(texts), dim), dtype=np.float32)
+            for row, text in enumerate(texts):
+                vec = _encode_sparse(text, dim=dim)
+                if vec:
+                    matrix[row, list(vec)] = list(vec.values())
+            return cls(dim=dim, matrix=matrix)
+        return cls(dim=dim, doc_vectors=[_encode_sparse(text, dim=dim) for text in texts])
+
+    @property
+    def backend(self) -> str:
+        return "matrix" if self.matrix is not None else "dict"
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.matrix) if self.matrix is not None else len(self.doc_vectors)
+
+    def as_array(self) -> np.ndarray:
+        if self.matrix is not None:
+            return self.matrix
+        return _densify(self.doc_vectors, self.dim)
+
+    def to_matrix(self) -> HashEmbeddingIndex:
+        if self.matrix is not None:
+            return self
+        return HashEmbeddingIndex(dim=self.dim, matrix=self.as_array())
+
+    def save_matrix(self, path: Path) -> Path:
+        np.save(path, self.as_array())
+        return path
 
     @classmethod
-    def fit(cls, texts: Iterable[str], dim: int = 384) -> "HashEmbeddingIndex":
-        vectors = [_encode_sparse(text, dim=dim) for text in texts]
-        return cls(dim=dim, doc_vectors=vectors)
+    def load_matrix(cls, path: Path, mmap: bool = True) -> HashEmbeddingIndex:
+        matrix = np.load(path, mmap_mode="r" if mmap else None)
+        if matrix.ndim != 2 or matrix.dtype != np.float32:
+            raise ValueError(f"Expected a 2-D float32 embedding matrix in {path}")
+        return cls(dim=int(matrix.shape[1]), matrix=matrix)
 
     def scores(self, query: str) -> list[float]:
         q = _encode_sparse(query, dim=self.dim)
         if not q:
-            return [0.0 for _ in self.doc_vectors]
+            return [0.0] * self.n_docs
+        if self.matrix is not None:
+            dense = np.zeros(self.dim, dtype=np.float32)
+            dense[list(q)] = list(q.values())
+            return (self.matrix @ dense).tolist()
         return [_sparse_dot(q, dv) for dv in self.doc_vectors]
 
+    def scores_many(self, queries: Sequence[str]) -> np.ndarray:
+        """Score a batch of queries into a `len(queries) x n_docs` matrix."""
+        if self.matrix is None:
+            return np.array([self.scores(q) for q in queries], dtype=np.float64).reshape(
+                len(queries), self.n_docs
+            )
+        dense = np.zeros((len(queries), self.dim), dtype=np.float32)
+        for row, query in enumerate(queries):
+            q = _encode_sparse(query, dim=self.dim)
+            if q:
+                dense[row, list(q)] = list(q.values())
+        return dense @ self.matrix.T
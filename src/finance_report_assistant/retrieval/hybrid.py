@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import heapq
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 
+import numpy as np
+
+DEFAULT_CANDIDATE_POOL = 100
+
 
 @dataclass
 class RetrievalHit:
@@ -17,8 +23,29 @@ def _rank_positions(scores: list[float]) -> dict[int, int]:
     return {doc_idx: rank for rank, doc_idx in enumerate(ranked, start=1)}
 
 
+def select_top(scores: Sequence[float], m: int) -> list[tuple[int, float]]:
+    """Return the `m` best `(doc_idx, score)` pairs without sorting the whole score list.
+
+    Uses `argpartition`, then orders only the selection. Ties keep doc-index order, so the
+    result equals the head of a stable descending sort.
+    """
+    values = np.asarray(scores, dtype=np.float64)
+    n = len(values)
+    if m <= 0 or n == 0:
+        return []
+    if m >= n:
+        order = np.argsort(-values, kind="stable")
+    else:
+        kth = values[np.argpartition(-values, m - 1)[:m]].min()
+        above = np.flatnonzero(values > kth)
+        ties = np.flatnonzero(values == kth)[: m - len(above)]
+        selected = np.concatenate([above, ties])
+        order = selected[np.argsort(-values[selected], kind="stable")]
+    return [(int(i), float(values[i])) for i in order]
+
+
 def fuse_rankings(
-    records: list[dict],
+    records: Sequence[dict],
     bm25_scores: list[float],
     embedding_scores: list[float],
     top_k: int = 5,
@@ -26,6 +53,7 @@ def fuse_rankings(
     embedding_weight: float = 0.45,
     rrf_k: int = 60,
 ) -> list[RetrievalHit]:
+    """Exact weighted RRF over full-corpus rankings (kept for eval and error measurement)."""
     if not records:
         return []
 
@@ -39,7 +67,7 @@ def fuse_rankings(
         score = bm25_weight / (rrf_k + r_bm25) + embedding_weight / (rrf_k + r_emb)
         scored.append((i, score))
 
-    ranked = sorted(scored, key=lambda x: x[1], reverse=True)[:top_k]
+    ranked = heapq.nsmallest(top_k, scored, key=lambda x: (-x[1], x[0]))
 
     hits: list[RetrievalHit] = []
     for rank, (doc_idx, score) in enumerate(ranked, start=1):
@@ -54,3 +82,61 @@ def fuse_rankings(
         )
     return hits
 
+
+def fuse_candidates(
+    records: Sequence[dict],
+    bm25_ranked: list[tuple[int, float]],
+    embedding_ranked: list[tuple[int, float]],
+    top_k: int = 5,
+    bm25_weight: float = 0.55,
+    embedding_weight: float = 0.45,
+    rrf_k: int = 60,
+    default_rank: int | None = None,
+    bm25_score_of: Callable[[int], float] | None = None,
+    embedding_score_of: Callable[[int], float] | None = None,
+) -> list[RetrievalHit]:
+    """Weighted RRF over the union of each retriever's top-M candidates.
+
+    `*_ranked` are best-first `(doc_idx, score)` lists, e.g. from `select_top` or
+    `BM25Index.top_k`. Documents missing from one retriever's list get `default_rank`
+    (one past the longest list), which approximates their true rank from below. When both
+    lists cover the corpus the result equals `fuse_rankings`. The optional `*_score_of`
+    callbacks fill in raw scores for hits a retriever did not return.
+    """
+    if not records:
+        return []
+    if default_rank is None:
+        default_rank = max(len(bm25_ranked), len(embedding_ranked)) + 1
+
+    bm25_ranks = {doc_idx: rank for rank, (doc_idx, _) in enumerate(bm25_ranked, start=1)}
+    emb_ranks = {doc_idx: rank for rank, (doc_idx, _) in enumerate(embedding_ranked, start=1)}
+
+    scored: list[tuple[int, float]] = []
+    for doc_idx in dict.fromkeys([d for d, _ in bm25_ranked] + [d for d, _ in embedding_ranked]):
+        score = bm25_weight / (rrf_k + bm25_ranks.get(doc_idx, default_rank)) + embedding_weight / (
+            rrf_k + emb_ranks.get(doc_idx, default_rank)
+        )
+        scored.append((doc_idx, score))
+
+    ranked = heapq.nsmallest(top_k, scored, key=lambda x: (-x[1], x[0]))
+
+    bm25_known = dict(bm25_ranked)
+    emb_known = dict(embedding_ranked)
+    hits: list[RetrievalHit] = []
+    for rank, (doc_idx, score) in enumerate(ranked, start=1):
+        bm25_score = bm25_known.get(doc_idx)
+        if bm25_score is None:
+            bm25_score = bm25_score_of(doc_idx) if bm25_score_of else 0.0
+        emb_score = emb_known.get(doc_idx)
+        if emb_score is None:
+            emb_score = embedding_score_of(doc_idx) if embedding_score_of else 0.0
+        hits.append(
+            RetrievalHit(
+                rank=rank,
+                score=score,
+                bm25_score=bm25_score,
+                embedding_score=emb_score,
+                record=records[doc_idx],
+            )
+        )
+    return hits
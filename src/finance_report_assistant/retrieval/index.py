@@ -2,55 +2,194 @@ from __future__ import annotations
 
 import json
 import pickle
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
+
 from finance_report_assistant.core.config import settings
 from finance_report_assistant.retrieval.bm25 import BM25Index
 from finance_report_assistant.retrieval.corpus import discover_chunk_files, load_chunk_records
 from finance_report_assistant.retrieval.embedding import HashEmbeddingIndex
-from finance_report_assistant.retrieval.hybrid import RetrievalHit, fuse_rankings
+from finance_report_assistant.retrieval.hybrid import (
+    DEFAULT_CANDIDATE_POOL,
+    RetrievalHit,
+    fuse_candidates,
+    fuse_rankings,
+    select_top,
+)
+from finance_report_assistant.retrieval.records import (
+    RecordStore,
+    scan_jsonl_offsets,
+    write_records_jsonl,
+)
+from finance_report_assistant.retrieval.storage import (
+    INDEX_FILE_NAME,
+    read_index_file,
+    write_index_file,
+)
+
+RECORDS_FILE_NAME = "records.jsonl"
+
+
+def _row_scorer(row: np.ndarray) -> Callable[[int], float]:
+    return lambda doc_idx: float(row[doc_idx])
+
+
+@dataclass
+class BatchScores:
+    """Per-retriever score matrices for a batch of queries (`len(queries) x n_docs`)."""
+
+    queries: list[str]
+    bm25: np.ndarray
+    embedding: np.ndarray
 
 
 @dataclass
 class RetrievalIndex:
-    records: list[dict]
+    records: RecordStore | list[dict]
     bm25: BM25Index
     embedding: HashEmbeddingIndex
 
+    def close(self) -> None:
+        """Release the memory maps behind a loaded index; in-memory indexes have none."""
+        if isinstance(self.records, RecordStore):
+            self.records.close()
+
     def search(
         self,
         query: str,
         top_k: int = 5,
         bm25_weight: float = 0.55,
         embedding_weight: float = 0.45,
+        exact: bool = False,
+        candidate_pool: int = DEFAULT_CANDIDATE_POOL,
     ) -> list[RetrievalHit]:
+        """Hybrid search; fuses each retriever's top-`candidate_pool` unless `exact` is set."""
+        if exact:
+            return fuse_rankings(
+                records=self.records,
+                bm25_scores=self.bm25.scores(query),
+                embedding_scores=self.embedding.scores(query),
+                top_k=top_k,
+                bm25_weight=bm25_weight,
+                embedding_weight=embedding_weight,
+            )
+
+        pool = max(top_k, candidate_pool)
         bm25_scores = self.bm25.scores(query)
         emb_scores = self.embedding.scores(query)
-        return fuse_rankings(
+        return fuse_candidates(
             records=self.records,
-            bm25_scores=bm25_scores,
-            embedding_scores=emb_scores,
+            bm25_ranked=select_top(bm25_scores, pool),
+            embedding_ranked=select_top(emb_scores, pool),
             top_k=top_k,
             bm25_weight=bm25_weight,
             embedding_weight=embedding_weight,
+            bm25_score_of=bm25_scores.__getitem__,
+            embedding_score_of=emb_scores.__getitem__,
+        )
+
+    def score_many(self, queries: Sequence[str]) -> BatchScores:
+        queries = list(queries)
+        return BatchScores(
+            queries=queries,
+            bm25=self.bm25.scores_many(queries),
+            embedding=self.embedding.scores_many(queries),
+        )
+
+    def fuse_many(
+        self,
+        batch: BatchScores,
+        top_k: int = 5,
+        weights: tuple[float, float] = (0.55, 0.45),
+        exact: bool = False,
+        candidate_pool: int = DEFAULT_CANDIDATE_POOL,
+    ) -> list[list[RetrievalHit]]:
+        bm25_weight, embedding_weight = weights
+        out: list[list[RetrievalHit]] = []
+        for bm25_row, emb_row in zip(batch.bm25, batch.embedding, strict=True):
+            if exact:
+                hits = fuse_rankings(
+                    records=self.records,
+                    bm25_scores=bm25_row.tolist(),
+                    embedding_scores=emb_row.tolist(),
+                    top_k=top_k,
+                    bm25_weight=bm25_weight,
+                    embedding_weight=embedding_weight,
+                )
+            else:
+                pool = max(top_k, candidate_pool)
+                hits = fuse_candidates(
+                    records=self.records,
+                    bm25_ranked=select_top(bm25_row, pool),
+                    embedding_ranked=select_top(emb_row, pool),
+                    top_k=top_k,
+                    bm25_weight=bm25_weight,
+                    embedding_weight=embedding_weight,
+                    bm25_score_of=_row_scorer(bm25_row),
+                    embedding_score_of=_row_scorer(emb_row),
+                )
+            out.append(hits)
+        return out
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        top_k: int = 5,
+        weights: tuple[float, float] = (0.55, 0.45),
+        exact: bool = False,
+        candidate_pool: int = DEFAULT_CANDIDATE_POOL,
+    ) -> list[list[RetrievalHit]]:
+        """Run hybrid search for many queries, scoring them together as matrices."""
+        return self.fuse_many(
+            self.score_many(queries),
+            top_k=top_k,
+            weights=weights,
+            exact=exact,
+            candidate_pool=candidate_pool,
         )
 
 
-def default_index_dir(ticker: str, form: str) -> Path:
+def default_index_dir(ticker: str, form: str, variant: str | None = None) -> Path:
+    """Index directory of `ticker` / `form`, or of one of its chunking variants."""
+    if variant is not None:
+        return (
+            settings.data_dir / "index" / "retrieval_variants" / variant / ticker.upper() / form
+        )
     return settings.data_dir / "index" / "retrieval" / ticker.upper() / form
 
 
+LEGACY_INDEX_FILES = ("bm25.pkl", "embedding.pkl", "embedding.npy")
+
+
+def _write_index_manifest(output_dir: Path, manifest: dict, header: dict) -> dict:
+    manifest = {
+        **manifest,
+        "format": {"name": "fra-index", "version": header["format_version"]},
+        "files": [INDEX_FILE_NAME, RECORDS_FILE_NAME],
+    }
+    (output_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
 def build_retrieval_index(
     ticker: str,
     form: str = "10-K",
     limit: int | None = None,
     embedding_dim: int = 384,
     out_dir: Path | None = None,
+    variant: str | None = None,
 ) -> tuple[Path, dict]:
-    chunk_files = discover_chunk_files(ticker=ticker, form=form, limit=limit)
+    """Index the chunks of `ticker` / `form`, or those of the named chunking `variant` (see
+    `build_chunk_variants_for_filing_dir`), which get their own index directory."""
+    chunk_files = discover_chunk_files(ticker=ticker, form=form, limit=limit, variant=variant)
     if not chunk_files:
-        raise FileNotFoundError(f"No chunk files found for {ticker.upper()} {form}")
+        label = f"{ticker.upper()} {form}" + (f" variant {variant}" if variant else "")
+        raise FileNotFoundError(f"No chunk files found for {label}")
 
     records = load_chunk_records(chunk_files)
     if not records:
@@ -58,24 +197,20 @@ def build_retrieval_index(
 
     texts = [r["text"] for r in records]
     bm25 = BM25Index.fit(texts)
-    embedding = HashEmbeddingIndex.fit(texts, dim=embedding_dim)
-    index = RetrievalIndex(records=records, bm25=bm25, embedding=embedding)
+    embedding = HashEmbeddingIndex.fit(texts, dim=embedding_dim, backend="matrix")
 
-    output_dir = out_dir or default_index_dir(ticker=ticker, form=form)
+    output_dir = out_dir or default_index_dir(ticker=ticker, form=form, variant=variant)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    (output_dir / "records.jsonl").write_text(
-        "\n".join(json.dumps(r, ensure_ascii=False) for r in records) + "\n",
-        encoding="utf-8",
-    )
-    with (output_dir / "bm25.pkl").open("wb") as f:
-        pickle.dump(index.bm25, f)
-    with (output_dir / "embedding.pkl").open("wb") as f:
-        pickle.dump(index.embedding, f)
+    record_offsets = write_records_jsonl(output_dir / RECORDS_FILE_NAME, records)
+    header = write_index_file(output_dir / INDEX_FILE_NAME, bm25, embedding, record_offsets)
+    for name in LEGACY_INDEX_FILES:
+        (output_dir / name).unlink(missing_ok=True)
 
     manifest = {
         "ticker": ticker.upper(),
         "form": form,
+        "variant": variant,
         "record_count": len(records),
         "chunk_files": [str(p) for p in chunk_files],
         "embedding": {
@@ -83,23 +218,143 @@ def build_retrieval_index(
             "dim": embedding_dim,
         },
     }
-    (output_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return output_dir, _write_index_manifest(output_dir, manifest, header)
 
-    return output_dir, manifest
 
-
-def load_retrieval_index(index_dir: Path) -> RetrievalIndex:
-    records: list[dict] = []
-    for line in (index_dir / "records.jsonl").read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        records.append(json.loads(line))
+def _load_legacy_index(index_dir: Path) -> RetrievalIndex:
+    records_path = index_dir / RECORDS_FILE_NAME
+    records = RecordStore(records_path, scan_jsonl_offsets(records_path))
 
     with (index_dir / "bm25.pkl").open("rb") as f:
         bm25: BM25Index = pickle.load(f)
-    with (index_dir / "embedding.pkl").open("rb") as f:
-        embedding: HashEmbeddingIndex = pickle.load(f)
+    matrix_path = index_dir / "embedding.npy"
+    if matrix_path.exists():
+        embedding = HashEmbeddingIndex.load_matrix(matrix_path)
+    else:
+        with (index_dir / "embedding.pkl").open("rb") as f:
+            embedding = pickle.load(f)
 
     return RetrievalIndex(records=records, bm25=bm25, embedding=embedding)
 
+
+def load_retrieval_index(index_dir: Path, allow_pickle: bool = False) -> RetrievalIndex:
+    """Open an index directory.
+
+    Binary (`index.fra`) indexes are memory-mapped and records are decoded on access. Legacy
+    pickle indexes are only loaded when `allow_pickle` is set, since unpickling executes code
+    from the file; convert them with `fra convert-index` instead.
+    """
+    index_path = index_dir / INDEX_FILE_NAME
+    if index_path.exists():
+        index_file = read_index_file(index_path)
+        return RetrievalIndex(
+            records=RecordStore(
+                index_dir / RECORDS_FILE_NAME, index_file.record_offsets, index_file=index_file
+            ),
+            bm25=index_file.bm25,
+            embedding=index_file.embedding,
+        )
+
+    if (index_dir / "bm25.pkl").exists():
+        if not allow_pickle:
+            raise ValueError(
+                f"{index_dir} holds a legacy pickle index; run `fra convert-index` to upgrade it"
+            )
+        return _load_legacy_index(index_dir)
+
+    raise FileNotFoundError(f"No retrieval index found in {index_dir}")
+
+
+def convert_retrieval_index(index_dir: Path, keep_legacy: bool = False) -> dict:
+    """Rewrite a legacy pickle index in place as a binary `index.fra` index."""
+    legacy = _load_legacy_index(index_dir)
+    record_offsets = write_records_jsonl(index_dir / RECORDS_FILE_NAME, legacy.records)
+    legacy.close()
+
+    header = write_index_file(
+        index_dir / INDEX_FILE_NAME, legacy.bm25, legacy.embedding, record_offsets
+    )
+    manifest_path = index_dir / "manifest.json"
+    manifest = (
+        json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+    )
+    manifest.setdefault("record_count", len(legacy.records))
+    manifest.get("embedding", {}).pop("backend", None)
+    manifest = _write_index_manifest(index_dir, manifest, header)
+
+    if not keep_legacy:
+        for name in LEGACY_INDEX_FILES:
+            (index_dir / name).unlink(missing_ok=True)
+    return manifest
+
+
+@dataclass
+class _RegistryEntry:
+    index_dir: Path
+    manifest_stamp: tuple[int, int]
+    nbytes: int
+    index: RetrievalIndex
+
+
+def _manifest_stamp(index_dir: Path) -> tuple[int, int]:
+    stat = (index_dir / "manifest.json").stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class IndexRegistry:
+    """Process-wide cache of opened indexes keyed by `(ticker, form)`.
+
+    Each lookup stats the index's `manifest.json`, which is written last by every build or
+    conversion, and reopens the index when it changed. Entries are charged the size of their
+    mapped `index.fra`; once the total exceeds `max_bytes` the least recently used indexes
+    are dropped. The most recent one is always kept, even if it alone exceeds the budget.
+    Dropped and replaced indexes are not closed, since other sessions may still be searching
+    them; their maps are released once the last reference goes away.
+    """
+
+    def __init__(self, max_bytes: int | None = None) -> None:
+        self.max_bytes = max_bytes if max_bytes is not None else settings.index_cache_mb * 2**20
+        self._entries: OrderedDict[tuple[str, str], _RegistryEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ticker: str, form: str = "10-K") -> RetrievalIndex:
+        key = (ticker.upper(), form)
+        index_dir = default_index_dir(ticker=ticker, form=form)
+        stamp = _manifest_stamp(index_dir)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.index_dir == index_dir and entry.manifest_stamp == stamp:
+                self._entries.move_to_end(key)
+                return entry.index
+
+        index = load_retrieval_index(index_dir)
+        nbytes = (index_dir / INDEX_FILE_NAME).stat().st_size
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = _RegistryEntry(index_dir, stamp, nbytes, index)
+            while len(self._entries) > 1 and self.nbytes > self.max_bytes:
+                self._entries.popitem(last=False)
+        return index
+
+    def invalidate(self, ticker: str | None = None, form: str | None = None) -> None:
+        """Forget cached indexes, optionally only those matching `ticker` and/or `form`."""
+        with self._lock:
+            for key in list(self._entries):
+                ticker_matches = ticker is None or key[0] == ticker.upper()
+                if ticker_matches and (form is None or key[1] == form):
+                    del self._entries[key]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+index_registry = IndexRegistry()
+
+
+def get_retrieval_index(ticker: str, form: str = "10-K") -> RetrievalIndex:
+    """Return the cached index for `(ticker, form)` from the process-wide registry."""
+    return index_registry.get(ticker=ticker, form=form)
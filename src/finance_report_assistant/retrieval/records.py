@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import mmap
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, overload
+
+import orjson
+
+if TYPE_CHECKING:
+    from finance_report_assistant.retrieval.storage import IndexFile
+
+DEFAULT_RECORD_CACHE_SIZE = 256
+
+
+def compact_record(record: dict) -> dict:
+    """Drop sentence text that can be recovered from the chunk text and the sentence spans.
+
+    Legacy chunk records (written before `sentence_starts` / `sentence_ends`) carry every
+    sentence three times: in `text`, in `sentences` and in `sentence_spans[*].text`. When the
+    spans slice `text` exactly, only their offsets are kept and `sentences` is omitted;
+    `expand_record` restores both. Current records, and records whose spans do not line up
+    with `text`, are returned unchanged.
+    """
+    spans = record.get("sentence_spans")
+    if not spans or "sentences" not in record:
+        return record
+    text = record.get("text") or ""
+    for span in spans:
+        if text[span["char_start"] : span["char_end"]] != span.get("text"):
+            return record
+    if record["sentences"] != [span["text"] for span in spans if span["text"]]:
+        return record
+
+    out = {key: value for key, value in record.items() if key != "sentences"}
+    out["sentence_spans"] = [
+        {key: value for key, value in span.items() if key != "text"} for span in spans
+    ]
+    return out
+
+
+def expand_record(record: dict) -> dict:
+    """Inverse of `compact_record`; full records pass through untouched."""
+    spans = record.get("sentence_spans")
+    if not spans or "sentences" in record:
+        return record
+    text = record.get("text") or ""
+    full_spans = [
+        {"text": text[span["char_start"] : span["char_end"]], **span} for span in spans
+    ]
+    record["sentences"] = [span["text"] for span in full_spans if span["text"]]
+    record["sentence_spans"] = full_spans
+    return record
+
+
+def write_records_jsonl(path: Path, records: Iterable[dict]) -> array:
+    """Write one compacted JSON record per line and return the `N + 1` line byte offsets.
+
+    The file is written next to `path` and moved into place, so stores that still map the
+    previous file keep reading it instead of a truncated one.
+    """
+    offsets = array("Q", [0])
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        for record in records:
+            line = orjson.dumps(compact_record(record), option=orjson.OPT_APPEND_NEWLINE)
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+    tmp_path.replace(path)
+    return offsets
+
+
+def scan_jsonl_offsets(path: Path) -> array:
+    """Compute line offsets for an existing JSONL file without decoding any JSON.
+
+    Blank lines are folded into the preceding record's span, which JSON decoding ignores.
+    """
+    offsets = array("Q")
+    position = 0
+    with path.open("rb") as f:
+        for line in f:
+            if line.strip():
+                offsets.append(position)
+            position += len(line)
+    offsets.append(position)
+    return offsets
+
+
+class RecordStore(Sequence[dict]):
+    """Read-only view over a JSONL record file that decodes records on access.
+
+    `offsets` holds `N + 1` byte positions; record `i` is the line between `offsets[i]` and
+    `offsets[i + 1]`. The file is memory-mapped lazily, so opening a store costs nothing
+    until the first record is read. The `cache_size` most recently read records are kept
+    decoded, since follow-up steps (QA, summaries, the UI) revisit the same hits. Stores are
+    shared across threads by the index registry, so the cache and the lazy map are locked.
+
+    When `offsets` is a view into an opened `index_file`, the store owns that file and
+    `close` unmaps it too.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        offsets: Sequence[int],
+        cache_size: int = DEFAULT_RECORD_CACHE_SIZE,
+        index_file: IndexFile | None = None,
+    ) -> None:
+        self.path = path
+        self.offsets = offsets
+        self.cache_size = cache_size
+        self.index_file = index_file
+        self._cache: OrderedDict[int, dict] = OrderedDict()
+        self._mmap: mmap.mmap | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+
+    @overload
+    def __getitem__(self, idx: int) -> dict: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> list[dict]: ...
+
+    def __getitem__(self, idx: int | slice) -> dict | list[dict]:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        n = len(self)
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError("record index out of range")
+        with self._lock:
+            record = self._cache.get(idx)
+            if record is not None:
+                self._cache.move_to_end(idx)
+                return record
+        record = self._decode(idx)
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[idx] = record
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return record
+
+    def __iter__(self) -> Iterator[dict]:
+        # Full scans (eval, re-indexing) bypass the cache so they do not evict hot hits.
+        for i in range(len(self)):
+            with self._lock:
+                record = self._cache.get(i)
+            yield record or self._decode(i)
+
+    def _buffer(self) -> mmap.mmap:
+        with self._lock:
+            if self._mmap is None:
+                with self.path.open("rb") as f:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap
+
+    def _decode(self, idx: int) -> dict:
+        start = self.offsets[idx]
+        end = self.offsets[idx + 1]
+        return expand_record(orjson.loads(self._buffer()[start:end]))
+
+    def close(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+        if self.index_file is not None:
+            self.index_file.close()
+            self.index_file = None
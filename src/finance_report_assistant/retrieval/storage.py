@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+
+from finance_report_assistant.retrieval.bm25 import BM25Index
+from finance_report_assistant.retrieval.embedding import HashEmbeddingIndex
+
+INDEX_FILE_NAME = "index.fra"
+INDEX_MAGIC = b"FRAINDEX"
+INDEX_FORMAT_VERSION = 1
+
+_PREAMBLE = struct.Struct("<8sIIQ")
+_ALIGN = 64
+_ViewFormat = Literal["I", "Q", "f", "d"]
+# dtype tag -> (memoryview / array format, numpy dtype)
+_DTYPES: dict[str, tuple[_ViewFormat, str]] = {
+    "u4": ("I", "<u4"),
+    "u8": ("Q", "<u8"),
+    "f4": ("f", "<f4"),
+    "f8": ("d", "<f8"),
+}
+
+
+class IndexMapping:
+    """Read-only memory map of an index file that owns the views handed out over it.
+
+    `close` releases those views and unmaps the file. Arrays built directly over the map
+    (the embedding matrix) keep it alive until they are garbage collected.
+    """
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: list[memoryview[Any]] = []
+
+    def view(self, start: int, nbytes: int, view_format: _ViewFormat) -> memoryview[Any]:
+        base = memoryview(self.buffer)
+        window = base[start : start + nbytes]
+        view: memoryview[Any] = window.cast(view_format)
+        self._views += [base, window, view]
+        return view
+
+    def close(self) -> None:
+        while self._views:
+            self._views.pop().release()
+        try:
+            self.buffer.close()
+        except BufferError:
+            pass
+
+
+@dataclass
+class IndexFile:
+    bm25: BM25Index
+    embedding: HashEmbeddingIndex
+    record_offsets: Sequence[int]
+    header: dict
+    mapping: IndexMapping
+
+    def close(self) -> None:
+        self.mapping.close()
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _to_bytes(values: Sequence | np.ndarray, dtype: str) -> bytes:
+    if isinstance(values, np.ndarray):
+        arr = values
+    elif isinstance(values, (array, memoryview)):
+        try:
+            arr = np.frombuffer(values, dtype=_DTYPES[dtype][1][1:])
+        except ValueError:
+            arr = np.asarray(values)
+    else:
+        arr = np.asarray(values)
+    return np.ascontiguousarray(arr, dtype=_DTYPES[dtype][1]).tobytes()
+
+
+def write_index_file(
+    path: Path,
+    bm25: BM25Index,
+    embedding: HashEmbeddingIndex,
+    record_offsets: Sequence[int],
+) -> dict:
+    """Serialize BM25 postings, the embedding matrix and record offsets into `path`.
+
+    The file starts with a fixed preamble (magic, format version, header length, data start),
+    followed by a JSON header describing each section's dtype, offset and shape. Sections are
+    raw little-endian arrays aligned to 64 bytes, so readers can map them without parsing.
+    """
+    matrix = embedding.as_array()
+    terms = sorted(bm25.vocabulary, key=bm25.vocabulary.__getitem__)
+    payloads: dict[str, tuple[str, bytes, list[int]]] = {
+        "terms": ("bytes", "\n".join(terms).encode("utf-8"), [len(terms)]),
+        "idf": ("f8", _to_bytes(bm25.idf, "f8"), [len(bm25.idf)]),
+        "max_scores": ("f8", _to_bytes(bm25.max_scores, "f8"), [len(bm25.max_scores)]),
+        "postings_offsets": (
+            "u8",
+            _to_bytes(bm25.postings_offsets, "u8"),
+            [len(bm25.postings_offsets)],
+        ),
+        "postings_doc_ids": (
+            "u4",
+            _to_bytes(bm25.postings_doc_ids, "u4"),
+            [len(bm25.postings_doc_ids)],
+        ),
+        "postings_tfs": ("u4", _to_bytes(bm25.postings_tfs, "u4"), [len(bm25.postings_tfs)]),
+        "doc_lengths": ("u4", _to_bytes(bm25.doc_lengths, "u4"), [len(bm25.doc_lengths)]),
+        "doc_norms": ("f8", _to_bytes(bm25.doc_norms, "f8"), [len(bm25.doc_norms)]),
+        "embedding": ("f4", _to_bytes(matrix, "f4"), list(matrix.shape)),
+        "record_offsets": ("u8", _to_bytes(record_offsets, "u8"), [len(record_offsets)]),
+    }
+
+    sections: dict[str, dict] = {}
+    cursor = 0
+    for name, (dtype, blob, shape) in payloads.items():
+        sections[name] = {"dtype": dtype, "offset": cursor, "nbytes": len(blob), "shape": shape}
+        cursor = _align(cursor + len(blob))
+
+    header = {
+        "format_version": INDEX_FORMAT_VERSION,
+        "params": {
+            "n_docs": bm25.n_docs,
+            "n_terms": len(terms),
+            "avgdl": bm25.avgdl,
+            "k1": bm25.k1,
+            "b": bm25.b,
+            "embedding_dim": embedding.dim,
+        },
+        "sections": sections,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header_bytes))
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(_PREAMBLE.pack(INDEX_MAGIC, INDEX_FORMAT_VERSION, len(header_bytes), data_start))
+        f.write(header_bytes)
+        for name, (_, blob, _) in payloads.items():
+            f.seek(data_start + sections[name]["offset"])
+            f.write(blob)
+        f.truncate(data_start + cursor)
+    tmp_path.replace(path)
+    return header
+
+
+def _section_view(mapping: IndexMapping, data_start: int, section: dict) -> Sequence:
+    start = data_start + section["offset"]
+    view_format = _DTYPES[section["dtype"]][0]
+    if sys.byteorder == "little":
+        return mapping.view(start, section["nbytes"], view_format)
+    # Big-endian hosts pay one copy to swap the stored little-endian values.
+    values = array(view_format, mapping.buffer[start : start + section["nbytes"]])
+    values.byteswap()
+    return values
+
+
+def read_index_file(path: Path) -> IndexFile:
+    """Memory-map `path`; numeric sections become zero-copy views over the mapping.
+
+    The returned `IndexFile` owns the mapping; `close` it once the index is no longer used.
+    """
+    mapping = IndexMapping(path)
+    buf = mapping.buffer
+
+    magic, version, header_len, data_start = _PREAMBLE.unpack_from(buf, 0)
+    if magic != INDEX_MAGIC:
+        mapping.close()
+        raise ValueError(f"{path} is not a retrieval index file")
+    if version != INDEX_FORMAT_VERSION:
+        mapping.close()
+        raise ValueError(
+            f"Unsupported index format version {version} in {path} "
+            f"(expected {INDEX_FORMAT_VERSION}); rebuild the index"
+        )
+    header = json.loads(buf[_PREAMBLE.size : _PREAMBLE.size + header_len])
+    sections = header["sections"]
+    params = header["params"]
+
+    terms_section = sections["terms"]
+    terms_start = data_start + terms_section["offset"]
+    terms_blob = buf[terms_start : terms_start + terms_section["nbytes"]].decode("utf-8")
+    terms = terms_blob.split("\n") if terms_blob else []
+
+    def view(name: str) -> Sequence:
+        return _section_view(mapping, data_start, sections[name])
+
+    bm25 = BM25Index(
+        vocabulary=dict(zip(terms, range(len(terms)), strict=True)),
+        idf=view("idf"),
+        max_scores=view("max_scores"),
+        postings_offsets=view("postings_offsets"),
+        postings_doc_ids=view("postings_doc_ids"),
+        postings_tfs=view("postings_tfs"),
+        doc_lengths=view("doc_lengths"),
+        doc_norms=view("doc_norms"),
+        avgdl=params["avgdl"],
+        k1=params["k1"],
+        b=params["b"],
+    )
+
+    emb_section = sections["embedding"]
+    n_rows, dim = emb_section["shape"]
+    matrix = np.frombuffer(
+        buf,
+        dtype=_DTYPES["f4"][1],
+        count=n_rows * dim,
+        offset=data_start + emb_section["offset"],
+    ).reshape(n_rows, dim)
+    embedding = HashEmbeddingIndex(dim=dim, matrix=matrix)
+
+    return IndexFile(
+        bm25=bm25,
+        embedding=embedding,
+        record_offsets=view("record_offsets"),
+        header=header,
+        mapping=mapping,
+    )
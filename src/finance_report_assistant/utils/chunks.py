@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-import json
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 REPO_ROOT = Path(__file__).resolve().parents[3]
 
 
@@ -16,18 +18,27 @@ def resolve_repo_path(path: Path) -> Path:
     return (REPO_ROOT / path).resolve()
 
 
+def iter_jsonl(path: Path) -> Iterator[dict[str, Any]]:
+    """Decode a JSONL file one line at a time with orjson, skipping blank lines."""
+    with path.open("rb") as f:
+        for line in f:
+            if line.strip():
+                yield orjson.loads(line)
+
+
+def write_jsonl(path: Path, rows: Iterable[dict[str, Any]]) -> int:
+    """Stream `rows` to `path` as orjson-encoded lines and return how many were written."""
+    count = 0
+    with path.open("wb") as f:
+        for row in rows:
+            f.write(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE))
+            count += 1
+    return count
+
+
 def load_chunk_records(chunks_path: Path) -> list[dict[str, Any]]:
-    records: list[dict[str, Any]] = []
-    for line in chunks_path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        row = json.loads(line)
-        if row.get("text"):
-            records.append(row)
-    return records
+    return [row for row in iter_jsonl(chunks_path) if row.get("text")]
 
 
 def load_chunk_texts(chunks_path: Path) -> list[str]:
     return [row["text"] for row in load_chunk_records(chunks_path)]
-
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import gzip
+import io
+from pathlib import Path
+from typing import BinaryIO
+
+# codec name -> file suffix appended to the plain file name
+COMPRESSION_SUFFIXES: dict[str, str] = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def _zstandard():  # type: ignore[no-untyped-def]
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError as exc:
+        raise ImportError(
+            "zstd compression requires the 'zstandard' package; "
+            'install it with `pip install "finance-report-assistant[zstd]"`'
+        ) from exc
+    return zstandard
+
+
+def _check_codec(codec: str) -> None:
+    if codec not in COMPRESSION_SUFFIXES:
+        raise ValueError(
+            f"Unknown compression {codec!r}; expected one of {list(COMPRESSION_SUFFIXES)}"
+        )
+
+
+def compressed_path(path: Path, codec: str) -> Path:
+    _check_codec(codec)
+    return path.with_name(path.name + COMPRESSION_SUFFIXES[codec])
+
+
+def open_writer(path: Path, codec: str) -> BinaryIO:
+    """Open `path` for binary writing through `codec` ("none", "gzip" or "zstd")."""
+    _check_codec(codec)
+    if codec == "gzip":
+        # mtime=0 keeps the output byte-identical across runs.
+        return gzip.GzipFile(filename=path, mode="wb", mtime=0)  # type: ignore[return-value]
+    if codec == "zstd":
+        raw = path.open("wb")
+        return _zstandard().ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+    return path.open("wb")
+
+
+def open_reader(path: Path) -> BinaryIO:
+    """Open a plain, `.gz` or `.zst` file for binary reading, decompressing on the fly."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")  # type: ignore[return-value]
+    if path.suffix == ".zst":
+        return _zstandard().ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)
+    return path.open("rb")
+
+
+def read_text(path: Path, encoding: str = "utf-8", errors: str = "strict") -> str:
+    with open_reader(path) as f:
+        return io.TextIOWrapper(f, encoding=encoding, errors=errors).read()
+
+
+def find_variant(path: Path) -> Path | None:
+    """Return `path` or its first existing compressed variant (`.gz`, `.zst`)."""
+    for suffix in COMPRESSION_SUFFIXES.values():
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            return candidate
+    return None
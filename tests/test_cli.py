@@ -27,3 +27,131 @@ def test_search_command_requires_index(tmp_path, monkeypatch) -> None:
 
     assert result.exit_code == 1
     assert "build-retrieval-index first" in result.stdout
+
+
+def test_ingest_command_reports_written_and_failed(monkeypatch) -> None:
+    from pathlib import Path
+
+    from finance_report_assistant.ingestion.async_ingest import IngestSummary
+
+    calls = {}
+
+    def _fake_ingest(**kwargs):
+        calls.update(kwargs)
+        return IngestSummary(written=[Path("data/raw/x")], failures=[("NOPE", "ValueError: no")])
+
+    monkeypatch.setattr("finance_report_assistant.cli.ingest_filings_concurrently", _fake_ingest)
+    result = runner.invoke(
+        app,
+        [
+            "ingest",
+            "--tickers",
+            "AAPL, MSFT,NOPE",
+            "--forms",
+            "10-K,10-Q",
+            "--concurrency",
+            "4",
+            "--sync",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert calls["tickers"] == ["AAPL", "MSFT", "NOPE"]
+    assert calls["forms"] == ["10-K", "10-Q"]
+    assert calls["concurrency"] == 4
+    assert calls["incremental"] is True
+    assert calls["use_catalog"] is False
+    assert calls["resume"] is False
+    assert "Added 1, skipped 0, failed 1" in result.stdout
+    assert "! NOPE: ValueError: no" in result.stdout
+
+
+def test_load_bulk_command_builds_catalog(tmp_path, monkeypatch) -> None:
+    import json
+
+    from finance_report_assistant.core.config import settings
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    tickers_json = tmp_path / "company_tickers.json"
+    tickers_json.write_text(
+        json.dumps({"0": {"cik_str": 789019, "ticker": "MSFT", "title": "Microsoft"}}),
+        encoding="utf-8",
+    )
+
+    assert runner.invoke(app, ["load-bulk"]).exit_code == 1
+    result = runner.invoke(app, ["load-bulk", "--company-tickers", str(tickers_json)])
+
+    assert result.exit_code == 0, result.stdout
+    assert "1 companies, 1 tickers, 0 filings" in result.stdout
+    assert (tmp_path / "data" / "catalog" / "edgar.sqlite").exists()
+
+
+def test_ingest_command_requires_tickers_unless_resuming(monkeypatch) -> None:
+    from finance_report_assistant.ingestion.async_ingest import IngestSummary
+
+    calls = {}
+
+    def _fake_ingest(**kwargs):
+        calls.update(kwargs)
+        return IngestSummary(
+            run_id=7, queue_counts={"pending": 0, "running": 0, "done": 5, "failed": 1}
+        )
+
+    monkeypatch.setattr("finance_report_assistant.cli.ingest_filings_concurrently", _fake_ingest)
+
+    assert runner.invoke(app, ["ingest"]).exit_code == 1
+    result = runner.invoke(app, ["ingest", "--resume"])
+
+    assert result.exit_code == 0
+    assert calls["resume"] is True and calls["tickers"] == []
+    assert "Run 7: 5 done, 1 failed, 0 left" in result.stdout
+
+
+def test_ingest_catalog_without_catalog_points_to_load_bulk(tmp_path, monkeypatch) -> None:
+    from finance_report_assistant.core.config import settings
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    result = runner.invoke(app, ["ingest", "--tickers", "AAPL", "--catalog"])
+
+    assert result.exit_code == 1
+    assert "run `fra load-bulk` first" in result.stdout
+
+
+def test_build_chunks_command_fans_out_over_tickers(monkeypatch) -> None:
+    from pathlib import Path
+
+    from finance_report_assistant.processing.pipeline import BuildReport, FilingBuildResult
+
+    calls = {}
+
+    def _fake_build(filing_dirs, progress=None, **kwargs):
+        calls.update(kwargs, filing_dirs=filing_dirs)
+        ok = FilingBuildResult(Path("raw/AAPL/10-K/a"), output=Path("out/a/chunks.jsonl"))
+        bad = FilingBuildResult(Path("raw/MSFT/10-K/m"), error="ValueError: bad html")
+        for done, result in enumerate([ok, bad], start=1):
+            progress(done, 2, result)
+        return BuildReport(results=[ok, bad], workers=kwargs["workers"], elapsed_s=2.0)
+
+    monkeypatch.setattr(
+        "finance_report_assistant.cli.raw_filing_dirs", lambda t, form, limit: [Path(t)]
+    )
+    monkeypatch.setattr("finance_report_assistant.cli.build_chunks_for_filings", _fake_build)
+    result = runner.invoke(app, ["build-chunks", "--ticker", "AAPL,MSFT", "--workers", "4"])
+
+    assert result.exit_code == 0
+    assert calls["filing_dirs"] == [Path("AAPL"), Path("MSFT")]
+    assert calls["workers"] == 4
+    assert "[2/2] MSFT m: ValueError: bad html" in result.stdout
+    assert calls["force"] is False
+    assert "Built chunks for 1 filing(s) (1 rebuilt, 0 up to date), 1 failed" in result.stdout
+    assert "in 2.0s with 4 worker(s)" in result.stdout
+    assert calls["variants"] is None
+
+    result = runner.invoke(
+        app, ["build-chunks", "--ticker", "AAPL", "--variants", "220:40, 128:20:10"]
+    )
+    assert result.exit_code == 0
+    assert [c.name for c in calls["variants"]] == ["w220-o40-m20", "w128-o20-m10"]
+
+    result = runner.invoke(app, ["build-chunks", "--ticker", "AAPL", "--variants", "220"])
+    assert result.exit_code != 0
@@ -17,3 +17,70 @@ def test_eval_retrieval_requires_index(monkeypatch, tmp_path: Path) -> None:
 
     assert result.exit_code == 1
     assert "Run build-retrieval-index first" in result.stdout
+
+
+def test_build_and_eval_retrieval_per_chunking_variant(monkeypatch, tmp_path: Path) -> None:
+    import json
+
+    from finance_report_assistant.core.config import settings
+    from finance_report_assistant.processing.chunker import ChunkConfig
+    from finance_report_assistant.processing.pipeline import build_chunk_variants_for_filing_dir
+    from finance_report_assistant.retrieval.index import default_index_dir
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    filing_dir = settings.data_dir / "raw" / "sec-edgar" / "AAPL" / "10-K" / "a-1"
+    filing_dir.mkdir(parents=True)
+    metadata = {
+        "ticker": "AAPL",
+        "form": "10-K",
+        "cik": "0000320193",
+        "accession_number": "a-1",
+        "filing_date": "2025-01-31",
+        "primary_document": "k.htm",
+        "sec_archive_url": "https://www.sec.gov/Archives/edgar/data/320193/a1/k.htm",
+    }
+    (filing_dir / "filing_metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+    body = " ".join(f"Segment{i} revenue growth liquidity{i % 7} margins." for i in range(120))
+    (filing_dir / "primary_document.html").write_text(
+        f"<html><body><h1>Item 7. Results</h1><p>{body}</p></body></html>", encoding="utf-8"
+    )
+    variants = build_chunk_variants_for_filing_dir(
+        filing_dir, [ChunkConfig(60, 10, 5), ChunkConfig(120, 20, 5)]
+    )
+
+    counts = {}
+    for variant in variants:
+        built = runner.invoke(
+            app, ["build-retrieval-index", "--ticker", "AAPL", "--variant", variant]
+        )
+        assert built.exit_code == 0, built.stdout
+        summary_md = tmp_path / f"{variant}.md"
+        evaluated = runner.invoke(
+            app,
+            [
+                "eval-retrieval",
+                "--ticker",
+                "AAPL",
+                "--variant",
+                variant,
+                "--max-queries",
+                "5",
+                "--summary-md",
+                str(summary_md),
+                "--error-md",
+                str(tmp_path / f"{variant}-errors.md"),
+            ],
+        )
+        assert evaluated.exit_code == 0, evaluated.stdout
+        assert f"Chunking variant: `{variant}`" in summary_md.read_text(encoding="utf-8")
+        manifest_path = default_index_dir("AAPL", "10-K", variant=variant) / "manifest.json"
+        counts[variant] = json.loads(manifest_path.read_text(encoding="utf-8"))["record_count"]
+
+    assert counts["w60-o10-m5"] > counts["w120-o20-m5"] > 0
+    assert not default_index_dir("AAPL", "10-K").exists()
+
+    rejected = runner.invoke(
+        app, ["build-chunks", "--ticker", "AAPL", "--variants", "60:60,2000:10"]
+    )
+    assert rejected.exit_code != 0
+    assert "overlap_words must be less than max_words" in rejected.output
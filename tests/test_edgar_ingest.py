@@ -1,4 +1,7 @@
+import json
+
 from finance_report_assistant.ingestion.edgar_ingest import _iter_recent_filings
+from finance_report_assistant.utils.compression import read_text
 
 
 def test_iter_recent_filings_filters_and_maps_fields() -> None:
@@ -24,3 +27,605 @@ def test_iter_recent_filings_filters_and_maps_fields() -> None:
     assert row["report_date"] == "2024-09-30"
     assert row["primary_document"] == "k10.htm"
     assert row["primary_doc_description"] == "Annual report"
+
+
+class _MockSec:
+    """Minimal data.sec.gov / Archives stand-in served from a local thread."""
+
+    def __init__(
+        self,
+        submissions: dict[str, dict],
+        delay_s: float = 0.05,
+        pages: dict[str, dict] | None = None,
+    ) -> None:
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.submissions = submissions
+        self.pages = pages or {}
+        self.requests: list[tuple[float, str, str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        lock = threading.Lock()
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802
+                import time
+
+                with lock:
+                    mock.in_flight += 1
+                    mock.max_in_flight = max(mock.max_in_flight, mock.in_flight)
+                    mock.requests.append(
+                        (time.monotonic(), self.path, self.headers.get("User-Agent", ""))
+                    )
+                time.sleep(delay_s)
+                if self.path.startswith("/submissions/"):
+                    name = self.path.removeprefix("/submissions/")
+                    payload = mock.pages.get(name) or mock.submissions.get(
+                        name.removeprefix("CIK").removesuffix(".json")
+                    )
+                    body = json.dumps(payload).encode() if payload else None
+                elif self.path.startswith("/Archives/"):
+                    body = f"<html><body>{self.path}</body></html>".encode()
+                else:
+                    body = None
+                with lock:
+                    mock.in_flight -= 1
+                etag = f'"{hash(body)}"'
+                if body and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200 if body else 404)
+                if body:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body or b"")))
+                self.end_headers()
+                self.wfile.write(body or b"")
+
+            def log_message(self, *args) -> None:  # type: ignore[no-untyped-def]
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "_MockSec":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:  # type: ignore[no-untyped-def]
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _submissions(prefix: str, forms: list[str]) -> dict:
+    return {
+        "filings": {
+            "recent": {
+                "form": forms,
+                "accessionNumber": [f"{prefix}-24-{i:06d}" for i in range(len(forms))],
+                "filingDate": ["2024-10-31"] * len(forms),
+                "reportDate": ["2024-09-30"] * len(forms),
+                "primaryDocument": [f"doc{i}.htm" for i in range(len(forms))],
+            }
+        }
+    }
+
+
+def test_async_ingest_against_mock_sec_server(tmp_path, monkeypatch) -> None:
+    import asyncio
+
+    from finance_report_assistant.core.config import settings
+    from finance_report_assistant.ingestion.async_ingest import (
+        AsyncSecEdgarClient,
+        ingest_filings_async,
+    )
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    submissions = {
+        "0000320193": _submissions("0000320193", ["10-K", "10-Q", "10-K", "8-K"]),
+        "0000789019": _submissions("0000789019", ["10-Q", "10-K"]),
+    }
+
+    with _MockSec(submissions) as sec:
+
+        async def run():  # type: ignore[no-untyped-def]
+            client = AsyncSecEdgarClient(
+                user_agent="test-agent admin@example.com",
+                max_requests_per_s=200,
+                concurrency=3,
+                submissions_url=sec.base + "/submissions/CIK{cik}.json",
+                archives_base=sec.base + "/Archives/edgar/data",
+            )
+            async with client:
+                return await ingest_filings_async(
+                    ["AAPL", "msft", "NOPE"], ["10-K", "10-Q"], limit=2, client=client
+                )
+
+        summary = asyncio.run(run())
+
+    # AAPL: 2 x 10-K + 1 x 10-Q, MSFT: 1 x 10-K + 1 x 10-Q; NOPE is not in the allowlist.
+    assert len(summary.written) == 5
+    assert [label for label, _ in summary.failures] == ["NOPE"]
+    assert len(sec.requests) == 2 + 5
+    assert {ua for _, _, ua in sec.requests} == {"test-agent admin@example.com"}
+    assert 1 < sec.max_in_flight <= 3
+
+    filing_dir = settings.data_dir / "raw" / "sec-edgar" / "AAPL" / "10-Q" / "0000320193-24-000001"
+    assert filing_dir in summary.written
+    assert "doc1.htm" in read_text(filing_dir / "primary_document.html.gz")
+    metadata = json.loads((filing_dir / "filing_metadata.json").read_text(encoding="utf-8"))
+    assert metadata["sec_archive_url"].startswith("https://www.sec.gov/Archives/")
+
+
+def test_token_bucket_spaces_requests() -> None:
+    import asyncio
+    import time
+
+    from finance_report_assistant.ingestion.async_ingest import TokenBucket
+
+    async def run() -> float:
+        bucket = TokenBucket(rate=50)
+        started = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+        return time.monotonic() - started
+
+    # The first token is available immediately; the other five arrive 20 ms apart.
+    assert asyncio.run(run()) >= 0.09
+
+
+def test_sync_client_reuses_pooled_connections_and_records_timings(tmp_path, monkeypatch) -> None:
+    from finance_report_assistant.core.config import settings
+    from finance_report_assistant.ingestion.edgar_ingest import ingest_filings_for_ticker
+    from finance_report_assistant.ingestion.sec_client import SecEdgarClient
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    submissions = {"0000320193": _submissions("0000320193", ["10-K", "10-K", "10-K"])}
+
+    with _MockSec(submissions, delay_s=0.0) as sec:
+        with SecEdgarClient(
+            submissions_url=sec.base + "/submissions/CIK{cik}.json",
+            archives_base=sec.base + "/Archives/edgar/data",
+        ) as client:
+            written = ingest_filings_for_ticker("AAPL", form="10-K", limit=3, client=client)
+            assert len(client._clients) == 1
+            summary = client.timing_summary()
+
+    assert len(written) == 3
+    assert summary["requests"] == 4
+    assert summary["reused_connections"] == 3
+    assert [t.reused_connection for t in client.timings] == [False, True, True, True]
+    first = client.timings[0]
+    assert first.status_code == 200 and first.http_version == "HTTP/1.1"
+    assert first.connect_s > 0 and first.ttfb_s > 0
+    assert summary["total_s"] >= summary["ttfb_s"]
+
+
+def test_http_cache_revalidates_submissions_and_reuses_archives(tmp_path, monkeypatch) -> None:
+    from finance_report_assistant.core.config import settings
+    from finance_report_assistant.ingestion.edgar_ingest import ingest_filings_for_ticker
+    from finance_report_assistant.ingestion.sec_client import SecEdgarClient
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    submissions = {"0000320193": _submissions("0000320193", ["10-K", "10-K"])}
+
+    with _MockSec(submissions, delay_s=0.0) as sec:
+        urls = {
+            "submissions_url": sec.base + "/submissions/CIK{cik}.json",
+            "archives_base": sec.base + "/Archives/edgar/data",
+        }
+        with SecEdgarClient(**urls) as client:
+            first = ingest_filings_for_ticker("AAPL", form="10-K", limit=2, client=client)
+        # Archive documents stream straight to disk and bypass the HTTP cache.
+        assert client.cache is not None
+        assert client.cache.summary()["misses"] == 1
+        assert len(sec.requests) == 3
+
+        with SecEdgarClient(**urls) as client:
+            second = ingest_filings_for_ticker("AAPL", form="10-K", limit=2, client=client)
+        stats = client.cache.summary()
+
+    assert second == first
+    # Only the submissions JSON went back to the server, and it came back 304; the documents
+    # already on disk were reused.
+    assert len(sec.requests) == 4
+    assert sec.requests[-1][1].startswith("/submissions/")
+    assert [t.status_code for t in client.timings] == [304]
+    assert (stats["hits"], stats["revalidated"], stats["misses"]) == (0, 1, 0)
+    assert "doc1.htm" in read_text(first[1] / "primary_document.html.gz")
+
+
+def test_http_cache_evicts_least_recently_used(tmp_path) -> None:
+    import os
+
+    import httpx
+
+    from finance_report_assistant.ingestion.http_cache import HttpCache
+
+    cache = HttpCache(root=tmp_path / "http", max_bytes=350)
+    for i, url in enumerate(["https://x/a", "https://x/b", "https://x/c"]):
+        cache.store(url, httpx.Response(200, content=b"x" * 100))
+        body, _ = cache._paths(url)
+        os.utime(body, (1_000 + i, 1_000 + i))
+
+    assert cache.lookup("https://x/a", immutable=True)[0] is not None  # refreshes "a"
+    cache.store("https://x/d", httpx.Response(200, content=b"y" * 100))
+
+    assert cache.lookup("https://x/b", immutable=True)[0] is None
+    assert cache.lookup("https://x/c", immutable=True)[0] is not None
+    assert cache.lookup("https://x/d", immutable=True)[0].content == b"y" * 100
+    assert cache.stats.evicted == 1
+    assert cache.size_bytes() == 300
+
+    # Worker threads (the sync client's page fetches) share one cache.
+    from concurrent.futures import ThreadPoolExecutor
+
+    shared = HttpCache(root=tmp_path / "shared", max_bytes=1_000)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(
+            pool.map(
+                lambda i: shared.store(f"https://x/{i}", httpx.Response(200, content=b"z" * 100)),
+                range(200),
+            )
+        )
+    on_disk = sum(p.stat().st_size for p in shared.root.glob("*.body"))
+    assert shared.size_bytes() == on_disk <= 1_000
+
+
+def test_sync_downloads_only_new_accessions(tmp_path, monkeypatch) -> None:
+    import asyncio
+
+    from finance_report_assistant.core.config import settings
+    from finance_report_assistant.ingestion.async_ingest import (
+        AsyncSecEdgarClient,
+        ingest_filings_async,
+    )
+    from finance_report_assistant.ingestion.edgar_ingest import (
+        existing_accessions,
+        sync_filings_for_ticker,
+    )
+    from finance_report_assistant.ingestion.sec_client import SecEdgarClient
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    submissions = {"0000320193": _submissions("0000320193", ["10-K", "10-K", "10-K"])}
+
+    with _MockSec(submissions, delay_s=0.0) as sec:
+        urls = {
+            "submissions_url": sec.base + "/submissions/CIK{cik}.json",
+            "archives_base": sec.base + "/Archives/edgar/data",
+            "use_cache": False,
+        }
+        with SecEdgarClient(**urls) as client:
+            first = sync_filings_for_ticker("AAPL", form="10-K", limit=1, client=client)
+        assert first.counts() == {"added": 1, "skipped": 0, "failed": 0}
+
+        # A half-written filing (no manifest) is not treated as ingested.
+        partial = first.added[0].parent / "0000320193-24-000001"
+        partial.mkdir()
+        (partial / "primary_document.html").write_text("partial", encoding="utf-8")
+        assert existing_accessions("AAPL", "10-K") == {"0000320193-24-000000"}
+
+        sec.requests.clear()
+        with SecEdgarClient(**urls) as client:
+            second = sync_filings_for_ticker("AAPL", form="10-K", limit=2, client=client)
+
+        assert second.skipped == ["0000320193-24-000000"]
+        assert [p.name for p in second.added] == ["0000320193-24-000001"]
+        assert len(sec.requests) == 2
+
+        async def run():  # type: ignore[no-untyped-def]
+            client = AsyncSecEdgarClient(**urls, max_requests_per_s=200)
+            async with client:
+                return await ingest_filings_async(
+                    ["AAPL"], ["10-K"], limit=3, client=client, incremental=True
+                )
+
+        summary = asyncio.run(run())
+
+    assert summary.counts() == {"added": 1, "skipped": 2, "failed": 0}
+    assert existing_accessions("AAPL", "10-K") == {
+        "0000320193-24-000000",
+        "0000320193-24-000001",
+        "0000320193-24-000002",
+    }
+
+
+def _history_page(prefix: str, start: int, years: list[int]) -> dict:
+    return {
+        "form": ["10-K"] * len(years),
+        "accessionNumber": [f"{prefix}-{y % 100:02d}-{start + i:06d}" for i, y in enumerate(years)],
+        "filingDate": [f"{y}-10-30" for y in years],
+        "reportDate": [f"{y}-09-30" for y in years],
+        "primaryDocument": [f"k{y}.htm" for y in years],
+    }
+
+
+def test_history_pages_are_fetched_lazily_and_concurrently(tmp_path, monkeypatch) -> None:
+    import asyncio
+
+    from finance_report_assistant.core.config import settings
+    from finance_report_assistant.ingestion.async_ingest import (
+        AsyncSecEdgarClient,
+        select_filings_async,
+    )
+    from finance_report_assistant.ingestion.edgar_ingest import select_filings
+    from finance_report_assistant.ingestion.sec_client import SecEdgarClient
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    cik = "0000320193"
+    submissions = {
+        "filings": {
+            "recent": _history_page(cik, 0, [2024, 2023]),
+            "files": [
+                {"name": "CIK0000320193-submissions-002.json", "filingFrom": "2010-01-01",
+                 "filingTo": "2016-12-31"},
+                {"name": "CIK0000320193-submissions-001.json", "filingFrom": "2017-01-01",
+                 "filingTo": "2022-12-31"},
+            ],
+        }
+    }
+    pages = {
+        "CIK0000320193-submissions-001.json": _history_page(cik, 10, [2022, 2021, 2020, 2019]),
+        "CIK0000320193-submissions-002.json": _history_page(cik, 20, [2016, 2015, 2014]),
+    }
+
+    def page_requests(sec: _MockSec) -> list[str]:
+        return sorted(path for _, path, _ in sec.requests if "-submissions-" in path)
+
+    with _MockSec({}, delay_s=0.05, pages=pages) as sec:
+        urls = {
+            "submissions_url": sec.base + "/submissions/CIK{cik}.json",
+            "archives_base": sec.base + "/Archives/edgar/data",
+            "use_cache": False,
+        }
+        with SecEdgarClient(**urls) as client:
+            # Satisfied by the recent block: no history requests.
+            picked = select_filings(
+                submissions, "10-K", limit=2, fetch_pages=client.get_submissions_pages
+            )
+            assert [f["filing_date"][:4] for f in picked] == ["2024", "2023"]
+            assert page_requests(sec) == []
+
+            # One page past the recent block: only the newest history page.
+            picked = select_filings(
+                submissions, "10-K", limit=4, fetch_pages=client.get_submissions_pages, page_batch=1
+            )
+            assert [f["filing_date"][:4] for f in picked] == ["2024", "2023", "2022", "2021"]
+            assert page_requests(sec) == ["/submissions/CIK0000320193-submissions-001.json"]
+
+            # Ten years back: both pages, fetched in one concurrent batch (001 from memory).
+            sec.requests.clear()
+            sec.max_in_flight = 0
+            picked = select_filings(
+                submissions, "10-K", since="2014-01-01", fetch_pages=client.get_submissions_pages
+            )
+            assert len(picked) == 9
+            assert page_requests(sec) == ["/submissions/CIK0000320193-submissions-002.json"]
+
+        sec.requests.clear()
+        sec.max_in_flight = 0
+
+        async def run() -> list[dict]:
+            async with AsyncSecEdgarClient(**urls, max_requests_per_s=500) as client:
+                return await select_filings_async(client, submissions, "10-K", since="2014-01-01")
+
+        picked = asyncio.run(run())
+
+    assert [f["filing_date"][:4] for f in picked] == [
+        "2024", "2023", "2022", "2021", "2020", "2019", "2016", "2015", "2014"
+    ]
+    assert len(page_requests(sec)) == 2
+    assert sec.max_in_flight == 2
+
+
+def test_download_streams_into_compressed_file(tmp_path) -> None:
+    import gzip
+
+    from finance_report_assistant.ingestion.sec_client import SecEdgarClient
+
+    with _MockSec({}, delay_s=0.0) as sec:
+        with SecEdgarClient(
+            archives_base=sec.base + "/Archives/edgar/data", use_cache=False
+        ) as client:
+            dest = tmp_path / "primary_document.html"
+            gz_path = client.download_archive_document("320193", "0001-24-1", "k.htm", dest)
+            plain = client.download_archive_document(
+                "320193", "0001-24-1", "k.htm", dest, compression="none"
+            )
+            # Already on disk: no second request for the gzip copy.
+            client.download_archive_document("320193", "0001-24-1", "k.htm", dest)
+
+    assert gz_path.name == "primary_document.html.gz"
+    assert gzip.decompress(gz_path.read_bytes()) == plain.read_bytes()
+    assert "/Archives/edgar/data/320193/0001241/k.htm" in read_text(gz_path)
+    assert len(sec.requests) == 2
+    assert client.timings[0].num_bytes == len(plain.read_bytes())
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_zstd_round_trip(tmp_path) -> None:
+    import pytest
+
+    pytest.importorskip("zstandard")
+    from finance_report_assistant.utils.compression import find_variant, open_writer
+
+    with open_writer(tmp_path / "doc.html.zst", "zstd") as out:
+        out.write(b"<p>zstd</p>")
+
+    assert find_variant(tmp_path / "doc.html") == tmp_path / "doc.html.zst"
+    assert read_text(tmp_path / "doc.html.zst") == "<p>zstd</p>"
+
+
+def test_bulk_catalog_resolves_tickers_and_feeds_ingest_offline(tmp_path, monkeypatch) -> None:
+    import asyncio
+    import zipfile
+
+    from finance_report_assistant.core.config import settings
+    from finance_report_assistant.ingestion.async_ingest import (
+        AsyncSecEdgarClient,
+        ingest_filings_async,
+    )
+    from finance_report_assistant.ingestion.bulk import EdgarCatalog, load_bulk
+    from finance_report_assistant.ingestion.edgar_ingest import _resolve_cik
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    bulk_zip = tmp_path / "submissions.zip"
+    with zipfile.ZipFile(bulk_zip, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        ibm = _submissions("0000051143", ["10-K", "8-K", "10-Q"])
+        ibm["filings"]["files"] = [{"name": "CIK0000051143-submissions-001.json"}]
+        ibm.update(name="IBM", tickers=["IBM"])
+        archive.writestr("CIK0000051143.json", json.dumps(ibm))
+        archive.writestr(
+            "CIK0000051143-submissions-001.json",
+            json.dumps(_history_page("0000051143", 10, [2019, 2018])),
+        )
+        archive.writestr("CIK0000320193.json", json.dumps(_submissions("0000320193", ["10-K"])))
+        archive.writestr("README.txt", "not a submissions file")
+    tickers_json = tmp_path / "company_tickers.json"
+    tickers_json.write_text(
+        json.dumps({"0": {"cik_str": 320193, "ticker": "aapl", "title": "Apple Inc."}}),
+        encoding="utf-8",
+    )
+
+    report = load_bulk(bulk_zip, tickers_json, forms={"10-K"})
+    # Reloading upserts instead of duplicating rows.
+    load_bulk(bulk_zip, tickers_json, forms={"10-K"})
+
+    assert (report.zip_entries, report.skipped_entries) == (3, 1)
+    with EdgarCatalog() as catalog:
+        assert catalog.counts() == {"companies": 2, "tickers": 2, "filings": 4}
+        assert catalog.lookup_cik("ibm") == "0000051143"
+        assert catalog.company_name("51143") == "IBM"
+        recent = catalog.submissions("0000051143")["filings"]["recent"]
+    assert recent["accessionNumber"] == [
+        "0000051143-24-000000",
+        "0000051143-19-000010",
+        "0000051143-18-000011",
+    ]
+    assert _resolve_cik("IBM") == "0000051143"
+
+    with _MockSec({}, delay_s=0.0) as sec:
+
+        async def run():  # type: ignore[no-untyped-def]
+            client = AsyncSecEdgarClient(
+                max_requests_per_s=200,
+                use_cache=False,
+                submissions_url=sec.base + "/submissions/CIK{cik}.json",
+                archives_base=sec.base + "/Archives/edgar/data",
+            )
+            async with client:
+                return await ingest_filings_async(
+                    ["IBM"], ["10-K"], limit=2, client=client, use_catalog=True
+                )
+
+        summary = asyncio.run(run())
+
+    assert summary.counts() == {"added": 2, "skipped": 0, "failed": 0}
+    # No submissions round trip: only the two documents were requested.
+    assert sorted(path for _, path, _ in sec.requests) == [
+        "/Archives/edgar/data/51143/000005114319000010/k2019.htm",
+        "/Archives/edgar/data/51143/000005114324000000/doc0.htm",
+    ]
+
+
+def test_job_queue_resumes_interrupted_run(tmp_path, monkeypatch) -> None:
+    import asyncio
+
+    from finance_report_assistant.core.config import settings
+    from finance_report_assistant.ingestion.async_ingest import (
+        AsyncSecEdgarClient,
+        ingest_filings_async,
+    )
+    from finance_report_assistant.ingestion.edgar_ingest import _iter_recent_filings
+    from finance_report_assistant.ingestion.jobs import JobQueue
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    submissions = {"0000320193": _submissions("0000320193", ["10-K", "10-K", "10-K", "10-K"])}
+    filings = list(_iter_recent_filings(submissions["0000320193"], "10-K"))
+
+    with _MockSec(submissions, delay_s=0.0) as sec, JobQueue() as queue:
+        urls = {
+            "submissions_url": sec.base + "/submissions/CIK{cik}.json",
+            "archives_base": sec.base + "/Archives/edgar/data",
+            "use_cache": False,
+        }
+
+        async def run(**kwargs):  # type: ignore[no-untyped-def]
+            async with AsyncSecEdgarClient(**urls, max_requests_per_s=200) as client:
+                return await ingest_filings_async(
+                    ["AAPL"], ["10-K"], client=client, queue=queue, concurrency=2, **kwargs
+                )
+
+        first = asyncio.run(run(limit=2))
+        assert (first.run_id, first.counts()["added"]) == (1, 2)
+        assert first.queue_counts == {"pending": 0, "running": 0, "done": 2, "failed": 0}
+
+        # A run that died mid-way: one job was being downloaded, one failed, two never started.
+        run_id = queue.new_run(tickers=["AAPL"])
+        assert queue.enqueue(run_id, "AAPL", [("0000320193", "10-K", f) for f in filings]) == 4
+        assert queue.enqueue(run_id, "AAPL", [("0000320193", "10-K", filings[0])]) == 0
+        queue.claim(run_id)
+        queue.fail(queue.claim(run_id), "ConnectError: reset")
+        sec.requests.clear()
+
+        resumed = asyncio.run(run(resume=True, max_attempts=1))
+
+    assert resumed.run_id == run_id
+    # The interrupted job and the untouched ones are downloaded; the failed job is out of
+    # attempts. Nothing is re-selected, so the submissions feed is not requested, and doc0 is
+    # still on disk from the first run.
+    assert resumed.counts() == {"added": 3, "skipped": 0, "failed": 0}
+    assert resumed.queue_counts == {"pending": 0, "running": 0, "done": 3, "failed": 1}
+    assert sorted(path.rsplit("/", 1)[1] for _, path, _ in sec.requests) == ["doc2.htm", "doc3.htm"]
+
+
+def test_job_queue_replans_tickers_whose_planning_did_not_finish(tmp_path, monkeypatch) -> None:
+    import asyncio
+
+    from finance_report_assistant.core.config import settings
+    from finance_report_assistant.ingestion.async_ingest import (
+        AsyncSecEdgarClient,
+        ingest_filings_async,
+    )
+    from finance_report_assistant.ingestion.jobs import JobQueue
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    submissions = {"0000320193": _submissions("0000320193", ["10-K", "10-K"])}
+
+    with _MockSec(submissions, delay_s=0.0) as sec, JobQueue() as queue:
+        urls = {
+            "submissions_url": sec.base + "/submissions/CIK{cik}.json",
+            "archives_base": sec.base + "/Archives/edgar/data",
+            "use_cache": False,
+        }
+
+        async def resume():  # type: ignore[no-untyped-def]
+            async with AsyncSecEdgarClient(**urls, max_requests_per_s=200) as client:
+                return await ingest_filings_async(
+                    [], [], client=client, queue=queue, resume=True, max_attempts=2
+                )
+
+        # The process died right after creating the run, before any ticker was planned.
+        run_id = queue.new_run(tickers=["AAPL", "ZZZZ"], forms=["10-K"], limit=1, since=None)
+
+        resumed = asyncio.run(resume())
+        assert resumed.counts() == {"added": 1, "skipped": 0, "failed": 1}
+        assert resumed.failures[0][0] == "ZZZZ"
+        assert queue.counts(run_id, table="plans") == {
+            "pending": 0,
+            "running": 0,
+            "done": 1,
+            "failed": 1,
+        }
+
+        # The failed plan is retried until it runs out of attempts; AAPL is not re-planned.
+        sec.requests.clear()
+        assert asyncio.run(resume()).counts() == {"added": 0, "skipped": 0, "failed": 1}
+        assert asyncio.run(resume()).counts() == {"added": 0, "skipped": 0, "failed": 0}
+    assert sec.requests == []
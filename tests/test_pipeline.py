@@ -1,6 +1,8 @@
 import json
 from pathlib import Path
 
+import pytest
+
 from finance_report_assistant.core.config import settings
 from finance_report_assistant.processing.pipeline import build_chunks_for_filing_dir
 
@@ -37,5 +39,225 @@ def test_build_chunks_for_filing_dir_writes_jsonl(tmp_path: Path, monkeypatch) -
     assert first["form"] == "10-K"
     assert first["citation_url"].startswith("https://www.sec.gov/Archives/edgar/data")
     assert first["chunk_id"]
-    assert isinstance(first.get("sentences"), list)
-    assert isinstance(first.get("sentence_spans"), list)
+    assert "sentences" not in first and "sentence_spans" not in first
+    assert len(first["sentence_starts"]) == len(first["sentence_ends"]) >= 1
+
+
+def test_build_chunks_reads_compressed_documents(tmp_path: Path, monkeypatch) -> None:
+    from finance_report_assistant.utils.compression import open_writer
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    html = "<html><body><h1>Item 7</h1><p>revenue grew in every segment this year</p></body></html>"
+    outputs = []
+    for codec, name in (("none", "plain"), ("gzip", "gz")):
+        filing_dir = tmp_path / "MSFT" / "10-K" / name
+        filing_dir.mkdir(parents=True)
+        metadata = {
+            "ticker": "MSFT",
+            "form": "10-K",
+            "cik": "0000789019",
+            "accession_number": name,
+            "filing_date": "2025-07-30",
+            "primary_document": "msft.htm",
+            "sec_archive_url": "https://www.sec.gov/Archives/edgar/data/789019/x/msft.htm",
+        }
+        (filing_dir / "filing_metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+        suffix = ".gz" if codec == "gzip" else ""
+        with open_writer(filing_dir / f"primary_document.html{suffix}", codec) as out:
+            out.write(html.encode("utf-8"))
+        path = build_chunks_for_filing_dir(filing_dir, max_words=4, overlap_words=1, min_words=1)
+        outputs.append([json.loads(line)["text"] for line in path.read_text().splitlines()])
+
+    assert outputs[0] == outputs[1]
+    assert outputs[0]
+
+
+def _raw_filing(data_dir: Path, ticker: str, accession: str, body: str) -> Path:
+    filing_dir = data_dir / "raw" / "sec-edgar" / ticker / "10-K" / accession
+    filing_dir.mkdir(parents=True)
+    metadata = {
+        "ticker": ticker,
+        "form": "10-K",
+        "cik": "0000000001",
+        "accession_number": accession,
+        "filing_date": "2025-01-31",
+        "primary_document": "k.htm",
+        "sec_archive_url": f"https://www.sec.gov/Archives/edgar/data/1/{accession}/k.htm",
+    }
+    (filing_dir / "filing_metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+    (filing_dir / "primary_document.html").write_text(
+        f"<html><body><h1>Item 1. Business</h1><p>{body}</p></body></html>", encoding="utf-8"
+    )
+    return filing_dir
+
+
+def test_build_chunks_for_filings_in_process_pool(tmp_path: Path, monkeypatch) -> None:
+    from finance_report_assistant.processing.pipeline import build_chunks_for_filings
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    words = " ".join(f"w{i}" for i in range(40))
+    filing_dirs = [
+        _raw_filing(settings.data_dir, "AAPL", "a-1", words),
+        _raw_filing(settings.data_dir, "AAPL", "a-2", words.upper()),
+        _raw_filing(settings.data_dir, "MSFT", "m-1", words),
+    ]
+    (filing_dirs[1] / "filing_metadata.json").unlink()
+
+    seen = []
+    options = {"max_words": 10, "overlap_words": 2, "min_words": 1}
+
+    def progress(done: int, total: int, result) -> None:  # type: ignore[no-untyped-def]
+        seen.append((done, total))
+
+    pooled = build_chunks_for_filings(filing_dirs, workers=3, progress=progress, **options)
+    pooled_rows = [p.read_text(encoding="utf-8") for p in pooled.outputs]
+    sequential = build_chunks_for_filings(filing_dirs, workers=1, force=True, **options)
+
+    assert pooled.workers == 3
+    assert [r.filing_dir for r in pooled.results] == filing_dirs
+    assert [r.filing_dir for r in pooled.failures] == [filing_dirs[1]]
+    assert pooled.failures[0].error.startswith("FileNotFoundError")
+    assert [p.parent.name for p in pooled.outputs] == ["a-1", "m-1"]
+    assert all(r.chunk_count > 1 and r.source_bytes > 0 for r in pooled.results if not r.error)
+    assert sorted(seen) == [(1, 3), (2, 3), (3, 3)]
+    assert [p.read_text(encoding="utf-8") for p in sequential.outputs] == pooled_rows
+    assert pooled.filings_per_s > 0 and pooled.mb_per_s > 0
+    assert len(sequential.rebuilt) == 2
+
+
+def test_build_chunks_skips_filings_with_matching_fingerprint(tmp_path: Path, monkeypatch) -> None:
+    from finance_report_assistant.processing.pipeline import (
+        build_chunks_for_filings,
+        build_chunks_for_ticker_form,
+    )
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    words = " ".join(f"w{i}" for i in range(40))
+    first = _raw_filing(settings.data_dir, "AAPL", "a-1", words)
+    second = _raw_filing(settings.data_dir, "AAPL", "a-2", words)
+
+    def rebuilt(overlap_words: int = 2, **kwargs) -> list[str]:  # type: ignore[no-untyped-def]
+        report = build_chunks_for_filings(
+            [first, second], max_words=10, overlap_words=overlap_words, min_words=1, **kwargs
+        )
+        assert not report.failures
+        assert len(report.rebuilt) + len(report.skipped) == 2
+        return [r.filing_dir.name for r in report.rebuilt]
+
+    assert rebuilt() == ["a-1", "a-2"]
+    stats_path = settings.data_dir / "processed" / "chunks" / "AAPL" / "10-K" / "a-1"
+    stats = json.loads((stats_path / "chunk_stats.json").read_text(encoding="utf-8"))
+    assert len(stats["fingerprint"]) == 64 and stats["chunker_version"] >= 1
+
+    assert rebuilt() == []
+    (second / "primary_document.html").write_text("<p>new text</p>", encoding="utf-8")
+    assert rebuilt() == ["a-2"]
+    assert rebuilt(overlap_words=3) == ["a-1", "a-2"]
+    assert rebuilt(overlap_words=3, force=True) == ["a-1", "a-2"]
+
+    # A missing chunks file is rebuilt even though the stats still match.
+    (stats_path / "chunks.jsonl").unlink()
+    assert build_chunks_for_ticker_form("AAPL", max_words=10, overlap_words=3, min_words=1)
+    assert (stats_path / "chunks.jsonl").exists()
+
+
+@pytest.fixture
+def parsed_html(monkeypatch) -> list[str]:
+    """HTML documents handed to the section extractor during the test."""
+    from finance_report_assistant.processing import section_cache
+
+    parsed: list[str] = []
+    extract = section_cache.extract_sections_from_html
+
+    def counting_extract(html: str, backend: str | None = None):  # type: ignore[no-untyped-def]
+        parsed.append(html)
+        return extract(html, backend=backend)
+
+    monkeypatch.setattr(section_cache, "extract_sections_from_html", counting_extract)
+    return parsed
+
+
+def test_chunk_parameter_changes_and_variants_reuse_one_parse(
+    tmp_path: Path, monkeypatch, parsed_html: list[str]
+) -> None:
+    from finance_report_assistant.processing import section_cache
+    from finance_report_assistant.processing.chunker import ChunkConfig
+    from finance_report_assistant.processing.pipeline import (
+        build_chunk_variants_for_filing_dir,
+        build_chunks_for_filings,
+        sections_for_filing_dir,
+    )
+    from finance_report_assistant.retrieval.corpus import discover_chunk_files
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    words = " ".join(f"w{i}" for i in range(40))
+    filing_dir = _raw_filing(settings.data_dir, "AAPL", "a-1", words)
+
+    def texts(overlap_words: int) -> list[str]:
+        path = build_chunks_for_filing_dir(
+            filing_dir, max_words=10, overlap_words=overlap_words, min_words=1
+        )
+        return [json.loads(line)["text"] for line in path.read_text().splitlines()]
+
+    first = texts(2)
+    artifact = section_cache.section_cache_path("AAPL", "10-K", "a-1")
+    assert artifact.exists() and len(parsed_html) == 1
+    assert texts(3) != first
+    assert sections_for_filing_dir(filing_dir)[0].title == "Item 1. Business"
+
+    # Several chunk configurations are built side by side from the same cached parse.
+    configs = [ChunkConfig(10, 2, 1), ChunkConfig(20, 5, 1)]
+    outputs = build_chunk_variants_for_filing_dir(filing_dir, configs)
+    assert list(outputs) == ["w10-o2-m1", "w20-o5-m1"]
+    assert len(parsed_html) == 1
+    for config, path in zip(configs, outputs.values(), strict=True):
+        single = build_chunks_for_filing_dir(
+            filing_dir, config.max_words, config.overlap_words, config.min_words
+        )
+        assert path.read_text(encoding="utf-8") == single.read_text(encoding="utf-8")
+        stats = json.loads((path.parent / "chunk_stats.json").read_text(encoding="utf-8"))
+        assert stats["variant"] == config.name
+    assert discover_chunk_files("AAPL", variant="w20-o5-m1") == [outputs["w20-o5-m1"]]
+    report = build_chunks_for_filings([filing_dir], variants=configs)
+    assert report.skipped and report.results[0].variant_outputs == outputs
+    assert len(parsed_html) == 1
+
+    # A new cleaner version or new HTML invalidates the artifact.
+    monkeypatch.setattr(section_cache, "CLEANER_VERSION", section_cache.CLEANER_VERSION + 1)
+    assert texts(4)
+    assert len(parsed_html) == 2
+    (filing_dir / "primary_document.html").write_text("<p>new text</p>", encoding="utf-8")
+    assert texts(4) == ["new text"]
+    assert len(parsed_html) == 3
+
+
+def test_chunk_rows_index_the_stored_sections_with_or_without_validation(
+    tmp_path: Path, monkeypatch
+) -> None:
+    from finance_report_assistant.processing.pipeline import sections_for_filing_dir
+    from finance_report_assistant.processing.sentences import record_sentences
+    from finance_report_assistant.utils.chunks import load_chunk_records
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    body = "Revenue grew 5%. Costs fell. " * 9 + "</p><h2>Risks</h2><p>" + "risk " * 12
+    filing_dir = _raw_filing(settings.data_dir, "AAPL", "a-1", body)
+
+    outputs = []
+    for validate in (True, False):
+        monkeypatch.setattr(settings, "validate_chunk_rows", validate)
+        path = build_chunks_for_filing_dir(
+            filing_dir, max_words=10, overlap_words=2, min_words=1, force=True
+        )
+        outputs.append(path.read_bytes())
+
+    assert outputs[0] == outputs[1]
+    records = load_chunk_records(path)
+    assert [r["chunk_index"] for r in records] == list(range(len(records)))
+    assert record_sentences(records[0])[:2] == ["Revenue grew 5%.", "Costs fell."]
+
+    sections = sections_for_filing_dir(filing_dir)
+    assert {r["section_title"] for r in records} == {"Item 1. Business", "Risks"}
+    for row in records:
+        section_text = sections[row["section_index"]].text
+        assert section_text[row["char_start"] : row["char_end"]] == row["text"]
+        assert row["word_count"] == len(row["text"].split())
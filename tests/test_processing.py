@@ -1,5 +1,5 @@
 from finance_report_assistant.processing.chunker import build_chunk_candidates
-from finance_report_assistant.processing.html_cleaner import extract_sections_from_html
+from finance_report_assistant.processing.html_cleaner import SectionText, extract_sections_from_html
 
 
 def test_extract_sections_from_html_reads_headings_and_text() -> None:
@@ -44,6 +44,21 @@ def test_build_chunk_candidates_with_overlap() -> None:
     assert chunks[0].text.split()[-2:] == chunks[1].text.split()[:2]
 
 
+def test_chunk_candidates_are_exact_spans_of_section_text() -> None:
+    sections = [
+        SectionText("A", "A", "  alpha  beta\ngamma delta "),
+        SectionText("B", "B", " ".join(f"w{i}" for i in range(12))),
+    ]
+
+    chunks = build_chunk_candidates(sections, max_words=3, overlap_words=1, min_words=1)
+
+    assert chunks[0].text == "alpha  beta\ngamma"
+    assert [c.section_index for c in chunks] == [0, 0] + [1] * 6
+    for chunk in chunks:
+        assert sections[chunk.section_index].text[chunk.char_start : chunk.char_end] == chunk.text
+        assert chunk.word_count == len(chunk.text.split())
+
+
 def test_extract_sections_splits_document_on_item_pattern() -> None:
     html = """
     <html><body>
@@ -55,3 +70,55 @@ def test_extract_sections_splits_document_on_item_pattern() -> None:
 
     assert any(t.lower().startswith("item 1.") for t in titles)
     assert any(t.lower().startswith("item 1a.") for t in titles)
+
+
+def test_extract_sections_emits_nested_block_text_once() -> None:
+    html = """
+    <html><body>
+      <div><div><div><span>Item 7.</span> <span>Management's Discussion</span></div>
+        <div><div>Revenue grew <b>8%</b>.</div><div>Margins held.</div></div>
+        <!-- page 42 -->
+        <div style="display:none">hidden XBRL facts</div>
+        <table><tr><td>Net sales</td><td>$391,035</td></tr></table>
+      </div></div>
+      <script>var x = "Item 9.";</script>
+    </body></html>
+    """
+    sections = extract_sections_from_html(html)
+
+    assert [s.title for s in sections] == ["Item 7. Management's Discussion"]
+    assert sections[0].text == "Revenue grew 8% . Margins held. Net sales $391,035"
+
+
+def test_lxml_backend_matches_html_parser_backend() -> None:
+    import pytest
+
+    pytest.importorskip("lxml")
+    from finance_report_assistant.processing.html_cleaner import (
+        iter_text_blocks_lxml,
+        resolve_parser_backend,
+    )
+
+    fixtures = [
+        "<html><body><h1>Item 1. Business</h1><p>Apple designs &amp; markets.</p>"
+        "<h2>Products</h2><p>iPhone, Mac</p></body></html>",
+        "<div>Item 1A. Risk Factors</div><div>Our business could be harmed.</div>",
+        "<p>Intro text. Item 1. Business We build. Item 1A. Risk Factors Supply risks.</p>",
+        "<html><body><div><div><span>Item 7.</span> MD&amp;A</div><div><div>Revenue grew"
+        " <b>8%</b>.</div></div><!-- c --><div style='display:none'>x</div>"
+        "<ix:header><ix:hidden>facts</ix:hidden></ix:header>"
+        "<table><tr><td>Net&nbsp;sales</td><td>$391</td></tr></table></div>"
+        "<script>var x = '<p>Item 9.</p>';</script>tail text</body></html>",
+    ]
+    for html in fixtures:
+        expected = extract_sections_from_html(html, backend="html.parser")
+        assert expected
+        assert extract_sections_from_html(html, backend="lxml") == expected
+
+    # Blocks stream out as the document is fed, not only at the end.
+    blocks = iter_text_blocks_lxml("<p>one</p><p>two</p>" * 50, chunk_chars=16)
+    assert next(blocks).text == "one"
+    assert resolve_parser_backend("auto") == "lxml"
+    with pytest.raises(ValueError, match="Unknown HTML parser"):
+        resolve_parser_backend("html5lib")
+
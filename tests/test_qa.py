@@ -28,3 +28,14 @@ def test_compose_grounded_answer_returns_answer_and_citations() -> None:
     assert result.citations[0].chunk_id == "c1"
     assert result.citations[0].evidence_sentences
     assert "Supply chain" in result.citations[0].evidence_sentences[0]
+
+
+def test_evidence_sentences_are_sliced_from_sentence_offsets() -> None:
+    from finance_report_assistant.qa.grounded_qa import _evidence_sentences_from_record
+
+    text = "Demand remains strong. Supply chain disruptions could impact margins."
+    record = {"text": text, "sentence_starts": [0, 23], "sentence_ends": [22, len(text)]}
+
+    evidence = _evidence_sentences_from_record(record, {"supply", "margins"}, top_n=1)
+
+    assert evidence == ["Supply chain disruptions could impact margins."]
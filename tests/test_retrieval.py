@@ -61,14 +61,306 @@ def test_build_and_search_retrieval_index(tmp_path: Path, monkeypatch) -> None:
     index_dir, manifest = build_retrieval_index(ticker="AAPL", form="10-K", limit=1)
     assert index_dir == default_index_dir("AAPL", "10-K")
     assert manifest["record_count"] == 3
-    assert (index_dir / "bm25.pkl").exists()
-    assert (index_dir / "embedding.pkl").exists()
+    assert (index_dir / "index.fra").exists()
     assert (index_dir / "records.jsonl").exists()
+    assert not (index_dir / "bm25.pkl").exists()
 
     index = load_retrieval_index(index_dir)
+    assert len(index.records) == 3
     hits = index.search("What supply chain risks are described?", top_k=2)
 
     assert len(hits) == 2
     assert hits[0].record["chunk_id"] == "c1"
     assert hits[0].record["citation_url"] == "https://www.sec.gov/a1"
 
+
+
+def test_bm25_inverted_index_matches_bruteforce_scores() -> None:
+    import math
+
+    from finance_report_assistant.retrieval.bm25 import BM25Index, tokenize
+
+    texts = [
+        "Supply chain disruptions and supply shortages could harm margins.",
+        "Cash flow and liquidity remain strong.",
+        "",
+        "Supply of components depends on a limited chain of vendors.",
+    ]
+    index = BM25Index.fit(texts)
+
+    docs = [tokenize(t) for t in texts]
+    avgdl = sum(len(d) for d in docs) / len(docs)
+    expected = []
+    for doc in docs:
+        score = 0.0
+        for term in ["supply", "chain", "unknown"]:
+            tf = doc.count(term)
+            if not tf:
+                continue
+            df = sum(1 for d in docs if term in d)
+            idf = math.log(1 + ((len(docs) - df + 0.5) / (df + 0.5)))
+            norm = index.k1 * (1 - index.b + index.b * (len(doc) / avgdl))
+            score += idf * ((tf * (index.k1 + 1.0)) / (tf + norm))
+        expected.append(score)
+
+    assert index.scores("supply chain unknown supply") == expected
+    doc_ids, tfs = index.postings("supply")
+    assert list(doc_ids) == [0, 3]
+    assert list(tfs) == [2, 1]
+    assert index.postings("unknown") is None
+
+
+def test_bm25_top_k_matches_exhaustive_ranking() -> None:
+    from finance_report_assistant.retrieval.bm25 import BM25Index
+
+    texts = [
+        "supply chain risk and the supply of components",
+        "the liquidity and cash flow of the company",
+        "the chain of stores",
+        "the supply chain",
+        "the supply chain",
+        "growth in services",
+    ]
+    index = BM25Index.fit(texts)
+
+    for query in ["the supply chain risk", "the", "liquidity", "missing terms"]:
+        scores = index.scores(query)
+        for k in range(1, len(texts) + 2):
+            expected = sorted(range(len(texts)), key=lambda i: scores[i], reverse=True)[:k]
+            ranked = index.top_k(query, k)
+            assert [doc_id for doc_id, _ in ranked] == expected
+            assert [score for _, score in ranked] == [scores[i] for i in expected]
+
+
+def test_embedding_matrix_backend_matches_dict_scores(tmp_path: Path) -> None:
+    import numpy as np
+
+    from finance_report_assistant.retrieval.embedding import HashEmbeddingIndex
+
+    texts = [
+        "Supply chain disruptions could harm margins.",
+        "Cash flow and liquidity remain strong.",
+        "",
+        "Growth in services and AI-enabled products.",
+    ]
+    sparse = HashEmbeddingIndex.fit(texts, dim=128)
+    dense = HashEmbeddingIndex.fit(texts, dim=128, backend="matrix")
+    assert sparse.backend == "dict"
+    assert dense.backend == "matrix"
+    assert dense.matrix.dtype == np.float32
+
+    mapped = HashEmbeddingIndex.load_matrix(dense.save_matrix(tmp_path / "embedding.npy"))
+    assert isinstance(mapped.matrix, np.memmap)
+
+    for query in ["supply chain margins", "liquidity", "zzz"]:
+        expected = sparse.scores(query)
+        assert np.allclose(dense.scores(query), expected, atol=1e-6)
+        assert np.allclose(mapped.scores(query), expected, atol=1e-6)
+
+
+def test_binary_index_round_trip_and_legacy_conversion(tmp_path: Path, monkeypatch) -> None:
+    import pickle
+
+    import pytest
+
+    from finance_report_assistant.retrieval.bm25 import BM25Index
+    from finance_report_assistant.retrieval.embedding import HashEmbeddingIndex
+    from finance_report_assistant.retrieval.index import convert_retrieval_index
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    chunk_file = (
+        settings.data_dir / "processed" / "chunks" / "AAPL" / "10-K" / "0001" / "chunks.jsonl"
+    )
+    rows = [
+        {"chunk_id": "c1", "text": "Supply chain disruptions could harm margins."},
+        {"chunk_id": "c2", "text": "Cash flow and liquidity remain strong."},
+        {"chunk_id": "c3", "text": "Services growth increased revenue and margins."},
+    ]
+    _write_chunks_jsonl(chunk_file, rows)
+
+    index_dir, manifest = build_retrieval_index(ticker="AAPL", form="10-K")
+    assert manifest["format"]["name"] == "fra-index"
+    index = load_retrieval_index(index_dir)
+    texts = [r["text"] for r in rows]
+    reference = BM25Index.fit(texts)
+    for query in ["supply margins", "liquidity cash flow", "zzz"]:
+        assert index.bm25.scores(query) == reference.scores(query)
+        assert index.bm25.top_k(query, 2) == reference.top_k(query, 2)
+    assert index.search("liquidity cash flow", top_k=1)[0].record["chunk_id"] == "c2"
+
+    # A pre-binary index directory: pickled retrievers next to records.jsonl.
+    legacy_dir = tmp_path / "legacy"
+    legacy_dir.mkdir()
+    (legacy_dir / "records.jsonl").write_text(
+        "\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8"
+    )
+    with (legacy_dir / "bm25.pkl").open("wb") as f:
+        pickle.dump(reference, f)
+    with (legacy_dir / "embedding.pkl").open("wb") as f:
+        pickle.dump(HashEmbeddingIndex.fit(texts), f)
+
+    with pytest.raises(ValueError, match="convert-index"):
+        load_retrieval_index(legacy_dir)
+    assert load_retrieval_index(legacy_dir, allow_pickle=True).search("liquidity", top_k=1)
+
+    converted = convert_retrieval_index(legacy_dir)
+    assert converted["record_count"] == 3
+    assert not (legacy_dir / "bm25.pkl").exists()
+    upgraded = load_retrieval_index(legacy_dir)
+    assert [h.record["chunk_id"] for h in upgraded.search("supply margins", top_k=3)] == [
+        h.record["chunk_id"] for h in index.search("supply margins", top_k=3)
+    ]
+
+
+def test_search_many_matches_single_query_search() -> None:
+    import numpy as np
+
+    from finance_report_assistant.retrieval.bm25 import BM25Index
+    from finance_report_assistant.retrieval.embedding import HashEmbeddingIndex
+    from finance_report_assistant.retrieval.index import RetrievalIndex
+
+    texts = [
+        "Supply chain disruptions could harm margins.",
+        "Cash flow and liquidity remain strong with low debt.",
+        "Growth in services and AI-enabled products increased revenue.",
+        "Supply constraints and liquidity risks.",
+    ]
+    records = [{"chunk_id": f"c{i}", "text": t} for i, t in enumerate(texts)]
+    queries = ["supply chain risks", "liquidity and cash", "zzz", "growth growth services"]
+
+    for backend in ("dict", "matrix"):
+        index = RetrievalIndex(
+            records=records,
+            bm25=BM25Index.fit(texts),
+            embedding=HashEmbeddingIndex.fit(texts, dim=128, backend=backend),
+        )
+        batch = index.score_many(queries)
+        assert batch.bm25.shape == (len(queries), len(texts))
+        for row, query in enumerate(queries):
+            assert batch.bm25[row].tolist() == index.bm25.scores(query)
+            assert np.allclose(batch.embedding[row], index.embedding.scores(query), atol=1e-6)
+
+        many = index.search_many(queries, top_k=3, weights=(0.6, 0.4))
+        for query, hits in zip(queries, many, strict=True):
+            single = index.search(query, top_k=3, bm25_weight=0.6, embedding_weight=0.4)
+            assert [h.record["chunk_id"] for h in hits] == [h.record["chunk_id"] for h in single]
+
+
+def test_candidate_fusion_matches_exact_fusion_with_full_pool() -> None:
+    from finance_report_assistant.retrieval.hybrid import fuse_candidates, fuse_rankings, select_top
+
+    bm25 = [0.0, 2.5, 1.0, 2.5, 0.0, 3.0]
+    emb = [0.4, 0.1, 0.4, 0.9, 0.2, 0.0]
+    records = [{"chunk_id": f"c{i}"} for i in range(len(bm25))]
+
+    for m in range(1, len(bm25) + 1):
+        expected = sorted(range(len(bm25)), key=lambda i: bm25[i], reverse=True)[:m]
+        assert [i for i, _ in select_top(bm25, m)] == expected
+
+    exact = fuse_rankings(records, bm25, emb, top_k=4)
+    full = fuse_candidates(records, select_top(bm25, 6), select_top(emb, 6), top_k=4)
+    assert [(h.record["chunk_id"], h.score) for h in full] == [
+        (h.record["chunk_id"], h.score) for h in exact
+    ]
+
+    small = fuse_candidates(
+        records,
+        select_top(bm25, 2),
+        select_top(emb, 2),
+        top_k=3,
+        bm25_score_of=bm25.__getitem__,
+        embedding_score_of=emb.__getitem__,
+    )
+    assert {h.record["chunk_id"] for h in small} <= {"c5", "c1", "c3", "c0"}
+    assert all(h.bm25_score == bm25[int(h.record["chunk_id"][1:])] for h in small)
+    assert all(h.embedding_score == emb[int(h.record["chunk_id"][1:])] for h in small)
+
+
+def test_record_store_compacts_sentences_and_caches_hits(tmp_path: Path) -> None:
+    from finance_report_assistant.processing.sentences import split_sentences_with_spans
+    from finance_report_assistant.retrieval.records import RecordStore, write_records_jsonl
+
+    records = []
+    texts = ["Margins fell. Supply is tight!", "Liquidity is strong.", "  Odd spacing.  "]
+    for i, text in enumerate(texts):
+        spans = split_sentences_with_spans(text)
+        records.append(
+            {
+                "chunk_id": f"c{i}",
+                "text": text,
+                "sentences": [s["text"] for s in spans],
+                "sentence_spans": spans,
+            }
+        )
+    records.append({"chunk_id": "c3", "text": "No sentence fields."})
+
+    path = tmp_path / "records.jsonl"
+    offsets = write_records_jsonl(path, records)
+    stored = json.loads(path.read_text(encoding="utf-8").splitlines()[0])
+    assert "sentences" not in stored
+    assert all("text" not in span for span in stored["sentence_spans"])
+
+    store = RecordStore(path, offsets, cache_size=2)
+    assert list(store) == records
+    assert store[-1] == records[-1]
+    assert store[0:2] == records[:2]
+
+    first = store[0]
+    assert store[0] is first
+    store[1]
+    store[2]
+    assert store[0] is not first
+    assert len(store._cache) == 2
+
+
+def test_index_registry_reuses_invalidates_and_evicts(tmp_path: Path, monkeypatch) -> None:
+    import os
+
+    from finance_report_assistant.retrieval.index import IndexRegistry
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    for ticker in ("AAPL", "MSFT"):
+        chunk_dir = settings.data_dir / "processed" / "chunks" / ticker / "10-K" / "0001"
+        rows = [{"chunk_id": f"{ticker}-1", "text": "Liquidity is strong."}]
+        _write_chunks_jsonl(chunk_dir / "chunks.jsonl", rows)
+        build_retrieval_index(ticker=ticker, form="10-K")
+
+    registry = IndexRegistry()
+    first = registry.get("aapl", "10-K")
+    assert registry.get("AAPL", "10-K") is first
+
+    manifest = default_index_dir("AAPL", "10-K") / "manifest.json"
+    stat = manifest.stat()
+    os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    reloaded = registry.get("AAPL", "10-K")
+    assert reloaded is not first
+    # Replaced indexes stay usable for sessions that still hold them.
+    assert first.search("liquidity", top_k=1)[0].record["chunk_id"] == "AAPL-1"
+    assert registry.get("AAPL", "10-K") is reloaded
+
+    small = IndexRegistry(max_bytes=registry.nbytes + 1)
+    evicted = small.get("AAPL", "10-K")
+    msft = small.get("MSFT", "10-K")
+    assert len(small) == 1
+    assert evicted.records[0]["chunk_id"] == "AAPL-1"
+    assert small.get("MSFT", "10-K") is msft
+
+    registry.invalidate(ticker="AAPL")
+    assert len(registry) == 0
+
+
+def test_open_index_keeps_reading_its_records_after_a_rebuild(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    chunk_path = settings.data_dir / "processed" / "chunks" / "AAPL" / "10-K" / "0001"
+    rows = [{"chunk_id": f"c{i}", "text": f"Liquidity note {i} " * 40} for i in range(50)]
+    _write_chunks_jsonl(chunk_path / "chunks.jsonl", rows)
+    index_dir, _ = build_retrieval_index(ticker="AAPL", form="10-K")
+    index = load_retrieval_index(index_dir)
+    assert index.records[0]["chunk_id"] == "c0"
+
+    _write_chunks_jsonl(chunk_path / "chunks.jsonl", [{"chunk_id": "new", "text": "Short."}])
+    build_retrieval_index(ticker="AAPL", form="10-K")
+
+    # Record 49 was never read, so it comes from the mapping of the replaced file.
+    assert index.records[49]["chunk_id"] == "c49"
+    assert load_retrieval_index(index_dir).records[0]["chunk_id"] == "new"
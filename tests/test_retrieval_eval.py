@@ -66,6 +66,7 @@ def test_evaluate_retrieval_and_markdown(tmp_path: Path, monkeypatch) -> None:
     assert payload["query_count"] > 0
     assert len(payload["results"]) == 3
     assert "best_weight" in payload
+    assert payload["candidate_fusion"]["identical_rate"] == 1.0
     assert "errors" in payload
 
     summary = render_summary_markdown(payload, ticker="AAPL", form="10-K")
@@ -1,4 +1,8 @@
-from finance_report_assistant.processing.sentences import split_sentences_with_spans
+from finance_report_assistant.processing.sentences import (
+    record_sentences,
+    sentence_bounds,
+    split_sentences_with_spans,
+)
 
 
 def test_split_sentences_with_spans_returns_units_and_offsets() -> None:
@@ -10,3 +14,49 @@ def test_split_sentences_with_spans_returns_units_and_offsets() -> None:
     assert spans[1]["text"] == "Liquidity remains strong!"
     assert spans[0]["char_start"] == 0
     assert spans[1]["char_start"] > spans[0]["char_end"]
+
+
+def test_record_sentences_reads_offsets_and_legacy_rows() -> None:
+    text = "  Margins fell. Supply is tight!  "
+    starts, ends = sentence_bounds(text)
+    expected = ["Margins fell.", "Supply is tight!"]
+
+    record = {"text": text, "sentence_starts": starts, "sentence_ends": ends}
+    assert record_sentences(record) == expected
+    spans = split_sentences_with_spans(text)
+    legacy = {"text": text, "sentences": expected, "sentence_spans": spans}
+    assert record_sentences(legacy) == expected
+    compacted = [{"char_start": s["char_start"], "char_end": s["char_end"]} for s in spans]
+    assert record_sentences({"text": text, "sentence_spans": compacted}) == expected
+    assert record_sentences({"text": text}) == []
+
+
+def test_filing_chunk_validates_legacy_sentence_rows() -> None:
+    from finance_report_assistant.core.models import FilingChunk
+
+    text = "  Margins fell. Supply is tight!  "
+    spans = split_sentences_with_spans(text)
+    row = {
+        "chunk_id": "c1",
+        "ticker": "AAPL",
+        "form": "10-K",
+        "cik": "0000320193",
+        "accession_number": "0000320193-24-000123",
+        "filing_date": "2024-11-01",
+        "section_title": "Item 7",
+        "section_path": "Item 7",
+        "char_start": 0,
+        "char_end": len(text),
+        "word_count": 5,
+        "text": text,
+        "source_file": "k.htm",
+        "citation_url": "https://www.sec.gov/Archives/edgar/data/320193/k.htm",
+        "sentences": [span["text"] for span in spans],
+        "sentence_spans": spans,
+    }
+
+    chunk = FilingChunk.model_validate(row)
+    assert chunk.sentences == ["Margins fell.", "Supply is tight!"]
+    assert (chunk.sentence_starts, chunk.sentence_ends) == sentence_bounds(text)
+    without_spans = {key: value for key, value in row.items() if key != "sentence_spans"}
+    assert FilingChunk.model_validate(without_spans).sentences == chunk.sentences